@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""End-to-end throughput benchmark for lambda_handler against the local mock Workday server
+
+Starts mock_workday_server.py in a subprocess, points the scraper at it, runs the
+handler and reports jobs/sec, request latency percentiles (as served by the mock and
+as seen by the scraper), peak RSS and wall time.
+
+    python benchmark.py --jobs 1000 --latency 0.05
+    python benchmark.py --jobs 5000 --engine async --concurrency 64 --error-rate 0.02
+    python benchmark.py --jobs 2000 --burst-interval 10 --burst-duration 1 --event '{"encoding": "gzip"}'
+    python benchmark.py --jobs 6000 --no-details --event '{"facet_partitions": true}'
+"""
+
+import argparse
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MOCK_OPTIONS = ['jobs', 'latency', 'jitter', 'error_rate', 'burst_interval', 'burst_duration', 'max_limit', 'max_offset', 'churn', 'seed']
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(args, port: int) -> subprocess.Popen:
+    command = [sys.executable, os.path.join(HERE, 'mock_workday_server.py'), '--port', str(port)]
+    for option in MOCK_OPTIONS:
+        value = getattr(args, option)
+        if value is not None:
+            command += [f"--{option.replace('_', '-')}", str(value)]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    server.stdout.readline()  # Wait for the "serving" line
+    return server
+
+
+def mock_request(base_url: str, path: str, method: str = 'GET'):
+    request = urllib.request.Request(base_url + path, method=method, data=b'{}' if method == 'POST' else None)
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_benchmark(args):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_mock_server(args, port)
+    try:
+        # The scraper reads its configuration when the module is imported
+        os.environ['WORKDAY_BASE_URL'] = base_url
+        for name in ('rate_limit_initial_rps', 'rate_limit_max_rps'):
+            if getattr(args, name) is not None:
+                os.environ[name.upper()] = str(getattr(args, name))
+        if not args.verbose:
+            os.environ.setdefault('LOG_LEVEL', 'WARNING')
+        sys.path.insert(0, HERE)
+        import lambda_function
+
+        event = {'include_details': not args.no_details, 'engine': args.engine, 'cache': False}
+        if args.max_jobs:
+            event['max_jobs'] = args.max_jobs
+        if args.concurrency:
+            event['concurrency'] = args.concurrency
+        event.update(json.loads(args.event or '{}'))
+
+        runs = []
+        for _ in range(args.repeat):
+            mock_request(base_url, '/__reset', 'POST')
+            started = time.perf_counter()
+            result = lambda_function.lambda_handler(event, None)
+            wall = time.perf_counter() - started
+            body = lambda_function.decode_response_body(result)
+            jobs = body.get('jobs_count', 0)
+            runs.append({
+                'status_code': result['statusCode'],
+                'jobs': jobs,
+                'wall_seconds': round(wall, 3),
+                'jobs_per_second': round(jobs / wall, 1) if wall else None,
+                'server': mock_request(base_url, '/__stats'),
+                'phases': body.get('metadata', {}).get('phases'),
+                'requests': body.get('metadata', {}).get('requests'),
+                'rate_limiter': body.get('metadata', {}).get('rate_limiter'),
+                'runtime': body.get('metadata', {}).get('runtime'),
+                'error': body.get('error'),
+            })
+        return {'event': event, 'runs': runs, 'peak_rss_mb': peak_rss_mb()}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark lambda_handler against the mock Workday server')
+    parser.add_argument('--jobs', type=int, default=1000, help='Synthetic catalog size (0 serves the fixtures)')
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float)
+    parser.add_argument('--error-rate', type=float)
+    parser.add_argument('--burst-interval', type=float)
+    parser.add_argument('--burst-duration', type=float)
+    parser.add_argument('--max-limit', type=int)
+    parser.add_argument('--max-offset', type=int)
+    parser.add_argument('--churn', type=float)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads')
+    parser.add_argument('--concurrency', type=int)
+    parser.add_argument('--max-jobs', type=int)
+    parser.add_argument('--no-details', action='store_true', help='Only scrape listings')
+    parser.add_argument('--rate-limit-initial-rps', type=float)
+    parser.add_argument('--rate-limit-max-rps', type=float)
+    parser.add_argument('--event', help='Extra event fields as JSON')
+    parser.add_argument('--repeat', type=int, default=1, help='Run the handler this many times (later runs are warm)')
+    parser.add_argument('--output', help='Also write the report to this file')
+    parser.add_argument('--verbose', action='store_true', help='Keep the scraper INFO logs')
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    for index, run in enumerate(report['runs']):
+        latency = run['server']['latency_ms']
+        print(f"run {index + 1}: {run['jobs']} jobs in {run['wall_seconds']}s "
+              f"({run['jobs_per_second']} jobs/s), {run['server']['requests']} requests, "
+              f"server p50 {latency['p50']} ms, p99 {latency['p99']} ms", file=sys.stderr)
+        for kind, client in ((run['requests'] or {}).get('latency_ms') or {}).items():
+            print(f"  {kind}: {client['count']} attempts, client p50 {client['p50']} ms, p99 {client['p99']} ms", file=sys.stderr)
+    print(f"peak RSS: {report['peak_rss_mb']} MB", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
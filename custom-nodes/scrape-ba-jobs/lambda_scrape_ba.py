@@ -1,22 +1,1521 @@
-import json
 import time
+_import_started = time.perf_counter()
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import random
+import queue
+import threading
 import logging
-from typing import Dict, List, Optional, Any
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import requests
+from requests.adapters import HTTPAdapter
 import re
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# asyncio and aiohttp are only needed by the async engine and take most of the import
+# time, so they are loaded by load_async_engine() on first use
+asyncio = None
+aiohttp = None
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
 logger = logging.getLogger(__name__)
+logger.setLevel(LOG_LEVEL)
+
+
+def configure_logging():
+    """Send log records to stderr when nothing else does (local runs; Lambda installs its own handler)"""
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=LOG_LEVEL)
+
+
+def load_async_engine():
+    """Import asyncio and aiohttp into the module namespace"""
+    global asyncio, aiohttp
+    if aiohttp is None:
+        import asyncio as asyncio_module
+        try:
+            import aiohttp as aiohttp_module
+        except ImportError as e:
+            raise ImportError("The async engine requires aiohttp (pip install aiohttp)") from e
+        asyncio, aiohttp = asyncio_module, aiohttp_module
+
+# Number of job detail requests kept in flight at once
+DEFAULT_CONCURRENCY = 8
+# The async engine multiplexes requests on one event loop, so it can afford far more
+DEFAULT_ASYNC_CONCURRENCY = 64
+
+
+def resolve_concurrency(value: Optional[Any] = None, default: int = DEFAULT_CONCURRENCY) -> int:
+    """Resolve the worker count from an explicit value, SCRAPER_CONCURRENCY, or the default"""
+    if value is None:
+        value = os.environ.get('SCRAPER_CONCURRENCY', default)
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid concurrency value {value!r}, using {default}")
+        return default
+
+
+# Adaptive rate limiting (requests per second, shared per host)
+RATE_LIMIT_INITIAL_RPS = float(os.environ.get('RATE_LIMIT_INITIAL_RPS', 10))
+RATE_LIMIT_MIN_RPS = float(os.environ.get('RATE_LIMIT_MIN_RPS', 0.5))
+RATE_LIMIT_MAX_RPS = float(os.environ.get('RATE_LIMIT_MAX_RPS', 50))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose rate follows AIMD: additive increase while responses are
+    healthy, multiplicative decrease on 429/5xx, with Retry-After honoured as a hard pause.
+    
+    try_acquire() never blocks; it returns the delay the caller must wait before trying
+    again, so the same limiter works for threads (acquire) and asyncio (asyncio.sleep).
+    """
+    
+    def __init__(self, initial_rate: float = RATE_LIMIT_INITIAL_RPS, min_rate: float = RATE_LIMIT_MIN_RPS,
+                 max_rate: float = RATE_LIMIT_MAX_RPS, increase: float = 1.0, decrease: float = 0.5, jitter: float = 0.1):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.jitter = jitter
+        self.capacity = max(1.0, initial_rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Start a fresh measurement window for stats()"""
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.first_request_at = None
+        self.last_request_at = None
+    
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return how many seconds to wait before retrying"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            if now < self.blocked_until:
+                wait = self.blocked_until - now
+            elif self.tokens >= 1:
+                self.tokens -= 1
+                self.requests += 1
+                if self.first_request_at is None:
+                    self.first_request_at = now
+                self.last_request_at = now
+                return 0.0
+            else:
+                wait = (1 - self.tokens) / self.rate
+            
+            # Jitter keeps waiters that computed the same deadline from waking in lockstep
+            wait += random.uniform(0, self.jitter * max(wait, 1.0 / self.rate))
+            self.wait_seconds += wait
+            return wait
+    
+    def acquire(self):
+        """Block the calling thread until a token is available"""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+    
+    def on_success(self):
+        """Healthy response: grow the rate by roughly `increase` requests/sec per second"""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+            self.capacity = max(1.0, self.rate)
+    
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Throttled or failing response: cut the rate and pause the whole host"""
+        with self.lock:
+            now = time.monotonic()
+            self.throttled += 1
+            # Concurrent requests often fail together; treat a burst as one congestion signal
+            if now - self.last_decrease >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.capacity = max(1.0, self.rate)
+                self.last_decrease = now
+            self.tokens = min(self.tokens, 0.0)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            pause += random.uniform(0, self.jitter * max(pause, 1.0 / self.rate))
+            self.blocked_until = max(self.blocked_until, now + pause)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current and effective request rates for the response metadata"""
+        with self.lock:
+            elapsed = (self.last_request_at or 0.0) - (self.first_request_at or 0.0)
+            effective = self.requests / elapsed if elapsed > 0 else None
+            return {
+                'current_rate_rps': round(self.rate, 2),
+                'effective_rate_rps': round(effective, 2) if effective else None,
+                'requests': self.requests,
+                'throttled_responses': self.throttled,
+                'wait_seconds': round(self.wait_seconds, 2)
+            }
+
+
+_rate_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str) -> AdaptiveRateLimiter:
+    """Return the process-wide rate limiter for a host, creating it on first use"""
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = AdaptiveRateLimiter()
+        return _rate_limiters[host]
+
+
+# Upper bounds (milliseconds) of the request latency histogram buckets
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# Structured metric lines use CloudWatch's embedded metric format under this namespace
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'BAHJobScraper')
+LOG_METRICS = os.environ.get('LOG_METRICS', '').lower() == 'true'
+
+
+def latency_summary(samples: List[float]) -> Dict[str, Any]:
+    """Count, percentiles and histogram of request latencies given in seconds"""
+    ordered = sorted(samples)
+    
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1) if ordered else None
+    
+    histogram = {f"le_{bound}": 0 for bound in LATENCY_BUCKETS_MS}
+    histogram['inf'] = 0
+    for seconds in ordered:
+        milliseconds = seconds * 1000
+        bucket = next((f"le_{bound}" for bound in LATENCY_BUCKETS_MS if milliseconds <= bound), 'inf')
+        histogram[bucket] += 1
+    return {
+        'count': len(ordered),
+        'p50': percentile(0.50),
+        'p90': percentile(0.90),
+        'p99': percentile(0.99),
+        'max': round(ordered[-1] * 1000, 1) if ordered else None,
+        'histogram': histogram
+    }
+
+
+class ScrapeMetrics:
+    """Phase timings and request metrics for one invocation, safe to update from worker threads
+    
+    Phase seconds are summed over every call, so phases run by concurrent workers
+    (detail fetching, parsing) can add up to more than the wall time.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.phases = {}
+            self.statuses = {}
+            self.latencies = {}
+            self.retries = 0
+            self.failed_requests = 0
+            self.bytes_downloaded = 0
+            self.backoff_seconds = 0.0
+            self.pagination = {}
+    
+    def add_phase(self, name: str, seconds: float, count: int = 1):
+        with self.lock:
+            phase = self.phases.setdefault(name, {'seconds': 0.0, 'count': 0})
+            phase['seconds'] += seconds
+            phase['count'] += count
+    
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - started)
+    
+    def record_request(self, kind: str, status: Any, seconds: float, size: int = 0):
+        """One HTTP attempt: status is the response code, or 'timeout'/'connection_error'/'error'"""
+        with self.lock:
+            key = str(status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            self.latencies.setdefault(kind, []).append(seconds)
+            self.bytes_downloaded += size
+    
+    def record_cache_hit(self):
+        with self.lock:
+            self.statuses['cached'] = self.statuses.get('cached', 0) + 1
+    
+    def record_retry(self):
+        with self.lock:
+            self.retries += 1
+    
+    def record_failure(self):
+        with self.lock:
+            self.failed_requests += 1
+    
+    def record_backoff(self, seconds: float):
+        with self.lock:
+            self.backoff_seconds += seconds
+    
+    def record_pagination(self, summary: Dict[str, int]):
+        """Add one pagination run's page and drift counts (facet partitions each add theirs)"""
+        with self.lock:
+            for key, value in summary.items():
+                self.pagination[key] = self.pagination.get(key, 0) + value
+    
+    def merge(self, other: 'ScrapeMetrics'):
+        """Add another scraper's phases and requests, as the targets of a multi-target run are summed"""
+        with other.lock:
+            phases = {name: dict(phase) for name, phase in other.phases.items()}
+            statuses = dict(other.statuses)
+            latencies = {kind: list(samples) for kind, samples in other.latencies.items()}
+            counters = (other.retries, other.failed_requests, other.bytes_downloaded, other.backoff_seconds)
+            pagination = dict(other.pagination)
+        for name, phase in phases.items():
+            self.add_phase(name, phase['seconds'], phase['count'])
+        with self.lock:
+            for status, count in statuses.items():
+                self.statuses[status] = self.statuses.get(status, 0) + count
+            for kind, samples in latencies.items():
+                self.latencies.setdefault(kind, []).extend(samples)
+            self.retries += counters[0]
+            self.failed_requests += counters[1]
+            self.bytes_downloaded += counters[2]
+            self.backoff_seconds += counters[3]
+        if pagination:
+            self.record_pagination(pagination)
+    
+    def summary(self) -> Dict[str, Any]:
+        """phases and requests blocks for the response metadata"""
+        with self.lock:
+            phases = {name: {'seconds': round(phase['seconds'], 3), 'count': phase['count']}
+                      for name, phase in self.phases.items()}
+            latencies = {kind: list(samples) for kind, samples in self.latencies.items()}
+            requests_summary = {
+                'attempts': sum(count for status, count in self.statuses.items() if status != 'cached'),
+                'by_status': dict(self.statuses),
+                'retries': self.retries,
+                'failed': self.failed_requests,
+                'backoff_seconds': round(self.backoff_seconds, 3),
+                'bytes_downloaded': self.bytes_downloaded
+            }
+        requests_summary['latency_ms'] = {kind: latency_summary(samples) for kind, samples in latencies.items()}
+        summary = {'phases': phases, 'requests': requests_summary}
+        if self.pagination:
+            summary['pagination'] = dict(self.pagination)
+        return summary
+    
+    def log(self, dimensions: Dict[str, str], totals: Dict[str, Any]):
+        """Print one embedded-metric-format line; CloudWatch turns it into metrics, Logs Insights can query it"""
+        summary = self.summary()
+        values = {f"{name.title()}Seconds": phase['seconds'] for name, phase in summary['phases'].items()}
+        by_status = summary['requests']['by_status']
+        values.update({
+            'RequestAttempts': summary['requests']['attempts'],
+            'Retries': summary['requests']['retries'],
+            'FailedRequests': summary['requests']['failed'],
+            'ThrottledResponses': by_status.get('429', 0),
+            'ServerErrors': sum(count for status, count in by_status.items() if status.isdigit() and int(status) >= 500),
+            'BackoffSeconds': summary['requests']['backoff_seconds'],
+            'BytesDownloaded': summary['requests']['bytes_downloaded'],
+            **totals
+        })
+        units = {'BytesDownloaded': 'Bytes'}
+        print(json.dumps({
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [list(dimensions)],
+                    'Metrics': [{'Name': name, 'Unit': 'Seconds' if name.endswith('Seconds') else units.get(name, 'Count')}
+                                for name in values]
+                }]
+            },
+            **dimensions,
+            **values,
+            'metrics': summary
+        }, separators=(',', ':')), flush=True)
+
+
+# Seconds kept in reserve after a deadline stop for cleaning, serialization and uploads
+DEADLINE_MARGIN_SECONDS = float(os.environ.get('DEADLINE_MARGIN_SECONDS', 10))
+# Seconds a deadline stop waits for detail requests already in flight (taken out of the margin);
+# a scraper with requests still running after that is retired instead of being reused
+DEADLINE_DRAIN_SECONDS = float(os.environ.get('DEADLINE_DRAIN_SECONDS', 5))
+
+
+class LocalContext:
+    """Stand-in for the Lambda context outside Lambda, counting down from timeout_seconds"""
+    
+    def __init__(self, timeout_seconds: float = 900):
+        self.deadline = time.monotonic() + timeout_seconds
+    
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+class Deadline:
+    """When the scraper has to stop starting new work: the invocation's remaining time minus a margin"""
+    
+    def __init__(self, context: Any, margin_seconds: float = DEADLINE_MARGIN_SECONDS):
+        self.context = context
+        self.margin_seconds = margin_seconds
+    
+    @classmethod
+    def from_context(cls, context: Any, margin_seconds: float = DEADLINE_MARGIN_SECONDS) -> Optional['Deadline']:
+        """None when the context cannot tell the remaining time (e.g. local runs without a LocalContext)"""
+        if not callable(getattr(context, 'get_remaining_time_in_millis', None)):
+            return None
+        return cls(context, margin_seconds)
+    
+    def seconds_left(self) -> float:
+        """Seconds until work must stop (never negative)"""
+        return max(0.0, self.context.get_remaining_time_in_millis() / 1000 - self.margin_seconds)
+    
+    def reached(self) -> bool:
+        return self.seconds_left() <= 0
+
+
+# On-disk response cache for job detail requests
+RESPONSE_CACHE_DIR = os.environ.get('RESPONSE_CACHE_DIR', '/tmp/bah_response_cache')
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 6 * 3600))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 10000))
+
+
+class ResponseCache:
+    """On-disk cache of GET response bodies keyed by URL
+    
+    Entries younger than the TTL are served without a request. Older entries that carry
+    an ETag or Last-Modified validator are revalidated with a conditional request, and a
+    304 refreshes them in place. The least recently used entries are evicted once the
+    cache holds more than max_entries files (file mtime doubles as the access time).
+    """
+    
+    def __init__(self, directory: str = RESPONSE_CACHE_DIR, ttl: int = RESPONSE_CACHE_TTL,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.entry_count = sum(1 for name in os.listdir(directory) if name.endswith('.json'))
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'evictions': 0}
+    
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+    
+    def record(self, outcome: str):
+        with self.lock:
+            self.stats[outcome] += 1
+    
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a URL (fresh or stale), marking it as recently used"""
+        path = self._path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return entry if entry.get('url') == url else None
+    
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get('stored_at', 0) < self.ttl
+    
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Validator headers for revalidating a stale entry"""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def put(self, url: str, content: bytes, headers: Any) -> Dict[str, Any]:
+        """Store a response body with its validators"""
+        entry = {
+            'url': url,
+            'stored_at': time.time(),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_type': headers.get('Content-Type'),
+            'content': content.decode('utf-8', errors='replace')
+        }
+        self._write(url, entry)
+        return entry
+    
+    def refresh(self, url: str, entry: Dict[str, Any]):
+        """Mark a revalidated entry fresh again"""
+        entry['stored_at'] = time.time()
+        self._write(url, entry)
+    
+    def content(self, entry: Dict[str, Any]) -> bytes:
+        return entry['content'].encode('utf-8')
+    
+    def _write(self, url: str, entry: Dict[str, Any]):
+        path = self._path(url)
+        is_new = not os.path.exists(path)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for {url}: {e}")
+            return
+        if is_new:
+            with self.lock:
+                self.entry_count += 1
+                over_limit = self.entry_count > self.max_entries
+            if over_limit:
+                self.evict()
+    
+    def evict(self):
+        """Drop the least recently used tenth of the entries once over capacity"""
+        with self.lock:
+            try:
+                paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.json')]
+                paths.sort(key=os.path.getmtime)
+            except OSError as e:
+                logger.warning(f"Could not scan response cache: {e}")
+                return
+            excess = len(paths) - self.max_entries
+            if excess <= 0:
+                self.entry_count = len(paths)
+                return
+            doomed = paths[:excess + self.max_entries // 10]
+            for path in doomed:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.stats['evictions'] += len(doomed)
+            self.entry_count = len(paths) - len(doomed)
+
+
+# Workday host serving the jobs API; point it at mock_workday_server.py to benchmark offline
+WORKDAY_BASE_URL = os.environ.get('WORKDAY_BASE_URL', 'https://bah.wd1.myworkdayjobs.com').rstrip('/')
+# Workday tenant and career site scraped when an invocation names no targets
+WORKDAY_TENANT = os.environ.get('WORKDAY_TENANT', 'bah')
+WORKDAY_SITE = os.environ.get('WORKDAY_SITE', 'BAH_Jobs')
+# Requests in flight across every target of a multi-target invocation
+GLOBAL_CONCURRENCY = int(os.environ.get('GLOBAL_CONCURRENCY', 32))
+# Scraped jobs buffered between the target workers and the output of a multi-target run
+TARGET_QUEUE_SIZE = 256
+# Page sizes tried (largest first) when discovering what the listings endpoint accepts
+LISTING_LIMIT_CANDIDATES = (100, 50, 20)
+DEFAULT_LISTING_LIMIT = 20
+# Safety cap on pagination offsets
+MAX_LISTING_OFFSET = 2000
+# Extra rounds for re-requesting listing pages that came back missing, short or drifted
+LISTING_PAGE_RETRIES = 2
+# Postings shared by adjacent listing pages; catalog shifts smaller than this are detected and tolerated
+LISTING_PAGE_OVERLAP = int(os.environ.get('LISTING_PAGE_OVERLAP', 2))
+# Facet partitioning splits the catalog until every partition fits under the offset cap
+FACET_PARTITION_MAX = int(os.environ.get('FACET_PARTITION_MAX', MAX_LISTING_OFFSET))
+# Facet partitions paged through at once (each still fans out its own pages)
+FACET_PARTITION_CONCURRENCY = int(os.environ.get('FACET_PARTITION_CONCURRENCY', 4))
+POSTED_DAYS_AGO_PATTERN = re.compile(r'(\d+)(\+?)\s+days?\s+ago', re.IGNORECASE)
+
+
+def workday_target(spec: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """Normalize a {host, tenant, site} target; host may be a bare hostname or a base URL
+    
+    Without a host the configured WORKDAY_BASE_URL/TENANT/SITE are used. Workday tenants
+    are the first label of their host (bah.wd1.myworkdayjobs.com), so tenant may be omitted.
+    """
+    spec = spec or {}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Workday targets must be {{host, tenant, site}} objects, got {spec!r}")
+    host = spec.get('base_url') or spec.get('host')  # base_url: already normalized
+    base_url = str(host or WORKDAY_BASE_URL).strip().rstrip('/')
+    if '://' not in base_url:
+        base_url = f"https://{base_url}"
+    netloc = urlparse(base_url).netloc
+    tenant = spec.get('tenant') or (netloc.split('.')[0] if host else WORKDAY_TENANT)
+    site = spec.get('site') or (None if host else WORKDAY_SITE)
+    if not netloc or not site:
+        raise ValueError(f"Workday target {spec} needs a host and a site")
+    return {'base_url': base_url, 'host': netloc, 'tenant': str(tenant), 'site': str(site)}
+
+
+def workday_api_base(target: Dict[str, str]) -> str:
+    """Base URL of a target's CXS jobs API"""
+    return f"{target['base_url']}/wday/cxs/{target['tenant']}/{target['site']}"
+
+
+def job_requisition_id(job: Dict[str, Any]) -> Optional[str]:
+    """Return the requisition ID of a job posting (bulletFields[0]), falling back to its externalPath"""
+    bullet_fields = job.get('bulletFields') or [None]
+    return bullet_fields[0] or job.get('externalPath')
+
+
+def resumed_listings(pending_paths: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Minimal listings for detail paths carried over in a continuation cursor"""
+    return [{'externalPath': path, '_resumed': True} for path in pending_paths or []]
+
+
+def listing_limit_candidates(max_jobs: Optional[int] = None) -> List[int]:
+    """Page sizes worth probing; small runs don't need to probe beyond what they will use"""
+    ceiling = max(max_jobs, DEFAULT_LISTING_LIMIT) if max_jobs else None
+    return [limit for limit in LISTING_LIMIT_CANDIDATES if ceiling is None or limit <= ceiling]
+
+
+def effective_listing_limit(requested: int, data: Dict[str, Any]) -> int:
+    """Page size the endpoint actually honoured (it may clamp a large limit silently)"""
+    returned = len(data.get('jobPostings', []))
+    if 0 < returned < requested and data.get('total', 0) > returned:
+        return returned
+    return requested
+
+
+def listing_target(total: int, max_jobs: Optional[int] = None, start_offset: int = 0) -> int:
+    """Offset (exclusive) where pagination should stop collecting postings"""
+    return min(total, start_offset + max_jobs) if max_jobs else total
+
+
+def listing_page_step(limit: int, overlap: int = LISTING_PAGE_OVERLAP) -> int:
+    """Distance between consecutive page offsets, so adjacent pages share `overlap` postings"""
+    return limit - overlap if 0 < overlap < limit else limit
+
+
+def plan_listing_offsets(target: int, limit: int, start_offset: int = 0, overlap: int = LISTING_PAGE_OVERLAP) -> List[int]:
+    """Offsets of every page after the first one needed to reach the target offset"""
+    offsets = list(range(start_offset + listing_page_step(limit, overlap), target, listing_page_step(limit, overlap)))
+    capped = [offset for offset in offsets if offset <= MAX_LISTING_OFFSET]
+    if len(capped) < len(offsets):
+        logger.warning(f"Safety limit reached (offset > {MAX_LISTING_OFFSET}), skipping {len(offsets) - len(capped)} pages")
+    return capped
+
+
+def find_incomplete_pages(pages: Dict[int, List[Dict[str, Any]]], target: int, limit: int, start_offset: int = 0,
+                          overlap: int = LISTING_PAGE_OVERLAP) -> List[int]:
+    """Offsets whose page is missing or returned fewer postings than expected"""
+    incomplete = []
+    for offset in [start_offset] + plan_listing_offsets(target, limit, start_offset, overlap):
+        expected = min(limit, target - offset)
+        if len(pages.get(offset, [])) < expected:
+            incomplete.append(offset)
+    return incomplete
+
+
+def find_page_gaps(pages: Dict[int, List[Dict[str, Any]]], offsets: List[int]) -> List[Tuple[int, int]]:
+    """(offset, next offset) of every adjacent page pair that shares no posting
+    
+    Pages are planned to overlap, so two neighbours fetched from a stable catalog always
+    share postings. Postings removed ahead of the cursor between the two fetches shift
+    the later page left; once the shift reaches the overlap, postings fall between the
+    pages unseen. Insertions only shift right, which shows up as duplicates instead.
+    """
+    gaps = []
+    for previous, offset in zip(offsets, offsets[1:]):
+        if not pages.get(previous) or not pages.get(offset):
+            continue
+        previous_ids = {job_requisition_id(job) for job in pages[previous]}
+        if not any(job_requisition_id(job) in previous_ids for job in pages[offset]):
+            gaps.append((previous, offset))
+    return gaps
+
+
+class ListingPages:
+    """Listing pages of one pagination run, reconciled against catalog drift
+    
+    Pages are fetched at overlapping offsets. A page that is missing or short is
+    re-requested, and so are both pages of every adjacent pair with a gap between them
+    (insertions elsewhere can hide a gap from the total, so gaps are checked directly).
+    Postings from replaced fetches are kept, so a posting seen once is never lost, and
+    every requisition is listed once.
+    """
+    
+    def __init__(self, target: int, limit: int, start_offset: int = 0, overlap: int = LISTING_PAGE_OVERLAP):
+        self.target = target
+        self.limit = limit
+        self.start_offset = start_offset
+        self.overlap = overlap if listing_page_step(limit, overlap) != limit else 0
+        self.offsets = [start_offset] + plan_listing_offsets(target, limit, start_offset, self.overlap)
+        # Postings at offsets past the cap can't be listed, so they aren't expected
+        self.expected = max(0, min(target, self.offsets[-1] + limit) - start_offset)
+        self.pages = {}
+        self.replaced = []
+        self.stats = {'pages_fetched': 0, 'pages_refetched': 0, 'gaps_detected': 0}
+    
+    def store(self, offset: int, postings: List[Dict[str, Any]], fetched: bool = True) -> bool:
+        """Keep a page fetch unless it returned fewer postings than the one already held"""
+        previous = self.pages.get(offset)
+        if fetched:
+            self.stats['pages_fetched'] += 1
+            self.stats['pages_refetched'] += previous is not None
+        if previous is not None and len(postings) < len(previous):
+            self.replaced.extend(postings)
+            return False
+        if previous:
+            self.replaced.extend(previous)
+        self.pages[offset] = postings
+        return True
+    
+    def unique_count(self) -> int:
+        return len({job_requisition_id(job) for postings in [*self.pages.values(), self.replaced] for job in postings})
+    
+    def to_requery(self) -> List[int]:
+        """Offsets to fetch again: incomplete pages, plus both sides of every gap"""
+        pending = set(find_incomplete_pages(self.pages, self.target, self.limit, self.start_offset, self.overlap))
+        if self.overlap:
+            gaps = find_page_gaps(self.pages, self.offsets)
+            self.stats['gaps_detected'] += len(gaps)
+            pending.update(offset for pair in gaps for offset in pair)
+        return sorted(pending)
+    
+    def merge(self, max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Unique postings in offset order, followed by any only seen in replaced fetches"""
+        # The replaced postings sort after every real offset
+        return merge_listing_pages({**self.pages, float('inf'): self.replaced}, max_jobs)
+    
+    def summary(self) -> Dict[str, Any]:
+        listed = sum(len(postings) for postings in self.pages.values()) + len(self.replaced)
+        unique = self.unique_count()
+        return {**self.stats, 'postings_seen': listed, 'duplicates': listed - unique, 'unique': unique,
+                'expected': self.expected, 'missing': max(0, self.expected - unique)}
+
+
+def resolve_listing_total(first_page: Dict[str, Any], start_offset: int = 0, total_hint: Optional[int] = None,
+                          max_jobs: Optional[int] = None) -> int:
+    """Catalog size for planning pagination
+    
+    The API only reports an accurate total on the offset-0 request, so later windows rely on
+    total_hint (carried in paging cursors). Without one, a window can only cover max_jobs.
+    """
+    returned = len(first_page.get('jobPostings', []))
+    if start_offset == 0:
+        return max(first_page.get('total', 0), returned)
+    if total_hint:
+        return max(total_hint, start_offset + returned)
+    logger.warning(f"No total known for offset {start_offset}; paging only the requested window")
+    return start_offset + (max_jobs or returned)
+
+
+def merge_listing_pages(pages: Dict[int, List[Dict[str, Any]]], max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Concatenate pages in offset order, dropping postings already seen by requisition ID"""
+    merged = []
+    seen = set()
+    for offset in sorted(pages):
+        for job in pages[offset]:
+            requisition_id = job_requisition_id(job)
+            if requisition_id in seen:
+                continue
+            seen.add(requisition_id)
+            merged.append(job)
+    if max_jobs:
+        merged = merged[:max_jobs]
+    return merged
+
+
+def flatten_facets(facets: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Facet values by facetParameter; nested groups (locationMainGroup -> locations) are flattened"""
+    flattened = {}
+    for facet in facets or []:
+        values = facet.get('values') or []
+        nested = [value for value in values if value.get('facetParameter')]
+        if nested:
+            flattened.update(flatten_facets(nested))
+        else:
+            flattened[facet['facetParameter']] = [value for value in values if value.get('id') and value.get('count')]
+    return flattened
+
+
+def choose_partition_facet(facets: List[Dict[str, Any]], total: int, limit: int,
+                           exclude: Iterable[str] = ()) -> Optional[str]:
+    """The facet that splits total postings with the fewest listing requests
+    
+    Only facets whose value counts add up to the whole window are considered, so every
+    posting lands in at least one partition (multi-valued facets such as locations
+    overlap; the overlap is deduplicated later). Values still above the cap count as
+    expensive because they need another round of splitting.
+    """
+    best, best_score = None, None
+    for parameter, values in flatten_facets(facets).items():
+        if parameter in exclude or len(values) < 2 or sum(value['count'] for value in values) < total:
+            continue
+        oversized = sum(1 for value in values if value['count'] > FACET_PARTITION_MAX)
+        requests_needed = sum(-(-value['count'] // limit) for value in values)
+        score = (oversized, requests_needed)
+        if best_score is None or score < best_score:
+            best, best_score = parameter, score
+    return best
+
+
+def facets_key(applied_facets: Optional[Dict[str, List[str]]]) -> str:
+    """Stable key for a facet selection ('' for the unfiltered catalog)"""
+    return json.dumps(applied_facets, sort_keys=True, separators=COMPACT_SEPARATORS) if applied_facets else ''
+
+
+def merge_partition_listings(partition_listings: Iterable[List[Dict[str, Any]]],
+                             max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Concatenate partition listings in partition order, dropping requisitions seen in an earlier partition"""
+    return merge_listing_pages(dict(enumerate(partition_listings)), max_jobs)
+
+
+def listing_payload(limit: int, offset: int, applied_facets: Optional[Dict[str, List[str]]] = None,
+                    search_text: str = '') -> Dict[str, Any]:
+    """Body of a listings request"""
+    return {
+        "appliedFacets": applied_facets or {},
+        "limit": limit,
+        "offset": offset,
+        "searchText": search_text
+    }
+
+
+def posted_days_ago(posted_date: Optional[str]) -> Optional[int]:
+    """Age in days of a relative Workday 'Posted N Days Ago' label ('30+ Days Ago' counts as 30)"""
+    text = (posted_date or '').lower()
+    if 'today' in text:
+        return 0
+    if 'yesterday' in text:
+        return 1
+    match = POSTED_DAYS_AGO_PATTERN.search(text)
+    return int(match.group(1)) if match else None
+
+
+def posted_age_open_ended(posted_date: Optional[str]) -> bool:
+    """Whether a relative Workday label only bounds the posting's age from below ('30+ Days Ago')"""
+    match = POSTED_DAYS_AGO_PATTERN.search((posted_date or '').lower())
+    return bool(match and match.group(2))
+
+
+def filter_posted_within(job_listings: List[Dict[str, Any]], days: Optional[int]) -> List[Dict[str, Any]]:
+    """Listings posted within the last days
+    
+    A '30+ Days Ago' posting is at least 30 days old but may be of any age beyond that:
+    windows up to 30 days drop it, longer ones keep it (with a warning, since it may be
+    older than the window). Listings without a readable age are kept.
+    """
+    if days is None:
+        return job_listings
+    matched, open_ended = [], 0
+    for job in job_listings:
+        age = posted_days_ago(job.get('postedOn')) or 0
+        if posted_age_open_ended(job.get('postedOn')):
+            if days <= age:
+                continue
+            open_ended += 1
+        elif age > days:
+            continue
+        matched.append(job)
+    if open_ended:
+        logger.warning(f"Kept {open_ended} postings labelled 'N+ Days Ago' for posted_within_days={days}; "
+                       f"Workday does not tell their age, so some may be older than {days} days")
+    return matched
+
 
-class BAHJobScraper:
+def resolve_facet_values(facets: List[Dict[str, Any]], requested: Dict[str, Any]) -> Dict[str, List[str]]:
+    """appliedFacets IDs for facet values given by ID or by label
+    
+    Labels match a value's descriptor case-insensitively. A US state name or code also
+    matches every 'City, ST' value in that state, so {"locations": ["Hawaii"]} selects
+    each Hawaii location the site lists.
+    """
+    available = flatten_facets(facets)
+    resolved = {}
+    for parameter, labels in requested.items():
+        values = available.get(parameter)
+        if values is None:
+            raise ValueError(f"Unknown facet {parameter} (available: {', '.join(sorted(available))})")
+        ids = []
+        for label in [labels] if isinstance(labels, str) else labels:
+            text = str(label).strip().lower()
+            matches = [value['id'] for value in values
+                       if value['id'] == label or str(value.get('descriptor', '')).strip().lower() == text]
+            state = US_STATE_CODES.get(text) or (text.upper() if len(text) == 2 else None)
+            if not matches and state:
+                matches = [value['id'] for value in values if location_state(value.get('descriptor')) == state]
+            if not matches:
+                raise ValueError(f"No {parameter} facet value matches {label!r}")
+            ids.extend(value_id for value_id in matches if value_id not in ids)
+        resolved[parameter] = ids
+    return resolved
+
+
+# Fields parsed out of job descriptions, as (field, keyword, pattern). Within a field,
+# earlier patterns win regardless of where in the text they match. Every match of a
+# pattern contains its keyword (case-folded), so a pattern whose keyword is
+# missing from the text is skipped without running the regex.
+DESCRIPTION_PATTERNS = [
+    ('salary_range', '$', r'\$[\d,]+(?:\.\d{2})?\s*(?:to|\-)\s*\$[\d,]+(?:\.\d{2})?'),
+    ('salary_range', '$', r'\$[\d,]+(?:\.\d{2})?(?:\s*(?:annually|per year|\/year))?'),
+    ('security_clearance', 'ts/sci', r'TS\/SCI(?:\s+with\s+(?:poly|polygraph))?'),
+    ('security_clearance', 'secret', r'Top\s+Secret(?:\/SCI)?(?:\s+with\s+(?:poly|polygraph))?'),
+    ('security_clearance', 'secret', r'Secret(?:\s+clearance)?'),
+    ('security_clearance', 'trust', r'Public\s+Trust'),
+    ('experience_years', 'year', r'(?P<years>\d+)\+?\s*years?\s+of\s+(?:experience|exp)'),
+]
+
+
+class DescriptionExtractor:
+    """Extracts salary, clearance and experience from a description
+    
+    Patterns are compiled once. Each field takes the match of its first pattern that
+    matches anywhere in the text, exactly as separate searches in priority order would;
+    a pattern whose keyword does not occur in the text is skipped without a search.
+    
+    This is deliberately not one combined scan. An alternation of capturing lookaheads
+    would find overlapping matches in a single finditer pass, but re has to try it at
+    every $, digit, s, t and p in the text and measured 4-5x slower than these
+    prefiltered searches, which skip most patterns without touching the regex engine.
+    """
+    
+    def __init__(self, patterns=DESCRIPTION_PATTERNS):
+        # Compiled (keyword, regex) pairs per field, best first
+        self.patterns: Dict[str, List[tuple]] = {}
+        for field, keyword, pattern in patterns:
+            self.patterns.setdefault(field, []).append((keyword, re.compile(pattern, re.IGNORECASE)))
+    
+    def extract(self, description: str) -> Dict[str, Any]:
+        if not description:
+            return {}
+        
+        folded = description.casefold()
+        parsed_info = {}
+        for field, patterns in self.patterns.items():
+            for keyword, regex in patterns:
+                if keyword not in folded:
+                    continue
+                match = regex.search(description)
+                if match:
+                    parsed_info[field] = match.group('years') if 'years' in regex.groupindex else match.group(0)
+                    break
+        return parsed_info
+    
+    def extract_many(self, descriptions: Iterable[str]) -> List[Dict[str, Any]]:
+        """Extract fields from a batch of descriptions, returning results in input order"""
+        extract = self.extract
+        return [extract(description) for description in descriptions]
+
+
+DESCRIPTION_EXTRACTOR = DescriptionExtractor()
+
+
+def parse_job_descriptions(descriptions: Iterable[str]) -> List[Dict[str, Any]]:
+    """Batch version of BAHJobScraper.parse_job_description"""
+    return DESCRIPTION_EXTRACTOR.extract_many(descriptions)
+
+
+# Description headings are mapped to sections by the first keyword they contain.
+# Text under unrecognised headings (and before the first heading) stays in 'description'.
+SECTION_HEADING_KEYWORDS = [
+    ('benefit', 'benefits'),
+    ('compensation', 'benefits'),
+    ('well-being', 'benefits'),
+    ('grow with us', 'benefits'),
+    ('create your career', 'benefits'),
+    ('perks', 'benefits'),
+    ('qualification', 'qualifications'),
+    ('requirement', 'qualifications'),
+    ('you have', 'qualifications'),
+    ('you need', 'qualifications'),
+    ("you'll need", 'qualifications'),
+    ('clearance', 'qualifications'),
+    ('skills', 'qualifications'),
+    ('education', 'qualifications'),
+    ('responsibilit', 'responsibilities'),
+    ('key role', 'responsibilities'),
+    ('duties', 'responsibilities'),
+    ("you'll do", 'responsibilities'),
+    ('you will', 'responsibilities'),
+    ('the role', 'responsibilities'),
+]
+DESCRIPTION_SECTIONS = ('description', 'qualifications', 'responsibilities', 'benefits')
+BLOCK_TAGS = {'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'blockquote'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+BOLD_TAGS = {'b', 'strong'}
+MAX_HEADING_LENGTH = 80
+
+
+def heading_section(heading: str) -> str:
+    lowered = heading.lower()
+    for keyword, section in SECTION_HEADING_KEYWORDS:
+        if keyword in lowered:
+            return section
+    return 'description'
+
+
+class DescriptionHTMLParser(HTMLParser):
+    """Streams description HTML into plain-text sections without building a DOM
+    
+    Text is buffered one block (paragraph, list item, heading) at a time. A block other
+    than a list item counts as a heading when it comes from an <h*> tag, is entirely bold,
+    or is a short line ending in a colon. A heading switches the current section and is
+    kept as that section's next line. Every line is also kept in document order.
+    """
+    
     def __init__(self):
-        self.base_url = "https://bah.wd1.myworkdayjobs.com"
-        self.jobs_api_url = "https://bah.wd1.myworkdayjobs.com/wday/cxs/bah/BAH_Jobs/jobs"
-        self.job_details_api_base = "https://bah.wd1.myworkdayjobs.com/wday/cxs/bah/BAH_Jobs"
+        super().__init__(convert_charrefs=True)
+        self.section = 'description'
+        self.lines = {section: [] for section in DESCRIPTION_SECTIONS}
+        self.text_lines = []
+        self.block = []
+        self.bold_chars = 0
+        self.text_chars = 0
+        self.bold_depth = 0
+        self.in_heading = False
+        self.list_item = False
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.flush_block()
+            self.in_heading = tag in HEADING_TAGS
+            self.list_item = tag == 'li'
+        elif tag in BOLD_TAGS:
+            self.bold_depth += 1
+    
+    def handle_endtag(self, tag):
+        if tag in BLOCK_TAGS:
+            self.flush_block()
+            self.in_heading = False
+        elif tag in BOLD_TAGS:
+            self.bold_depth = max(0, self.bold_depth - 1)
+    
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.flush_block()
+    
+    def handle_data(self, data):
+        if not data.strip():
+            if self.block:
+                self.block.append(' ')
+            return
+        self.block.append(data)
+        length = len(data.strip())
+        self.text_chars += length
+        if self.bold_depth:
+            self.bold_chars += length
+    
+    def flush_block(self):
+        text = ' '.join(''.join(self.block).split())
+        if text:
+            is_heading = not self.list_item and len(text) <= MAX_HEADING_LENGTH and (
+                self.in_heading or self.bold_chars >= self.text_chars or text.endswith(':')
+            )
+            if is_heading:
+                self.section = heading_section(text)
+            line = f"- {text}" if self.list_item else text
+            self.lines[self.section].append(line)
+            self.text_lines.append(line)
+        self.block = []
+        self.bold_chars = 0
+        self.text_chars = 0
+        self.list_item = False
+    
+    def sections(self) -> Dict[str, str]:
+        self.flush_block()
+        return {section: '\n'.join(lines) for section, lines in self.lines.items() if lines}
+    
+    def text(self) -> str:
+        self.flush_block()
+        return '\n'.join(self.text_lines)
+
+
+def parse_description_html(html: str):
+    """(sections, full plain text) of description HTML, converted in one pass"""
+    if not html:
+        return {}, ''
+    parser = DescriptionHTMLParser()
+    parser.feed(html)
+    parser.close()
+    return parser.sections(), parser.text()
+
+
+def html_to_sections(html: str) -> Dict[str, str]:
+    """Convert description HTML to plain text split into description/qualifications/responsibilities/benefits"""
+    return parse_description_html(html)[0]
+
+
+# How far each job is enriched: listing postings only, plus the structured fields of
+# the job details API, or plus the description sections and the fields parsed from them
+DETAIL_LEVELS = ('listing', 'summary', 'full')
+LISTING_FIELDS = ('title', 'location', 'posted_date', 'job_id', 'external_path', 'url')
+SUMMARY_FIELDS = ('id', 'start_date', 'end_date', 'job_type', 'external_url', 'time_left_to_apply', 'can_apply',
+                  'detailed_location', 'country', 'country_code', 'hiring_organization', 'organization_url')
+PARSED_FIELDS = tuple(dict.fromkeys(field for field, _, _ in DESCRIPTION_PATTERNS))
+# A fields projection always keeps these: jobs are validated on title and keyed by job_id and source
+PROJECTION_KEPT_FIELDS = ('title', 'job_id', 'source')
+
+
+def resolve_detail_level(detail_level: Optional[str] = None, fields: Optional[Iterable[str]] = None,
+                         include_details: bool = True):
+    """(detail level, parse descriptions) of a run: the cheapest work that still produces every requested field
+    
+    Without fields the level is taken as given (include_details=False means 'listing').
+    With fields it is lowered to what they need, and raises ValueError when an explicit
+    level is too low for them. Fields outside the known listing, summary and section
+    fields (e.g. automation-id fields) are assumed to need the full pipeline.
+    """
+    if detail_level is None:
+        detail_level = 'full' if include_details else 'listing'
+    if detail_level not in DETAIL_LEVELS:
+        raise ValueError(f"Unknown detail_level: {detail_level} (expected one of {', '.join(DETAIL_LEVELS)})")
+    if not fields:
+        return detail_level, detail_level == 'full'
+    
+    requested = set(fields) - set(PROJECTION_KEPT_FIELDS)
+    if requested <= set(LISTING_FIELDS):
+        needed = 'listing'
+    elif requested <= set(LISTING_FIELDS + SUMMARY_FIELDS):
+        needed = 'summary'
+    else:
+        needed = 'full'
+    if DETAIL_LEVELS.index(needed) > DETAIL_LEVELS.index(detail_level):
+        raise ValueError(f"fields {sorted(requested)} need detail_level '{needed}' but '{detail_level}' was requested")
+    # Section fields only need the HTML conversion; anything else may come from the parse
+    parse = bool(requested - set(LISTING_FIELDS + SUMMARY_FIELDS + DESCRIPTION_SECTIONS))
+    return needed, needed == 'full' and parse
+
+
+def project_job(job: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """The requested fields of a scraped job (plus those every job keeps); the whole job without fields"""
+    if not fields or not job:
+        return job
+    return {key: value for key, value in job.items() if key in fields or key in PROJECTION_KEPT_FIELDS}
+
+
+class WorkdayScraperMixin:
+    """Steps of a scrape that do no I/O, shared by BAHJobScraper and AsyncBAHJobScraper
+    
+    The two scrapers only differ in how requests are made (threads or coroutines), so
+    the work around each request lives here: building listing requests and reading
+    their responses, planning pages and facet partitions, restoring from and writing
+    to the checkpoint, and turning API responses into jobs. The state it relies on is
+    set up by BAHJobScraper.__init__.
+    """
+    
+    def listing_request(self, limit: int, offset: int, applied_facets: Optional[Dict[str, List[str]]] = None,
+                        search_text: str = '') -> Dict[str, Any]:
+        """Payload of a listings request"""
+        logger.info(f"Fetching job listings: limit={limit}, offset={offset}, facets={applied_facets or {}}, search_text={search_text!r}")
+        return listing_payload(limit, offset, applied_facets, search_text)
+    
+    def listing_response(self, response, probe: bool = False) -> Dict[str, Any]:
+        """Decoded listings response, or an empty page when the request failed (or a probe was rejected)"""
+        if not response:
+            if not probe:
+                logger.error("Failed to fetch job listings")
+            return {"total": 0, "jobPostings": []}
+    
+        try:
+            data = response.json()
+            logger.info(f"Retrieved {len(data.get('jobPostings', []))} jobs from API")
+            return data
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to decode JSON response: {e}")
+            return {"total": 0, "jobPostings": []}
+    
+    def probe_limits(self, max_jobs: Optional[int] = None) -> List[Tuple[int, bool]]:
+        """(page size, probe) pairs to try for the first listings page, largest first
+        
+        Every size but the last is a probe: the endpoint rejecting it with a 400 is expected.
+        """
+        limits = [self.listing_limit] if self.listing_limit else listing_limit_candidates(max_jobs)
+        return [(limit, index < len(limits) - 1) for index, limit in enumerate(limits)]
+    
+    def accept_probe(self, limit: int, data: Dict[str, Any]) -> bool:
+        """Whether a first page fetched with limit has postings, remembering the page size that worked"""
+        if data.get('jobPostings'):
+            self.listing_limit = effective_listing_limit(limit, data)
+            return True
+        logger.info(f"No postings returned with limit={limit}, trying a smaller page size")
+        return False
+    
+    def start_listing(self, first_page: Dict[str, Any], limit: int, max_jobs: Optional[int] = None, start_offset: int = 0,
+                      total_hint: Optional[int] = None, applied_facets: Optional[Dict[str, List[str]]] = None,
+                      search_text: str = '') -> Optional[ListingPages]:
+        """ListingPages of a pagination run seeded with its first page, or None when there is nothing to list"""
+        if not first_page.get('jobPostings'):
+            logger.info("No jobs available from API")
+            self.last_listing_total = total_hint or 0
+            return None
+    
+        # total is only accurate on the first request
+        total = resolve_listing_total(first_page, start_offset, total_hint, max_jobs)
+        self.last_listing_total = total
+        target = listing_target(total, max_jobs, start_offset)
+        logger.info(f"API reports {first_page.get('total', 0)} total jobs available, using page size {limit}")
+        return self.restore_listing_pages(first_page, limit, target, start_offset, applied_facets, search_text)
+    
+    def requery_rounds(self, listing: ListingPages) -> Iterator[List[int]]:
+        """Offsets to request in each round: every page at first, then the missing, short or drifted ones"""
+        for attempt in range(LISTING_PAGE_RETRIES + 1):
+            pending = listing.to_requery()
+            if not pending:
+                return
+            if attempt:
+                logger.warning(f"Re-requesting {len(pending)} missing, short or drifted listing pages")
+            yield pending
+    
+    def restore_first_page(self, start_offset: int, applied_facets: Optional[Dict[str, List[str]]] = None,
+                           search_text: str = ''):
+        """(first page, page size) from the checkpoint, or None when the page still has to be fetched"""
+        record = self.checkpoint.page(start_offset, facets=applied_facets, search_text=search_text) if self.checkpoint else None
+        if not record:
+            return None
+        self.listing_limit = self.listing_limit or record['limit']
+        return {'total': record['total'] or 0, 'jobPostings': record['postings'], 'restored': True}, record['limit']
+    
+    def restore_listing_pages(self, first_page: Dict[str, Any], limit: int, target: int, start_offset: int,
+                              applied_facets: Optional[Dict[str, List[str]]] = None, search_text: str = '') -> ListingPages:
+        """ListingPages seeded with the first page and every checkpointed page the window still needs"""
+        listing = ListingPages(target, limit, start_offset)
+        listing.store(start_offset, first_page['jobPostings'], fetched=not first_page.get('restored'))
+        if self.checkpoint:
+            if not first_page.get('restored'):
+                self.checkpoint_page(start_offset, limit, first_page['jobPostings'], target, first_page.get('total'),
+                                     applied_facets, search_text)
+            for offset in listing.offsets[1:]:
+                record = self.checkpoint.page(offset, limit, applied_facets, search_text)
+                if record:
+                    listing.store(offset, record['postings'], fetched=False)
+        return listing
+    
+    def store_listing_pages(self, listing: ListingPages, offsets: List[int], results: Iterable[Dict[str, Any]],
+                            applied_facets: Optional[Dict[str, List[str]]] = None, search_text: str = ''):
+        for offset, data in zip(offsets, results):
+            if listing.store(offset, data.get('jobPostings', [])):
+                self.checkpoint_page(offset, listing.limit, listing.pages[offset], listing.target,
+                                     applied_facets=applied_facets, search_text=search_text)
+    
+    def finish_listing(self, listing: ListingPages, max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Merged postings of a pagination run, with its drift statistics recorded in the metrics"""
+        pending = listing.to_requery()
+        summary = listing.summary()
+        if pending:
+            logger.warning(f"Listing pages at offsets {pending} are still incomplete")
+        if summary['missing']:
+            logger.warning(f"Listed {summary['unique']} of {summary['expected']} expected postings; the catalog changed while paging")
+        self.metrics.record_pagination(summary)
+        all_jobs = listing.merge(max_jobs)
+        logger.info(f"Total jobs retrieved: {len(all_jobs)} ({summary['expected']} expected)")
+        return all_jobs
+    
+    def checkpoint_page(self, offset: int, limit: int, postings: List[Dict[str, Any]], target: int,
+                        total: Optional[int] = None, applied_facets: Optional[Dict[str, List[str]]] = None,
+                        search_text: str = ''):
+        """Checkpoint a listing page once it holds every posting expected at that offset"""
+        if self.checkpoint and len(postings) >= min(limit, target - offset):
+            self.checkpoint.add_page(offset, limit, postings, total, applied_facets, search_text)
+    
+    def restore_job(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """A job the checkpoint already has details for"""
+        if not self.checkpoint or not job.get('externalPath'):
+            return None
+        return self.checkpoint.job(job['externalPath'])
+    
+    def deadline_reached(self) -> bool:
+        return self.deadline is not None and self.deadline.reached()
+    
+    def record_deadline_stop(self, job_listings: List[Dict[str, Any]], emitted: int, submitted: int):
+        """Remember what a deadline stop left undone, for the continuation cursor
+        
+        Listings resumed from a previous cursor (marked _resumed, always first) have no
+        listing offset, so they stay pending until finished. Of the fresh listings, those
+        already submitted are kept as pending detail paths and the rest resume by offset.
+        """
+        pending = [job['externalPath'] for position, job in enumerate(job_listings)
+                   if position >= emitted and (position < submitted or job.get('_resumed')) and job.get('externalPath')]
+        consumed = sum(1 for job in job_listings[:max(submitted, emitted)] if not job.get('_resumed'))
+        self.deadline_stop = {'pending_paths': pending, 'listings_consumed': consumed, 'jobs_emitted': emitted}
+        logger.warning(f"Deadline reached after {emitted}/{len(job_listings)} jobs, {len(pending)} detail paths pending")
+    
+    def partition_plan(self, applied_facets: Dict[str, List[str]], labels: List[str], page: Dict[str, Any],
+                       max_partition: int) -> List[Dict[str, Any]]:
+        """Partitions covering one facet selection, whose first listings page (with facet counts) is given
+    
+        Partitions still larger than max_partition are marked 'split': they need a first
+        page of their own and another round of splitting.
+        """
+        total = page.get('total', 0)
+        if total <= max_partition:
+            return [{'applied_facets': applied_facets, 'labels': labels, 'count': total}] if total else []
+        parameter = choose_partition_facet(page.get('facets'), total, self.listing_limit or DEFAULT_LISTING_LIMIT, applied_facets)
+        if not parameter:
+            logger.warning(f"No facet left to split {labels or 'the catalog'} ({total} jobs); it will be truncated at offset {MAX_LISTING_OFFSET}")
+            return [{'applied_facets': applied_facets, 'labels': labels, 'count': total, 'truncated': True}]
+        partitions = []
+        for value in flatten_facets(page.get('facets'))[parameter]:
+            partition = {'applied_facets': {**applied_facets, parameter: [value['id']]},
+                         'labels': labels + [f"{parameter}={value.get('descriptor', value['id'])}"],
+                         'count': value['count']}
+            if value['count'] > max_partition:
+                partition['split'] = True
+            partitions.append(partition)
+        return partitions
+    
+    def start_partitioned(self, partitions: List[Dict[str, Any]]) -> int:
+        """Record the partitions of a partitioned crawl; returns the catalog size"""
+        catalog_total = self.last_listing_total
+        self.facet_partitions = partitions
+        logger.info(f"Crawling {catalog_total} jobs in {len(partitions)} facet partitions")
+        return catalog_total
+    
+    def finish_partitioned(self, partitions: List[Dict[str, Any]], results: List[List[Dict[str, Any]]], catalog_total: int,
+                           max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Listings of every partition in partition order, deduplicated by requisition ID"""
+        for partition, listings in zip(partitions, results):
+            partition['listed'] = len(listings)
+        self.last_listing_total = catalog_total
+        all_jobs = merge_partition_listings(results, max_jobs)
+        logger.info(f"Facet partitions yielded {len(all_jobs)} unique jobs of {catalog_total}")
+        return all_jobs
+    
+    def resolve_search_facets(self, search: Dict[str, Any], applied_facets: Optional[Dict[str, Any]],
+                              page: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """applied_facets plus the search's facet labels, resolved against the facets of the catalog's first page"""
+        selection = dict(applied_facets or {})
+        if search.get('facets'):
+            selection.update(resolve_facet_values(page.get('facets'), search['facets']))
+        return selection
+    
+    def search_plan(self, search: Dict[str, Any], max_jobs: Optional[int] = None, total_hint: Optional[int] = None):
+        """(terms, listing window, total hint) of a targeted search
+    
+        With a posting date filter every term is listed whole, since max_jobs applies
+        after the filter; a total hint only holds for a single term.
+        """
+        terms = search.get('terms') or ['']
+        window = max_jobs if search.get('posted_within_days') is None else None
+        hint = total_hint if len(terms) == 1 else None
+        return terms, window, hint
+    
+    def finish_search(self, search: Dict[str, Any], selection: Dict[str, Any], term_listings: List[List[Dict[str, Any]]],
+                      max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Merge the listings of every search term and drop those posted too long ago"""
+        terms = search.get('terms') or ['']
+        merged = merge_partition_listings(term_listings)
+        if len(terms) > 1:
+            self.last_listing_total = len(merged)
+        job_listings = filter_posted_within(merged, search.get('posted_within_days'))
+        if max_jobs:
+            job_listings = job_listings[:max_jobs]
+        self.search_summary = {
+            'terms': terms if any(terms) else [],
+            'applied_facets': selection,
+            'posted_within_days': search.get('posted_within_days'),
+            'listed': {term or '*': len(listings) for term, listings in zip(terms, term_listings)},
+            'merged': len(merged),
+            'matched': len(job_listings)
+        }
+        logger.info(f"Search matched {len(job_listings)} listings ({len(merged)} before the posting date filter)")
+        return job_listings
+    
+    def listing_call(self, max_jobs: Optional[int] = None, start_offset: int = 0, total_hint: Optional[int] = None,
+                     applied_facets: Optional[Dict[str, List[str]]] = None, partitioned: bool = False,
+                     search: Optional[Dict[str, Any]] = None):
+        """(listing method, keyword arguments) of a scrape, or None when max_jobs is 0"""
+        if partitioned:
+            return self.get_partitioned_job_listings, {'max_jobs': max_jobs}
+        if max_jobs == 0:
+            return None
+        options = {'max_jobs': max_jobs, 'start_offset': start_offset, 'total_hint': total_hint, 'applied_facets': applied_facets}
+        if search:
+            return self.get_search_job_listings, {'search': search, **options}
+        return self.get_all_job_listings, options
+    
+    def queue_listings(self, job_listings: List[Dict[str, Any]], pending_paths: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Listings to scrape: detail paths left over by a previous deadline stop first"""
+        logger.info(f"Found {len(job_listings)} job listings")
+        return resumed_listings(pending_paths) + job_listings
+    
+    def details_url(self, job_path: str) -> str:
+        """URL of the job details API for a listing's externalPath"""
+        # Clean the path - remove leading slash if present
+        full_url = f"{self.job_details_api_base}/{job_path.lstrip('/')}"
+        logger.info(f"Fetching job details from: {full_url}")
+        return full_url
+    
+    def details_response(self, response, url: str) -> Dict[str, Any]:
+        """Decoded job details response, or {} when the request failed"""
+        if not response:
+            logger.error(f"Failed to fetch job details from {url}")
+            return {}
+    
+        try:
+            return response.json()
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to decode job details JSON: {e}")
+            return {}
+    
+    def start_complete_job(self, job: Dict[str, Any], position: int = 1, total: int = 1) -> Optional[Dict[str, Any]]:
+        """The finished job when no details request is needed (no detail path, or checkpointed), else None"""
+        logger.info(f"Processing job {position}/{total}: {job.get('title', 'Unknown')}")
+        if not job.get('externalPath'):
+            logger.warning(f"No external path for job: {job.get('title')}")
+            return self.extract_basic_job_info(job)
+        return self.restore_job(job)
+    
+    def complete_job(self, job: Dict[str, Any], job_details: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine basic listing info with the job details API response"""
+        basic_info = self.extract_basic_job_info(job)
+        if not job_details:
+            logger.warning(f"No details found for job: {job.get('title')}")
+            return basic_info
+    
+        with self.metrics.phase('parsing'):
+            detailed_info = self.extract_job_details_from_api(job_details)
+        # Merge basic and detailed info
+        complete_job = {**basic_info, **detailed_info}
+        # Only fully enriched jobs are logged, so a rerun at any detail level can reuse them
+        if self.checkpoint and self.detail_level == 'full' and self.parse_descriptions:
+            self.checkpoint.add_job(job['externalPath'], complete_job)
+        return complete_job
+    
+    def failed_job(self, job: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Basic info of a job whose details could not be processed"""
+        logger.error(f"Error processing job {job.get('title', 'Unknown')}: {str(error)}")
+        # Still return the basic job info even if details fail
+        return self.extract_basic_job_info(job)
+    
+    def incremental_listings(self, previous: Dict[str, Any], job_listings: List[Dict[str, Any]],
+                             max_jobs: Optional[int] = None):
+        """(snapshot delta, listings to scrape) of an incremental run: only the added requisitions are scraped"""
+        delta = diff_snapshot(previous, job_listings, complete=not max_jobs)
+        logger.info(f"Incremental scrape: {len(delta['added'])} added, {len(delta['removed'])} removed, {len(delta['unchanged'])} unchanged")
+        added = set(delta['added'])
+        return delta, [job for job in job_listings if job_requisition_id(job) in added]
+    
+    def finish_incremental(self, store: 'SnapshotStore', previous: Dict[str, Any], job_listings: List[Dict[str, Any]],
+                           new_jobs: List[Dict[str, Any]], delta: Dict[str, Any], include_details: bool = True):
+        """Merge the new jobs with those carried forward and save the next snapshot"""
+        jobs = merge_incremental_jobs(self, previous, job_listings, new_jobs)
+        store.save(build_snapshot(previous, job_listings, jobs, delta['removed'], detailed=include_details))
+        return jobs, delta
+    
+    def extract_job_details_from_api(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract and structure job details from API response"""
+        job_posting_info = job_data.get('jobPostingInfo', {})
+        
+        details = {
+            'id': job_posting_info.get('id'),
+            'title': job_posting_info.get('title'),
+            'description': job_posting_info.get('jobDescription', ''),
+            'location': job_posting_info.get('location'),
+            'posted_date': job_posting_info.get('postedOn'),
+            'start_date': job_posting_info.get('startDate'),
+            'end_date': job_posting_info.get('endDate'),
+            'job_id': job_posting_info.get('jobReqId'),
+            'job_type': job_posting_info.get('timeType'),
+            'external_url': job_posting_info.get('externalUrl'),
+            'time_left_to_apply': job_posting_info.get('timeLeftToApply'),
+            'can_apply': job_posting_info.get('canApply')
+        }
+        
+        # Add location details if available
+        job_location = job_posting_info.get('jobRequisitionLocation', {})
+        if job_location:
+            details['detailed_location'] = job_location.get('descriptor')
+            country = job_location.get('country', {})
+            if country:
+                details['country'] = country.get('descriptor')
+                details['country_code'] = country.get('alpha2Code')
+        
+        # Add hiring organization
+        hiring_org = job_data.get('hiringOrganization', {})
+        if hiring_org:
+            details['hiring_organization'] = hiring_org.get('name')
+            details['organization_url'] = hiring_org.get('url')
+        
+        # Strip the description markup into sections, then extract structured information
+        # from the full text, headings included (salary often sits under a compensation
+        # heading). Runs whose fields don't need them skip the conversion or the parse.
+        description_html = details.pop('description', '')
+        if description_html and self.detail_level == 'full':
+            sections, text = parse_description_html(description_html)
+            details.update(sections)
+            if self.parse_descriptions:
+                details.update(self.parse_job_description(text))
+        
+        return {k: v for k, v in details.items() if v is not None and v != ''}
+    
+    def parse_job_description(self, description: str) -> Dict[str, Any]:
+        """Parse structured information from job description text"""
+        return DESCRIPTION_EXTRACTOR.extract(description)
+    
+    def extract_basic_job_info(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract basic job information from job listing"""
+        return {
+            'title': job.get('title', ''),
+            'location': job.get('locationsText', ''),
+            'posted_date': job.get('postedOn', ''),
+            'job_id': job.get('bulletFields', [None])[0],
+            'external_path': job.get('externalPath', ''),
+            'url': f"{self.public_url}{job.get('externalPath', '')}" if job.get('externalPath') else None
+        }
+
+
+class BAHJobScraper(WorkdayScraperMixin):
+    default_concurrency = DEFAULT_CONCURRENCY
+    
+    def __init__(self, concurrency: Optional[int] = None, cache: Optional[ResponseCache] = None,
+                 target: Optional[Dict[str, Any]] = None):
+        self.target = workday_target(target)
+        self.base_url = self.target['base_url']
+        self.job_details_api_base = workday_api_base(self.target)
+        self.jobs_api_url = f"{self.job_details_api_base}/jobs"
+        self.public_url = f"{self.base_url}/en-US/{self.target['site']}"
+        self.source = {key: self.target[key] for key in ('host', 'tenant', 'site')}  # Tag of jobs from multi-target runs
+        self.concurrency = resolve_concurrency(concurrency, self.default_concurrency)
+        self.listing_limit = None  # Discovered on the first listings request
+        self.last_listing_total = None  # Catalog size seen by the last get_all_job_listings call
+        self.rate_limiter = get_rate_limiter(self.target['host'])  # Shared by every target on the same host
+        self.request_slots = None  # Semaphore shared by the targets of a multi-target run (global concurrency cap)
+        self.cache = cache
+        self.metrics = ScrapeMetrics()
+        self.deadline = None  # Set per invocation from the Lambda context
+        self.deadline_stop = None  # Where iter_complete_jobs stopped when the deadline came
+        self.retired = False  # Requests outlived a deadline stop; release_scraper drops the scraper
+        self.checkpoint = None  # ScrapeCheckpoint of the current run, when it has a run ID
+        self.facet_partitions = None  # Partitions crawled by the last get_partitioned_job_listings call
+        self.search_summary = None  # What the last get_search_job_listings call matched
+        self.detail_level = 'full'  # 'summary' skips the description; see resolve_detail_level
+        self.parse_descriptions = True  # False converts description HTML to sections without parsing them
         self.session = requests.Session()
         
+        # Size the connection pool so every worker can keep its own keep-alive connection. Partition
+        # and search fan-out nest executors, so requests also hold one of `concurrency` slots, like
+        # the async engine's connector limit; the pool then never overflows into throwaway connections
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.connection_slots = threading.BoundedSemaphore(self.concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
         # Headers for API requests
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -25,343 +1524,2757 @@ class BAHJobScraper:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
             'X-Requested-With': 'XMLHttpRequest',
-            'Referer': 'https://bah.wd1.myworkdayjobs.com/en-US/BAH_Jobs'
+            'Referer': self.public_url
         })
     
-    def make_request(self, url: str, method: str = 'GET', json_payload: Optional[dict] = None, retries: int = 3, delay: float = 1.0) -> Optional[requests.Response]:
-        """Make HTTP request with retry logic and enhanced error handling"""
+    def reset_run_state(self, cache: Optional[ResponseCache] = None):
+        """Prepare a reused scraper for a new invocation; the session and discovered page size are kept"""
+        self.cache = cache
+        self.last_listing_total = None
+        self.rate_limiter.reset_stats()
+        self.metrics.reset()
+        self.deadline = None
+        self.deadline_stop = None
+        self.checkpoint = None
+        self.facet_partitions = None
+        self.search_summary = None
+        self.request_slots = None
+        self.detail_level = 'full'
+        self.parse_descriptions = True
+    
+    def make_request(self, url: str, method: str = 'GET', json_payload: Optional[dict] = None, retries: int = 3,
+                     probe: bool = False) -> Optional[requests.Response]:
+        """Make HTTP request with retry logic, paced by the host's adaptive rate limiter
+        
+        A probe expects the server may reject the request: a 400 is logged at INFO and
+        not counted as a failed request.
+        """
+        cached = None
+        if self.cache and method.upper() == 'GET':
+            cached = self.cache.get(url)
+            if cached and self.cache.is_fresh(cached):
+                self.cache.record('hits')
+                self.metrics.record_cache_hit()
+                logger.info(f"Cache hit for: {url}")
+                return self._cached_response(url, cached)
+        
+        kind = 'listing' if method.upper() == 'POST' else 'detail'
         for attempt in range(retries):
+            if attempt:
+                self.metrics.record_retry()
+            # Take a connection slot first so at most `concurrency` threads poll the limiter
+            self.connection_slots.acquire()
+            waiting = time.perf_counter()
+            self.rate_limiter.acquire()
+            if self.request_slots:
+                self.request_slots.acquire()
+            started = time.perf_counter()
+            self.metrics.record_backoff(started - waiting)
+            response = None
+            
             try:
                 logger.info(f"Attempting {method} request {attempt + 1}/{retries} for: {url}")
                 
                 if method.upper() == 'POST':
                     response = self.session.post(url, json=json_payload, timeout=30)
                 else:
-                    response = self.session.get(url, timeout=30)
-                    
+                    headers = self.cache.conditional_headers(cached) if self.cache else None
+                    response = self.session.get(url, headers=headers, timeout=30)
+                self.metrics.record_request(kind, response.status_code, time.perf_counter() - started, len(response.content))
+                
+                if response.status_code == 304 and cached:
+                    self.rate_limiter.on_success()
+                    self.cache.refresh(url, cached)
+                    self.cache.record('revalidated')
+                    logger.info(f"Cached response still valid for: {url}")
+                    return self._cached_response(url, cached)
+                
+                if response.status_code == 429 or response.status_code >= 500:
+                    # Back off the whole host; the limiter delays the next attempt
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    self.rate_limiter.on_throttle(retry_after)
+                    logger.warning(f"HTTP {response.status_code} on attempt {attempt + 1} for {url} (Retry-After: {retry_after})")
+                    continue
+                
                 response.raise_for_status()
                 
+                self.rate_limiter.on_success()
+                if self.cache and method.upper() == 'GET':
+                    self.cache.record('misses')
+                    self.cache.put(url, response.content, response.headers)
                 logger.info(f"Successful {method} request for: {url}")
                 return response
                         
             except requests.exceptions.Timeout:
+                self.metrics.record_request(kind, 'timeout', time.perf_counter() - started)
+                self.rate_limiter.on_throttle()
                 logger.warning(f"Timeout on attempt {attempt + 1} for {url}")
             except requests.exceptions.ConnectionError:
+                self.metrics.record_request(kind, 'connection_error', time.perf_counter() - started)
+                self.rate_limiter.on_throttle()
                 logger.warning(f"Connection error on attempt {attempt + 1} for {url}")
             except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:  # Rate limited
-                    logger.warning(f"Rate limited on attempt {attempt + 1} for {url}")
-                    time.sleep(delay * (3 ** attempt))  # Longer delay for rate limiting
-                elif e.response.status_code in [403, 404]:
+                if probe and e.response.status_code == 400:
+                    logger.info(f"Probe rejected with 400 for {url}")
+                    return None
+                if e.response.status_code in [400, 403, 404]:
                     logger.error(f"Client error {e.response.status_code} for {url}")
+                    self.metrics.record_failure()
                     return None  # Don't retry client errors
-                else:
-                    logger.warning(f"HTTP error {e.response.status_code} on attempt {attempt + 1} for {url}")
+                logger.warning(f"HTTP error {e.response.status_code} on attempt {attempt + 1} for {url}")
             except Exception as e:
+                if response is None:
+                    self.metrics.record_request(kind, 'error', time.perf_counter() - started)
                 logger.warning(f"Unexpected error on attempt {attempt + 1} for {url}: {str(e)}")
-            
-            if attempt < retries - 1:
-                time.sleep(delay * (2 ** attempt))  # Exponential backoff
+            finally:
+                if self.request_slots:
+                    self.request_slots.release()
+                self.connection_slots.release()
         
+        self.metrics.record_failure()
         logger.error(f"All {retries} attempts failed for {url}")
         return None
     
-    def get_job_listings(self, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
-        """Get job listings from the Workday API"""
-        logger.info(f"Fetching job listings: limit={limit}, offset={offset}")
-        
-        payload = {
-            "appliedFacets": {},
-            "limit": limit,
-            "offset": offset,
-            "searchText": ""
-        }
-        
-        response = self.make_request(
-            self.jobs_api_url, 
-            method='POST', 
-            json_payload=payload
-        )
-        
-        if not response:
-            logger.error("Failed to fetch job listings")
-            return {"total": 0, "jobPostings": []}
+    def _cached_response(self, url: str, entry: Dict[str, Any]) -> requests.Response:
+        """Rebuild a requests.Response from a cache entry"""
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response._content = self.cache.content(entry)
+        response.headers['Content-Type'] = entry.get('content_type') or 'application/json'
+        return response
+    
+    def get_job_listings(self, limit: int = 20, offset: int = 0,
+                         applied_facets: Optional[Dict[str, List[str]]] = None,
+                         search_text: str = '', probe: bool = False) -> Dict[str, Any]:
+        """Get job listings from the Workday API, optionally filtered by facet values and search text"""
+        payload = self.listing_request(limit, offset, applied_facets, search_text)
+        return self.listing_response(self.make_request(self.jobs_api_url, method='POST', json_payload=payload, probe=probe),
+                                     probe)
+    
+    def get_listing_total(self) -> int:
+        """Catalog size as reported by a minimal offset-0 listings request"""
+        return self.get_job_listings(limit=1, offset=0).get('total', 0)
+    
+    def probe_listing_limit(self, max_jobs: Optional[int] = None, start_offset: int = 0,
+                          applied_facets: Optional[Dict[str, List[str]]] = None, search_text: str = ''):
+        """Fetch the first listings page with the largest page size the endpoint accepts"""
+        data = {"total": 0, "jobPostings": []}
+        for limit, probe in self.probe_limits(max_jobs):
+            data = self.get_job_listings(limit=limit, offset=start_offset, applied_facets=applied_facets,
+                                         search_text=search_text, probe=probe)
+            if self.accept_probe(limit, data):
+                return data, self.listing_limit
+        return data, DEFAULT_LISTING_LIMIT
+    
+    def get_all_job_listings(self, max_jobs: Optional[int] = None, start_offset: int = 0,
+                             total_hint: Optional[int] = None,
+                             applied_facets: Optional[Dict[str, List[str]]] = None,
+                             search_text: str = '') -> List[Dict[str, Any]]:
+        """Get all job listings from start_offset, fanning out the remaining offsets in parallel after the first page"""
+        logger.info(f"Fetching all job listings from offset {start_offset}, facets={applied_facets or {}}, search_text={search_text!r}")
+    
+        first_page, limit = (self.restore_first_page(start_offset, applied_facets, search_text)
+                             or self.probe_listing_limit(max_jobs, start_offset, applied_facets, search_text))
+        listing = self.start_listing(first_page, limit, max_jobs, start_offset, total_hint, applied_facets, search_text)
+        if listing is None:
+            return []
+    
+        for pending in self.requery_rounds(listing):
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(pending))) as executor:
+                results = executor.map(lambda offset: self.get_job_listings(limit=limit, offset=offset, applied_facets=applied_facets,
+                                                                            search_text=search_text), pending)
+                self.store_listing_pages(listing, pending, results, applied_facets, search_text)
+        return self.finish_listing(listing, max_jobs)
+    
+    def plan_facet_partitions(self, max_partition: int = FACET_PARTITION_MAX) -> List[Dict[str, Any]]:
+        """Split the catalog by facet values into partitions small enough to page through completely
+    
+        Returns [{"applied_facets": {...}, "labels": [...], "count": n}] in facet order.
+        """
+        page = self.get_job_listings(limit=1, offset=0)
+        self.last_listing_total = page.get('total', 0)
+        return self.split_partition({}, [], page, max_partition)
+    
+    def split_partition(self, applied_facets: Dict[str, List[str]], labels: List[str], page: Dict[str, Any],
+                        max_partition: int) -> List[Dict[str, Any]]:
+        """Partitions covering one facet selection, splitting oversized ones again with their own first page"""
+        partitions = []
+        for partition in self.partition_plan(applied_facets, labels, page, max_partition):
+            if partition.pop('split', False):
+                sub_page = self.get_job_listings(limit=1, offset=0, applied_facets=partition['applied_facets'])
+                partitions.extend(self.split_partition(partition['applied_facets'], partition['labels'], sub_page, max_partition))
+            else:
+                partitions.append(partition)
+        return partitions
+    
+    def get_partitioned_job_listings(self, max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the listings of the whole catalog by paging through facet partitions in parallel
+    
+        Unlike get_all_job_listings this is not limited by MAX_LISTING_OFFSET. Listings come
+        in partition order, deduplicated by requisition ID.
+        """
+        partitions = self.plan_facet_partitions()
+        catalog_total = self.start_partitioned(partitions)
+        workers = max(1, min(FACET_PARTITION_CONCURRENCY, len(partitions)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda partition: self.get_all_job_listings(applied_facets=partition['applied_facets']), partitions))
+        return self.finish_partitioned(partitions, results, catalog_total, max_jobs)
+    
+    def search_facets(self, search: Dict[str, Any], applied_facets: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """applied_facets plus the search's facet labels, resolved against the facets of the catalog's first page"""
+        page = self.get_job_listings(limit=1, offset=0) if search.get('facets') else None
+        return self.resolve_search_facets(search, applied_facets, page)
+    
+    def get_search_job_listings(self, search: Dict[str, Any], max_jobs: Optional[int] = None, start_offset: int = 0,
+                                total_hint: Optional[int] = None,
+                                applied_facets: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Listings of a targeted search, filtered server-side by Workday
+    
+        search holds the search terms, facet values (by ID or label) and posted_within_days.
+        Every term is listed concurrently with the facets applied and the results are merged
+        by requisition ID. The posting date filter runs on the listings, before any details
+        are fetched, so max_jobs then applies after it.
+        """
+        selection = self.search_facets(search, applied_facets)
+        terms, window, hint = self.search_plan(search, max_jobs, total_hint)
+        workers = max(1, min(FACET_PARTITION_CONCURRENCY, len(terms)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            term_listings = list(executor.map(
+                lambda term: self.get_all_job_listings(max_jobs=window, start_offset=start_offset, total_hint=hint,
+                                                       applied_facets=selection, search_text=term), terms))
+        return self.finish_search(search, selection, term_listings, max_jobs)
+    
+    def get_job_details(self, job_path: str) -> Dict[str, Any]:
+        """Get detailed job information from the job details API"""
+        url = self.details_url(job_path)
+        with self.metrics.phase('details'):
+            response = self.make_request(url)
+        return self.details_response(response, url)
+    
+    def build_complete_job(self, job: Dict[str, Any], position: int = 1, total: int = 1) -> Dict[str, Any]:
+        """Combine basic listing info with the job details API response for a single job"""
+        try:
+            finished = self.start_complete_job(job, position, total)
+            if finished is not None:
+                return finished
+            return self.complete_job(job, self.get_job_details(job['externalPath']))
+        except Exception as e:
+            return self.failed_job(job, e)
+    
+    def scrape_all_jobs(self, max_jobs: Optional[int] = None, include_details: bool = True) -> List[Dict[str, Any]]:
+        """Main method to scrape all jobs with optional detailed information"""
+        return list(self.iter_jobs(max_jobs=max_jobs, include_details=include_details))
+    
+    def iter_jobs(self, max_jobs: Optional[int] = None, include_details: bool = True, start_offset: int = 0,
+                  total_hint: Optional[int] = None, pending_paths: Optional[List[str]] = None,
+                  applied_facets: Optional[Dict[str, List[str]]] = None, partitioned: bool = False,
+                  search: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield scraped jobs in listing order as soon as each one is ready
+    
+        pending_paths (detail paths left over by a previous deadline stop) are scraped first.
+        applied_facets restricts the scrape to one facet selection; partitioned crawls the
+        whole catalog through facet partitions instead of one offset-capped listing; search
+        (see get_search_job_listings) lists only the jobs matching a targeted search.
+        """
+        logger.info(f"Starting job scraping: max_jobs={max_jobs}, include_details={include_details}, start_offset={start_offset}")
+    
+        job_listings = []
+        call = self.listing_call(max_jobs, start_offset, total_hint, applied_facets, partitioned, search)
+        if call:
+            method, options = call
+            with self.metrics.phase('listing'):
+                job_listings = method(**options)
+        job_listings = self.queue_listings(job_listings, pending_paths)
+    
+        if not include_details:
+            # Return basic job info only
+            return (self.extract_basic_job_info(job) for job in job_listings)
+    
+        return self.iter_complete_jobs(job_listings)
+    
+    def iter_complete_jobs(self, job_listings: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Fetch details with a bounded worker pool, yielding jobs in listing order
         
+        At most two results per worker are buffered, so memory stays flat however many jobs there are.
+        """
+        total = len(job_listings)
+        if not total:
+            return
+        logger.info(f"Fetching job details with {self.concurrency} workers")
+        window = self.concurrency * 2
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        pending = deque()
+        submitted = emitted = 0
+        stopped = False
         try:
-            data = response.json()
-            logger.info(f"Retrieved {len(data.get('jobPostings', []))} jobs from API")
-            return data
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode JSON response: {e}")
-            return {"total": 0, "jobPostings": []}
+            while emitted < total:
+                # No new work is started once the deadline is reached
+                while submitted < total and len(pending) < window and not self.deadline_reached():
+                    pending.append(executor.submit(self.build_complete_job, job_listings[submitted], submitted + 1, total))
+                    submitted += 1
+                if not pending:
+                    stopped = True
+                    break
+                done, _ = wait([pending[0]], timeout=self.deadline.seconds_left() if self.deadline else None)
+                if not done:
+                    stopped = True
+                    break
+                yield pending.popleft().result()
+                emitted += 1
+        finally:
+            if stopped:
+                self.record_deadline_stop(job_listings, emitted, submitted)
+                self.drain(pending)
+            executor.shutdown(wait=not stopped, cancel_futures=stopped)
+    
+    def drain(self, pending: deque):
+        """Cancel queued detail fetches after a deadline stop and give running ones a bounded wait
+        
+        Each request is bounded by its own timeout, but retries can outlast the margin; when
+        some are still running the scraper is retired, so the next warm invocation does not
+        share its session, metrics and checkpoint with them.
+        """
+        running = [future for future in pending if not future.cancel()]
+        if not running:
+            return
+        timeout = min(DEADLINE_DRAIN_SECONDS, self.deadline.margin_seconds / 2) if self.deadline else DEADLINE_DRAIN_SECONDS
+        _, still_running = wait(running, timeout=timeout)
+        if still_running:
+            self.retired = True
+            logger.warning(f"{len(still_running)} detail requests still running after the deadline stop; retiring the scraper")
+    
+    def build_complete_jobs(self, job_listings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fetch details for many listings, keeping the listing order"""
+        return list(self.iter_complete_jobs(job_listings))
+    
+    def scrape_incremental(self, store: 'SnapshotStore', max_jobs: Optional[int] = None, include_details: bool = True,
+                           partitioned: bool = False):
+        """Scrape only requisitions missing from the stored snapshot, carrying unchanged jobs forward
+    
+        Returns the complete job list (in listing order) and the added/removed/unchanged ID sets.
+        """
+        previous = store.load().get('jobs', {})
+        method, options = self.listing_call(max_jobs or None, partitioned=partitioned)
+        with self.metrics.phase('listing'):
+            job_listings = method(**options)
+        delta, new_listings = self.incremental_listings(previous, job_listings, max_jobs)
+        if include_details:
+            new_jobs = self.build_complete_jobs(new_listings)
+        else:
+            new_jobs = [self.extract_basic_job_info(job) for job in new_listings]
+        return self.finish_incremental(store, previous, job_listings, new_jobs, delta, include_details)
+
+
+@asynccontextmanager
+async def request_slot(slots: Optional[Any]):
+    """Hold one of the shared request slots while a request is in flight, when there are any"""
+    if slots is None:
+        yield
+    else:
+        async with slots:
+            yield
+
+
+class AsyncResponse:
+    """Minimal response snapshot returned by AsyncBAHJobScraper.make_request"""
+    
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
     
-    def get_all_job_listings(self, max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get all job listings with pagination"""
-        logger.info("Fetching all job listings")
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class AsyncBAHJobScraper(BAHJobScraper):
+    """Asyncio variant of BAHJobScraper running on a shared aiohttp connection pool
+    
+    Network-bound methods are coroutines around the same WorkdayScraperMixin steps as
+    the threaded scraper. A semaphore caps the number of requests in flight. The session
+    lives for one `async with` block, so warm invocations open new connections.
+    """
+    default_concurrency = DEFAULT_ASYNC_CONCURRENCY
+    
+    def __init__(self, concurrency: Optional[int] = None, cache: Optional[ResponseCache] = None,
+                 target: Optional[Dict[str, Any]] = None):
+        load_async_engine()
+        super().__init__(concurrency=concurrency, cache=cache, target=target)
+        self.headers = dict(self.session.headers)
+        self.client = None
+        self.semaphore = None
+        self.open_depth = 0  # Nested `async with scraper` blocks share one session
+    
+    async def open(self):
+        """Create the shared aiohttp session and concurrency semaphore"""
+        if self.client is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+            self.client = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+    
+    async def close(self):
+        """Close the shared aiohttp session"""
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+            self.semaphore = None
+    
+    async def __aenter__(self):
+        await self.open()
+        self.open_depth += 1
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.open_depth -= 1
+        if self.open_depth == 0:
+            await self.close()
+    
+    async def make_request(self, url: str, method: str = 'GET', json_payload: Optional[dict] = None, retries: int = 3,
+                           probe: bool = False) -> Optional[AsyncResponse]:
+        """Make HTTP request with retry logic, paced by the host's adaptive rate limiter (see BAHJobScraper.make_request)"""
+        await self.open()
         
-        all_jobs = []
-        offset = 0
-        limit = 20  # API seems to have a max limit around 20
-        total_from_first_request = None
+        cached = None
+        if self.cache and method.upper() == 'GET':
+            cached = self.cache.get(url)
+            if cached and self.cache.is_fresh(cached):
+                self.cache.record('hits')
+                self.metrics.record_cache_hit()
+                logger.info(f"Cache hit for: {url}")
+                return AsyncResponse(url, 200, {'Content-Type': cached.get('content_type')}, self.cache.content(cached))
+        request_headers = self.cache.conditional_headers(cached) if self.cache else None
         
-        while True:
-            data = self.get_job_listings(limit=limit, offset=offset)
-            
-            if not data or not data.get('jobPostings'):
-                logger.info("No more jobs available from API")
-                break
-            
-            jobs = data.get('jobPostings', [])
-            all_jobs.extend(jobs)
-            
-            # Capture total from first request (it's only accurate then)
-            if total_from_first_request is None:
-                total_from_first_request = data.get('total', 0)
-                logger.info(f"API reports {total_from_first_request} total jobs available")
-            
-            logger.info(f"Retrieved {len(all_jobs)} jobs so far (batch of {len(jobs)})")
-            
-            # Stop if we've reached the user-specified limit
-            if max_jobs and len(all_jobs) >= max_jobs:
-                all_jobs = all_jobs[:max_jobs]
-                logger.info(f"Reached user-specified limit of {max_jobs} jobs")
-                break
-            
-            # Stop if we got fewer jobs than requested (end of results)
-            if len(jobs) < limit:
-                logger.info(f"Got {len(jobs)} jobs (less than limit of {limit}), assuming end of results")
-                break
-            
-            # Safety check to prevent infinite loops (shouldn't need this, but just in case)
-            if offset > 2000:  # 2000 * 20 = 40,000 jobs max
-                logger.warning("Safety limit reached (offset > 2000), stopping pagination")
-                break
-            
-            offset += limit
-            time.sleep(0.5)  # Be respectful to the API
+        kind = 'listing' if method.upper() == 'POST' else 'detail'
+        for attempt in range(retries):
+            if attempt:
+                self.metrics.record_retry()
+            started = None
+            try:
+                logger.info(f"Attempting {method} request {attempt + 1}/{retries} for: {url}")
+                
+                # Take the semaphore first so at most `concurrency` tasks poll the limiter
+                async with self.semaphore:
+                    waiting = time.perf_counter()
+                    wait = self.rate_limiter.try_acquire()
+                    while wait > 0:
+                        await asyncio.sleep(wait)
+                        wait = self.rate_limiter.try_acquire()
+                    async with request_slot(self.request_slots):
+                        started = time.perf_counter()
+                        self.metrics.record_backoff(started - waiting)
+                        async with self.client.request(method.upper(), url, json=json_payload, headers=request_headers) as response:
+                            content = await response.read()
+                            status = response.status
+                            headers = response.headers.copy()  # CIMultiDict: header lookups stay case-insensitive
+                self.metrics.record_request(kind, status, time.perf_counter() - started, len(content))
+                
+                if status == 304 and cached:
+                    self.rate_limiter.on_success()
+                    self.cache.refresh(url, cached)
+                    self.cache.record('revalidated')
+                    logger.info(f"Cached response still valid for: {url}")
+                    return AsyncResponse(url, 200, {'Content-Type': cached.get('content_type')}, self.cache.content(cached))
+                
+                if status < 400:
+                    self.rate_limiter.on_success()
+                    if self.cache and method.upper() == 'GET':
+                        self.cache.record('misses')
+                        self.cache.put(url, content, headers)
+                    logger.info(f"Successful {method} request for: {url}")
+                    return AsyncResponse(url, status, headers, content)
+                
+                if status == 429 or status >= 500:
+                    retry_after = parse_retry_after(headers.get('Retry-After'))
+                    self.rate_limiter.on_throttle(retry_after)
+                    logger.warning(f"HTTP {status} on attempt {attempt + 1} for {url} (Retry-After: {retry_after})")
+                elif probe and status == 400:
+                    logger.info(f"Probe rejected with 400 for {url}")
+                    return None
+                elif status in [400, 403, 404]:
+                    logger.error(f"Client error {status} for {url}")
+                    self.metrics.record_failure()
+                    return None  # Don't retry client errors
+                else:
+                    logger.warning(f"HTTP error {status} on attempt {attempt + 1} for {url}")
+                        
+            except asyncio.TimeoutError:
+                self.metrics.record_request(kind, 'timeout', time.perf_counter() - started if started else 0.0)
+                self.rate_limiter.on_throttle()
+                logger.warning(f"Timeout on attempt {attempt + 1} for {url}")
+            except aiohttp.ClientConnectionError:
+                self.metrics.record_request(kind, 'connection_error', time.perf_counter() - started if started else 0.0)
+                self.rate_limiter.on_throttle()
+                logger.warning(f"Connection error on attempt {attempt + 1} for {url}")
+            except Exception as e:
+                logger.warning(f"Unexpected error on attempt {attempt + 1} for {url}: {str(e)}")
         
-        logger.info(f"Total jobs retrieved: {len(all_jobs)} (API initially reported {total_from_first_request})")
-        return all_jobs
+        self.metrics.record_failure()
+        logger.error(f"All {retries} attempts failed for {url}")
+        return None
     
-    def get_job_details(self, job_path: str) -> Dict[str, Any]:
+    async def get_job_listings(self, limit: int = 20, offset: int = 0,
+                               applied_facets: Optional[Dict[str, List[str]]] = None,
+                               search_text: str = '', probe: bool = False) -> Dict[str, Any]:
+        """Get job listings from the Workday API, optionally filtered by facet values and search text"""
+        payload = self.listing_request(limit, offset, applied_facets, search_text)
+        return self.listing_response(await self.make_request(self.jobs_api_url, method='POST', json_payload=payload,
+                                                             probe=probe), probe)
+    
+    async def get_listing_total(self) -> int:
+        """Catalog size as reported by a minimal offset-0 listings request"""
+        async with self:
+            data = await self.get_job_listings(limit=1, offset=0)
+        return data.get('total', 0)
+    
+    async def probe_listing_limit(self, max_jobs: Optional[int] = None, start_offset: int = 0,
+                                applied_facets: Optional[Dict[str, List[str]]] = None, search_text: str = ''):
+        """Fetch the first listings page with the largest page size the endpoint accepts"""
+        data = {"total": 0, "jobPostings": []}
+        for limit, probe in self.probe_limits(max_jobs):
+            data = await self.get_job_listings(limit=limit, offset=start_offset, applied_facets=applied_facets,
+                                               search_text=search_text, probe=probe)
+            if self.accept_probe(limit, data):
+                return data, self.listing_limit
+        return data, DEFAULT_LISTING_LIMIT
+    
+    async def get_all_job_listings(self, max_jobs: Optional[int] = None, start_offset: int = 0,
+                                   total_hint: Optional[int] = None,
+                                   applied_facets: Optional[Dict[str, List[str]]] = None,
+                                   search_text: str = '') -> List[Dict[str, Any]]:
+        """Get all job listings from start_offset, fanning out the remaining offsets concurrently after the first page"""
+        logger.info(f"Fetching all job listings from offset {start_offset}, facets={applied_facets or {}}, search_text={search_text!r}")
+    
+        first_page, limit = (self.restore_first_page(start_offset, applied_facets, search_text)
+                             or await self.probe_listing_limit(max_jobs, start_offset, applied_facets, search_text))
+        listing = self.start_listing(first_page, limit, max_jobs, start_offset, total_hint, applied_facets, search_text)
+        if listing is None:
+            return []
+    
+        for pending in self.requery_rounds(listing):
+            results = await asyncio.gather(*(self.get_job_listings(limit=limit, offset=offset, applied_facets=applied_facets,
+                                                                   search_text=search_text) for offset in pending))
+            self.store_listing_pages(listing, pending, results, applied_facets, search_text)
+        return self.finish_listing(listing, max_jobs)
+    
+    async def plan_facet_partitions(self, max_partition: int = FACET_PARTITION_MAX) -> List[Dict[str, Any]]:
+        """Split the catalog by facet values into partitions small enough to page through completely"""
+        async with self:
+            page = await self.get_job_listings(limit=1, offset=0)
+            self.last_listing_total = page.get('total', 0)
+            return await self.split_partition({}, [], page, max_partition)
+    
+    async def split_partition(self, applied_facets: Dict[str, List[str]], labels: List[str], page: Dict[str, Any],
+                              max_partition: int) -> List[Dict[str, Any]]:
+        """Partitions covering one facet selection, splitting oversized ones again with their own first page"""
+        partitions = []
+        for partition in self.partition_plan(applied_facets, labels, page, max_partition):
+            if partition.pop('split', False):
+                sub_page = await self.get_job_listings(limit=1, offset=0, applied_facets=partition['applied_facets'])
+                partitions.extend(await self.split_partition(partition['applied_facets'], partition['labels'], sub_page, max_partition))
+            else:
+                partitions.append(partition)
+        return partitions
+    
+    async def get_partitioned_job_listings(self, max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the listings of the whole catalog by paging through facet partitions concurrently"""
+        partitions = await self.plan_facet_partitions()
+        catalog_total = self.start_partitioned(partitions)
+        semaphore = asyncio.Semaphore(max(1, FACET_PARTITION_CONCURRENCY))
+    
+        async def crawl(partition):
+            async with semaphore:
+                return await self.get_all_job_listings(applied_facets=partition['applied_facets'])
+    
+        results = await asyncio.gather(*(crawl(partition) for partition in partitions))
+        return self.finish_partitioned(partitions, results, catalog_total, max_jobs)
+    
+    async def search_facets(self, search: Dict[str, Any], applied_facets: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        page = await self.get_job_listings(limit=1, offset=0) if search.get('facets') else None
+        return self.resolve_search_facets(search, applied_facets, page)
+    
+    async def get_search_job_listings(self, search: Dict[str, Any], max_jobs: Optional[int] = None, start_offset: int = 0,
+                                      total_hint: Optional[int] = None,
+                                      applied_facets: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Listings of a targeted search, with every search term listed concurrently"""
+        selection = await self.search_facets(search, applied_facets)
+        terms, window, hint = self.search_plan(search, max_jobs, total_hint)
+        semaphore = asyncio.Semaphore(max(1, FACET_PARTITION_CONCURRENCY))
+    
+        async def list_term(term):
+            async with semaphore:
+                return await self.get_all_job_listings(max_jobs=window, start_offset=start_offset, total_hint=hint,
+                                                       applied_facets=selection, search_text=term)
+    
+        term_listings = await asyncio.gather(*(list_term(term) for term in terms))
+        return self.finish_search(search, selection, term_listings, max_jobs)
+    
+    async def get_job_details(self, job_path: str) -> Dict[str, Any]:
         """Get detailed job information from the job details API"""
-        # Clean the path - remove leading slash if present
-        clean_path = job_path.lstrip('/')
-        full_url = f"{self.job_details_api_base}/{clean_path}"
-        
-        logger.info(f"Fetching job details from: {full_url}")
-        
-        response = self.make_request(full_url)
-        if not response:
-            logger.error(f"Failed to fetch job details from {full_url}")
+        url = self.details_url(job_path)
+        with self.metrics.phase('details'):
+            response = await self.make_request(url)
+        return self.details_response(response, url)
+    
+    async def build_complete_job(self, job: Dict[str, Any], position: int = 1, total: int = 1) -> Dict[str, Any]:
+        """Combine basic listing info with the job details API response for a single job"""
+        try:
+            finished = self.start_complete_job(job, position, total)
+            if finished is not None:
+                return finished
+            return self.complete_job(job, await self.get_job_details(job['externalPath']))
+        except Exception as e:
+            return self.failed_job(job, e)
+    
+    async def scrape_all_jobs(self, max_jobs: Optional[int] = None, include_details: bool = True) -> List[Dict[str, Any]]:
+        """Main method to scrape all jobs with optional detailed information"""
+        return [job async for job in self.iter_jobs(max_jobs=max_jobs, include_details=include_details)]
+    
+    async def iter_jobs(self, max_jobs: Optional[int] = None, include_details: bool = True, start_offset: int = 0,
+                        total_hint: Optional[int] = None, pending_paths: Optional[List[str]] = None,
+                        applied_facets: Optional[Dict[str, List[str]]] = None, partitioned: bool = False,
+                        search: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield scraped jobs in listing order as soon as each one is ready, pending_paths first"""
+        logger.info(f"Starting async job scraping: max_jobs={max_jobs}, include_details={include_details}, start_offset={start_offset}")
+    
+        async with self:
+            job_listings = []
+            call = self.listing_call(max_jobs, start_offset, total_hint, applied_facets, partitioned, search)
+            if call:
+                method, options = call
+                with self.metrics.phase('listing'):
+                    job_listings = await method(**options)
+            job_listings = self.queue_listings(job_listings, pending_paths)
+    
+            if not include_details:
+                for job in job_listings:
+                    yield self.extract_basic_job_info(job)
+                return
+    
+            async for job in self.iter_complete_jobs(job_listings):
+                yield job
+    
+    async def iter_complete_jobs(self, job_listings: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Fetch details concurrently, yielding jobs in listing order with a bounded number of tasks alive"""
+        total = len(job_listings)
+        logger.info(f"Fetching job details with up to {self.concurrency} requests in flight")
+        window = self.concurrency * 2
+        pending = deque()
+        submitted = emitted = 0
+        stopped = False
+        try:
+            while emitted < total:
+                # No new work is started once the deadline is reached
+                while submitted < total and len(pending) < window and not self.deadline_reached():
+                    pending.append(asyncio.ensure_future(self.build_complete_job(job_listings[submitted], submitted + 1, total)))
+                    submitted += 1
+                if not pending:
+                    stopped = True
+                    break
+                done, _ = await asyncio.wait([pending[0]], timeout=self.deadline.seconds_left() if self.deadline else None)
+                if not done:
+                    stopped = True
+                    break
+                yield pending.popleft().result()
+                emitted += 1
+        finally:
+            if stopped:
+                self.record_deadline_stop(job_listings, emitted, submitted)
+            for task in pending:
+                task.cancel()
+    
+    async def build_complete_jobs(self, job_listings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fetch details for many listings, keeping the listing order"""
+        return [job async for job in self.iter_complete_jobs(job_listings)]
+    
+    async def scrape_incremental(self, store: 'SnapshotStore', max_jobs: Optional[int] = None, include_details: bool = True,
+                                 partitioned: bool = False):
+        """Scrape only requisitions missing from the stored snapshot, carrying unchanged jobs forward"""
+        previous = store.load().get('jobs', {})
+        method, options = self.listing_call(max_jobs or None, partitioned=partitioned)
+        async with self:
+            with self.metrics.phase('listing'):
+                job_listings = await method(**options)
+            delta, new_listings = self.incremental_listings(previous, job_listings, max_jobs)
+            if include_details:
+                new_jobs = await self.build_complete_jobs(new_listings)
+            else:
+                new_jobs = [self.extract_basic_job_info(job) for job in new_listings]
+        return self.finish_incremental(store, previous, job_listings, new_jobs, delta, include_details)
+
+
+# Default location of the incremental-scrape snapshot (Lambda can only write to /tmp)
+DEFAULT_SNAPSHOT_URI = os.environ.get('SNAPSHOT_URI', '/tmp/bah_jobs_snapshot.json')
+
+
+class SnapshotStore(ABC):
+    """Persists the snapshot of known requisitions used by incremental scrapes
+    
+    A snapshot looks like {"updated_at": ..., "jobs": {requisition_id: {"external_path": ..., "job": {...}}}}.
+    Subclass and implement load/save to plug in other storage.
+    """
+    
+    @abstractmethod
+    def load(self) -> Dict[str, Any]:
+        """The stored snapshot, or {} when there is none yet"""
+    
+    @abstractmethod
+    def save(self, snapshot: Dict[str, Any]):
+        """Replace the stored snapshot"""
+
+
+class FileSnapshotStore(SnapshotStore):
+    """Snapshot stored as a JSON file on local disk (e.g. /tmp in Lambda, a volume locally)"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            logger.info(f"No snapshot at {self.path}, starting from scratch")
             return {}
-        
         try:
-            data = response.json()
-            return data
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode job details JSON: {e}")
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable snapshot {self.path}: {e}")
             return {}
     
-    def extract_job_details_from_api(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract and structure job details from API response"""
-        job_posting_info = job_data.get('jobPostingInfo', {})
-        
-        details = {
-            'id': job_posting_info.get('id'),
-            'title': job_posting_info.get('title'),
-            'description': job_posting_info.get('jobDescription', ''),
-            'location': job_posting_info.get('location'),
-            'posted_date': job_posting_info.get('postedOn'),
-            'start_date': job_posting_info.get('startDate'),
-            'end_date': job_posting_info.get('endDate'),
-            'job_id': job_posting_info.get('jobReqId'),
-            'job_type': job_posting_info.get('timeType'),
-            'external_url': job_posting_info.get('externalUrl'),
-            'time_left_to_apply': job_posting_info.get('timeLeftToApply'),
-            'can_apply': job_posting_info.get('canApply')
+    def save(self, snapshot: Dict[str, Any]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename so a crash never leaves a truncated snapshot behind
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class S3SnapshotStore(SnapshotStore):
+    """Snapshot stored as a JSON object in S3, so it survives Lambda cold starts"""
+    
+    def __init__(self, bucket: str, key: str):
+        import boto3  # Provided by the Lambda runtime
+        self.bucket = bucket
+        self.key = key
+        self.client = boto3.client('s3')
+    
+    def load(self) -> Dict[str, Any]:
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.key)
+        except self.client.exceptions.NoSuchKey:
+            logger.info(f"No snapshot at s3://{self.bucket}/{self.key}, starting from scratch")
+            return {}
+        return json.loads(obj['Body'].read())
+    
+    def save(self, snapshot: Dict[str, Any]):
+        body = json.dumps(snapshot, ensure_ascii=False).encode('utf-8')
+        self.client.put_object(Bucket=self.bucket, Key=self.key, Body=body, ContentType='application/json')
+
+
+def snapshot_store_from_uri(uri: str) -> SnapshotStore:
+    """Build a snapshot store from a local path or an s3://bucket/key URI"""
+    if uri.startswith('s3://'):
+        bucket, _, key = uri[len('s3://'):].partition('/')
+        return S3SnapshotStore(bucket, key)
+    return FileSnapshotStore(uri)
+
+
+def diff_snapshot(previous: Dict[str, Any], job_listings: List[Dict[str, Any]], complete: bool = True) -> Dict[str, List[str]]:
+    """Split current listings into added and unchanged requisitions and find removed ones
+    
+    A requisition whose externalPath moved is treated as added so its details are refetched.
+    Removals are only reported when the listings cover the whole catalog.
+    """
+    added, unchanged = [], []
+    current_ids = set()
+    for job in job_listings:
+        requisition_id = job_requisition_id(job)
+        current_ids.add(requisition_id)
+        known = previous.get(requisition_id)
+        if known and known.get('external_path') == job.get('externalPath'):
+            unchanged.append(requisition_id)
+        else:
+            added.append(requisition_id)
+    removed = [requisition_id for requisition_id in previous if requisition_id not in current_ids] if complete else []
+    return {'added': added, 'removed': removed, 'unchanged': unchanged}
+
+
+def merge_incremental_jobs(scraper: BAHJobScraper, previous: Dict[str, Any], job_listings: List[Dict[str, Any]],
+                           new_jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Combine freshly scraped jobs with carried-forward ones in listing order
+    
+    Carried-forward jobs get their basic listing fields refreshed (e.g. "Posted 3 Days Ago").
+    """
+    fresh = iter(new_jobs)
+    jobs = []
+    for job in job_listings:
+        known = previous.get(job_requisition_id(job))
+        if known and known.get('external_path') == job.get('externalPath'):
+            jobs.append({**known.get('job', {}), **scraper.extract_basic_job_info(job)})
+        else:
+            jobs.append(next(fresh))
+    return jobs
+
+
+def build_snapshot(previous: Dict[str, Any], job_listings: List[Dict[str, Any]], jobs: List[Dict[str, Any]],
+                   removed: List[str], detailed: bool = False) -> Dict[str, Any]:
+    """Snapshot after an incremental run; requisitions outside a partial listing are kept
+    
+    With detailed, jobs left with listing fields only (their detail fetch failed) are not
+    recorded, so the next run sees them as added and fetches their details again.
+    """
+    snapshot_jobs = {k: v for k, v in previous.items() if k not in removed}
+    for listing, job in zip(job_listings, jobs):
+        if detailed and set(job) <= set(LISTING_FIELDS):
+            logger.warning(f"Not recording {job_requisition_id(listing)} in the snapshot: its details could not be fetched")
+            continue
+        snapshot_jobs[job_requisition_id(listing)] = {'external_path': listing.get('externalPath'), 'job': job}
+    return {
+        'updated_at': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+        'jobs': snapshot_jobs
+    }
+
+
+# Append-only progress logs for crash-safe runs, one file per run ID
+CHECKPOINT_DIR = os.environ.get('CHECKPOINT_DIR', '/tmp/bah_checkpoints')
+# Records are flushed to the OS as they are written; fsync at most this often
+CHECKPOINT_SYNC_SECONDS = float(os.environ.get('CHECKPOINT_SYNC_SECONDS', 5))
+
+
+class ScrapeCheckpoint:
+    """Append-only NDJSON log of the listing pages and enriched jobs a run has finished
+    
+    Every finished listing page ({"type": "page", "offset", "limit", "total", "postings", plus
+    "facets" for facet partitions) and
+    every job whose details were fetched ({"type": "job", "path", "job"}) is appended as one
+    line. Reopening the same file reloads them, so a restarted run skips that work. A line
+    cut short by a crash is ignored. Safe to share between worker threads.
+    """
+    
+    def __init__(self, path: str, sync_seconds: float = CHECKPOINT_SYNC_SECONDS):
+        self.path = path
+        self.sync_seconds = sync_seconds
+        self.pages = {}
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.stats = {'pages_restored': 0, 'jobs_restored': 0, 'pages_written': 0, 'jobs_written': 0}
+        self.truncated = False
+        self.load()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        if self.truncated:
+            # Start on a fresh line so the next record isn't glued to the partial one
+            self.file.write('\n')
+        self.synced_at = time.monotonic()
+    
+    @classmethod
+    def for_run(cls, run_id: str, directory: str = CHECKPOINT_DIR) -> 'ScrapeCheckpoint':
+        safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', str(run_id))
+        return cls(os.path.join(directory, f"{safe_id}.ndjson"))
+    
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self.truncated = not line.endswith('\n')
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping a truncated record in checkpoint {self.path}")
+                    continue
+                if record.get('type') == 'page':
+                    self.pages[(facets_key(record.get('facets')), record.get('search_text', ''), record['offset'])] = record
+                elif record.get('type') == 'job':
+                    self.jobs[record['path']] = record['job']
+        logger.info(f"Checkpoint {self.path}: {len(self.pages)} listing pages and {len(self.jobs)} jobs already done")
+    
+    def page(self, offset: int, limit: Optional[int] = None,
+             facets: Optional[Dict[str, List[str]]] = None, search_text: str = '') -> Optional[Dict[str, Any]]:
+        """A finished listing page at offset of one selection (fetched with the same page size, when given)"""
+        record = self.pages.get((facets_key(facets), search_text, offset))
+        if record and (limit is None or record['limit'] == limit):
+            self.stats['pages_restored'] += 1
+            return record
+        return None
+    
+    def job(self, path: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(path)
+        if job is not None:
+            with self.lock:
+                self.stats['jobs_restored'] += 1
+        return job
+    
+    def add_page(self, offset: int, limit: int, postings: List[Dict[str, Any]], total: Optional[int] = None,
+                 facets: Optional[Dict[str, List[str]]] = None, search_text: str = ''):
+        record = {'type': 'page', 'offset': offset, 'limit': limit, 'total': total, 'postings': postings}
+        if facets:
+            record['facets'] = facets
+        if search_text:
+            record['search_text'] = search_text
+        with self.lock:
+            self.pages[(facets_key(facets), search_text, offset)] = record
+        self._append(record, 'pages_written')
+    
+    def add_job(self, path: str, job: Dict[str, Any]):
+        self.jobs[path] = job
+        self._append({'type': 'job', 'path': path, 'job': job}, 'jobs_written')
+    
+    def _append(self, record: Dict[str, Any], stat: str):
+        line = json.dumps(record, ensure_ascii=False, separators=COMPACT_SEPARATORS) + '\n'
+        with self.lock:
+            if self.file.closed:
+                return  # A request that outlived a deadline stop finished after the run closed the file
+            # One write per record, flushed right away, so a crash loses at most the last line
+            self.file.write(line)
+            self.file.flush()
+            self.stats[stat] += 1
+            if time.monotonic() - self.synced_at >= self.sync_seconds:
+                os.fsync(self.file.fileno())
+                self.synced_at = time.monotonic()
+    
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+    
+    def summary(self) -> Dict[str, Any]:
+        return {'path': self.path, **self.stats}
+
+
+class NDJSONWriter:
+    """Writes newline-delimited JSON records to a local file, an open text stream, or S3
+    
+    S3 targets are spooled to a temporary file and uploaded on close, so only one
+    record is ever held in memory.
+    """
+    
+    def __init__(self, target: Any):
+        self.target = target
+        self.file = None
+        self.spool_path = None
+        self.records = 0
+        self.bytes = 0
+    
+    def __enter__(self):
+        if not isinstance(self.target, str):
+            self.file = self.target
+        elif self.target.startswith('s3://'):
+            import tempfile
+            fd, self.spool_path = tempfile.mkstemp(suffix='.ndjson', dir='/tmp' if os.path.isdir('/tmp') else None)
+            self.file = os.fdopen(fd, 'w', encoding='utf-8')
+        else:
+            directory = os.path.dirname(self.target)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.file = open(self.target, 'w', encoding='utf-8')
+        return self
+    
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        self.file.write(line)
+        self.records += 1
+        self.bytes += len(line.encode('utf-8'))
+    
+    def __exit__(self, exc_type, exc, tb):
+        if isinstance(self.target, str):
+            self.file.close()
+        if self.spool_path:
+            try:
+                if exc_type is None:
+                    import boto3  # Provided by the Lambda runtime
+                    bucket, _, key = self.target[len('s3://'):].partition('/')
+                    boto3.client('s3').upload_file(self.spool_path, bucket, key)
+            finally:
+                os.remove(self.spool_path)
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'uri': self.target if isinstance(self.target, str) else None,
+            'format': 'ndjson',
+            'records': self.records,
+            'bytes': self.bytes
         }
+
+
+# Where cleaned jobs go: the response body, or a file at the event's output location
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+OUTPUT_FORMATS = ('json', 'ndjson') + COLUMNAR_FORMATS
+# Rows buffered per record batch of a columnar export (bounds its memory)
+COLUMNAR_BATCH_SIZE = int(os.environ.get('COLUMNAR_BATCH_SIZE', '1000'))
+# Columns of every columnar export, whichever fields a run produced: the listing, details
+# API, description section and parsed fields, then the run-level ones
+JOB_COLUMNS = tuple(dict.fromkeys(LISTING_FIELDS + SUMMARY_FIELDS + DESCRIPTION_SECTIONS + PARSED_FIELDS)) + (
+    'source', 'content_hash', 'posted_on', 'scraped_at')
+JOB_SCHEMA_VERSION = '1'
+
+
+def job_arrow_schema():
+    """Arrow schema of columnar exports; columns are strings unless typed here"""
+    import pyarrow as pa
+    source = pa.struct([('host', pa.string()), ('tenant', pa.string()), ('site', pa.string())])
+    types = {
+        'can_apply': pa.bool_(),
+        'experience_years': pa.int32(),
+        'source': source,
+        'posted_on': pa.date32(),
+        'scraped_at': pa.timestamp('ms', tz='UTC'),
+    }
+    return pa.schema([pa.field(name, types.get(name, pa.string())) for name in JOB_COLUMNS],
+                     metadata={'schema_version': JOB_SCHEMA_VERSION, 'columns': 'job'})
+
+
+class ColumnarWriter:
+    """Writes cleaned jobs as a Parquet or Arrow IPC file to a local path, a binary stream, or S3
+    
+    Every file has the columns of job_arrow_schema, so daily exports can be scanned
+    together. Jobs are buffered into record batches of COLUMNAR_BATCH_SIZE rows, and
+    fields outside the schema (automation-id extras) are left out. The short details API
+    fields that clean_job_data drops (country codes, flags) are read from the raw job
+    stream passed through tap. S3 targets are spooled to a temporary file and uploaded
+    on close, like NDJSONWriter. Needs pyarrow.
+    """
+    
+    def __init__(self, target: Any, output_format: str = 'parquet', batch_size: int = COLUMNAR_BATCH_SIZE,
+                 fields: Optional[Iterable[str]] = None):
+        if output_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format: {output_format} (expected one of {', '.join(COLUMNAR_FORMATS)})")
+        self.target = target
+        self.output_format = output_format
+        self.batch_size = max(1, int(batch_size))
+        self.path = None
+        self.spool_path = None
+        self.writer = None
+        self.schema = None
+        self.rows = []
+        self.records = 0
+        self.bytes = 0
+        self.scraped_at = None
+        # Details API fields of the raw job being cleaned, and which of them the run requested
+        self.details = {}
+        self.detail_fields = [field for field in SUMMARY_FIELDS if not fields or field in fields]
+    
+    def __enter__(self):
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ValueError(f"output_format {self.output_format} needs pyarrow, which is not installed (attach a layer built from requirements-parquet.txt)") from e
+        if not isinstance(self.target, str):
+            sink = self.target
+        elif self.target.startswith('s3://'):
+            import tempfile
+            fd, self.spool_path = tempfile.mkstemp(suffix=f'.{self.output_format}', dir='/tmp' if os.path.isdir('/tmp') else None)
+            os.close(fd)
+            sink = self.path = self.spool_path
+        else:
+            directory = os.path.dirname(self.target)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            sink = self.path = self.target
+        self.schema = job_arrow_schema()
+        self.scraped_at = datetime.now(timezone.utc).replace(microsecond=0)
+        if self.output_format == 'parquet':
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(sink, self.schema, compression='zstd')
+        else:
+            self.writer = pa.ipc.new_file(sink, self.schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+        return self
+    
+    def tap(self, jobs):
+        """Pass a raw job stream (sync or async) through, keeping the details API fields of each job"""
+        if hasattr(jobs, '__aiter__'):
+            async def tapped():
+                async for job in jobs:
+                    self.keep_details(job)
+                    yield job
+            return tapped()
+        def tapped_sync():
+            for job in jobs:
+                self.keep_details(job)
+                yield job
+        return tapped_sync()
+    
+    def keep_details(self, job: Dict[str, Any]):
+        self.details = {'job_id': str(job.get('job_id') or '').strip()}
+        for field in self.detail_fields:
+            value = job.get(field)
+            if isinstance(value, bool):
+                self.details[field] = value
+            elif value is not None and str(value).strip():
+                self.details[field] = str(value).strip()
+    
+    def row(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Columns of a cleaned job, with the details API fields of its raw job filling the gaps"""
+        row = {name: record.get(name) for name in JOB_COLUMNS}
+        if self.details.get('job_id') == (record.get('job_id') or ''):
+            for field in self.detail_fields:
+                if row[field] is None:
+                    row[field] = self.details.get(field)
+        if row['experience_years'] is not None:
+            row['experience_years'] = int(row['experience_years'])
+        posted_on = posted_on_date(record.get('posted_date'), self.scraped_at)
+        row['posted_on'] = datetime.strptime(posted_on, '%Y-%m-%d').date() if posted_on else None
+        row['scraped_at'] = self.scraped_at
+        return row
+    
+    def write(self, record: Dict[str, Any]):
+        self.rows.append(self.row(record))
+        self.records += 1
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if self.rows:
+            import pyarrow as pa
+            self.writer.write_batch(pa.RecordBatch.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+    
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.flush()
+            self.writer.close()
+            if self.path:
+                self.bytes = os.path.getsize(self.path)
+            elif hasattr(self.target, 'tell'):
+                self.bytes = self.target.tell()
+            if self.spool_path and exc_type is None:
+                import boto3  # Provided by the Lambda runtime
+                bucket, _, key = self.target[len('s3://'):].partition('/')
+                boto3.client('s3').upload_file(self.spool_path, bucket, key)
+        finally:
+            if self.spool_path:
+                os.remove(self.spool_path)
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'uri': self.target if isinstance(self.target, str) else None,
+            'format': self.output_format,
+            'records': self.records,
+            'bytes': self.bytes,
+            'schema_version': JOB_SCHEMA_VERSION
+        }
+
+
+# Embedded SQLite job store for indexed lookups; off unless a path or s3:// URI is given
+JOB_STORE_URI = os.environ.get('JOB_STORE_URI', '')
+# Upserts per transaction while a run writes to the job store
+JOB_STORE_COMMIT_EVERY = 500
+DEFAULT_QUERY_LIMIT = 50
+US_STATE_CODES = {
+    'alabama': 'AL', 'alaska': 'AK', 'arizona': 'AZ', 'arkansas': 'AR', 'california': 'CA', 'colorado': 'CO',
+    'connecticut': 'CT', 'delaware': 'DE', 'district of columbia': 'DC', 'florida': 'FL', 'georgia': 'GA',
+    'hawaii': 'HI', 'idaho': 'ID', 'illinois': 'IL', 'indiana': 'IN', 'iowa': 'IA', 'kansas': 'KS',
+    'kentucky': 'KY', 'louisiana': 'LA', 'maine': 'ME', 'maryland': 'MD', 'massachusetts': 'MA',
+    'michigan': 'MI', 'minnesota': 'MN', 'mississippi': 'MS', 'missouri': 'MO', 'montana': 'MT',
+    'nebraska': 'NE', 'nevada': 'NV', 'new hampshire': 'NH', 'new jersey': 'NJ', 'new mexico': 'NM',
+    'new york': 'NY', 'north carolina': 'NC', 'north dakota': 'ND', 'ohio': 'OH', 'oklahoma': 'OK',
+    'oregon': 'OR', 'pennsylvania': 'PA', 'rhode island': 'RI', 'south carolina': 'SC', 'south dakota': 'SD',
+    'tennessee': 'TN', 'texas': 'TX', 'utah': 'UT', 'vermont': 'VT', 'virginia': 'VA', 'washington': 'WA',
+    'west virginia': 'WV', 'wisconsin': 'WI', 'wyoming': 'WY'
+}
+LOCATION_STATE_PATTERN = re.compile(r',\s*([A-Z]{2})$')
+
+
+def location_state(location: Optional[str]) -> Optional[str]:
+    """Two-letter state code of a 'City, ST' location"""
+    match = LOCATION_STATE_PATTERN.search((location or '').strip())
+    return match.group(1) if match else None
+
+
+def normalize_clearance(clearance: Optional[str]) -> Optional[str]:
+    """Canonical clearance name: TS/SCI (with polygraph), Top Secret, Secret or Public Trust"""
+    text = ' '.join((clearance or '').lower().split())
+    if not text:
+        return None
+    if 'sci' in text:
+        level = 'TS/SCI'
+    elif 'top secret' in text:
+        level = 'Top Secret'
+    elif 'secret' in text:
+        level = 'Secret'
+    elif 'public trust' in text:
+        return 'Public Trust'
+    else:
+        return clearance.strip()
+    return f"{level} with polygraph" if 'poly' in text else level
+
+
+def posted_on_date(posted_date: Optional[str], scraped: datetime) -> Optional[str]:
+    """ISO date a relative Workday 'Posted N Days Ago' label points at"""
+    days = posted_days_ago(posted_date)
+    return None if days is None else (scraped - timedelta(days=days)).date().isoformat()
+
+
+def fts_phrase_query(text: str) -> str:
+    """FTS5 query matching every word of free text, each quoted so punctuation like TS/SCI is safe"""
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class JobStore:
+    """SQLite database of cleaned jobs with full-text and structured indexes
+    
+    Jobs are upserted by job_key while a run streams them; a job whose content_hash is
+    unchanged only has its last-seen run updated. title and the description sections
+    are indexed with FTS5, and location, state, clearance, experience, job type and
+    posting date with B-trees, so hard-constraint lookups never scan the table. s3://
+    URIs are downloaded to /tmp when opened and uploaded again when a run closes them.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            job_key TEXT NOT NULL UNIQUE,
+            source TEXT NOT NULL DEFAULT '',
+            title TEXT,
+            url TEXT,
+            location TEXT COLLATE NOCASE,
+            state TEXT,
+            security_clearance TEXT COLLATE NOCASE,
+            experience_years INTEGER,
+            job_type TEXT COLLATE NOCASE,
+            posted_on TEXT,
+            content_hash TEXT,
+            first_seen TEXT,
+            last_seen TEXT,
+            last_run TEXT,
+            job TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_location ON jobs (location);
+        CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+        CREATE INDEX IF NOT EXISTS jobs_security_clearance ON jobs (security_clearance);
+        CREATE INDEX IF NOT EXISTS jobs_experience_years ON jobs (experience_years);
+        CREATE INDEX IF NOT EXISTS jobs_job_type ON jobs (job_type);
+        CREATE INDEX IF NOT EXISTS jobs_posted_on ON jobs (posted_on);
+        CREATE INDEX IF NOT EXISTS jobs_source_run ON jobs (source, last_run);
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5 (title, description, tokenize = 'porter unicode61');
+    """
+    FTS_FIELDS = ('description', 'responsibilities', 'qualifications')
+    
+    def __init__(self, uri: str):
+        self.uri = uri
+        self.path = uri
+        self.connection = None
+        self.run = None
+        self.pending = 0
+        self.stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    
+    def open(self, download: bool = True) -> 'JobStore':
+        import sqlite3
+        if self.uri.startswith('s3://'):
+            self.path = os.path.join('/tmp', 'bah_job_store_' + content_digest(self.uri)[:16] + '.db')
+            if download:
+                self.download()
+        else:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(self.SCHEMA)
+        return self
+    
+    def s3_location(self):
+        bucket, _, key = self.uri[len('s3://'):].partition('/')
+        return bucket, key
+    
+    def download(self):
+        import boto3  # Provided by the Lambda runtime
+        from botocore.exceptions import ClientError
+        bucket, key = self.s3_location()
+        try:
+            boto3.client('s3').download_file(bucket, key, self.path)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey'):
+                raise
+            logger.info(f"No job store at {self.uri}, starting an empty one")
+    
+    def __enter__(self):
+        return self.open() if self.connection is None else self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close(upload=exc_type is None)
+    
+    def write(self, job: Dict[str, Any]):
+        """Upsert one cleaned job"""
+        if self.run is None:
+            self.run = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        key = job_key(job)
+        source = job.get('source')
+        row = self.connection.execute('SELECT id, content_hash FROM jobs WHERE job_key = ?', (key,)).fetchone()
+        if row and row['content_hash'] == job.get('content_hash'):
+            self.connection.execute('UPDATE jobs SET last_seen = ?, last_run = ? WHERE id = ?', (self.run, self.run, row['id']))
+            self.stats['unchanged'] += 1
+        else:
+            values = {
+                'job_key': key,
+                'source': f"{source['tenant']}/{source['site']}" if source else '',
+                'title': job.get('title'),
+                'url': job.get('url'),
+                'location': job.get('location'),
+                'state': location_state(job.get('location')),
+                'security_clearance': normalize_clearance(job.get('security_clearance')),
+                'experience_years': int(job['experience_years']) if str(job.get('experience_years') or '').isdigit() else None,
+                'job_type': job.get('job_type'),
+                'posted_on': posted_on_date(job.get('posted_date'), datetime.now(timezone.utc)),
+                'content_hash': job.get('content_hash'),
+                'last_seen': self.run,
+                'last_run': self.run,
+                'job': json.dumps(job, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+            }
+            if row:
+                assignments = ', '.join(f"{column} = :{column}" for column in values)
+                self.connection.execute(f"UPDATE jobs SET {assignments} WHERE id = :id", {**values, 'id': row['id']})
+                self.connection.execute('DELETE FROM jobs_fts WHERE rowid = ?', (row['id'],))
+                rowid = row['id']
+                self.stats['updated'] += 1
+            else:
+                columns = ', '.join(values) + ', first_seen'
+                placeholders = ', '.join(f":{column}" for column in values) + ', :last_seen'
+                rowid = self.connection.execute(f"INSERT INTO jobs ({columns}) VALUES ({placeholders})", values).lastrowid
+                self.stats['inserted'] += 1
+            description = '\n'.join(job[field] for field in self.FTS_FIELDS if job.get(field))
+            self.connection.execute('INSERT INTO jobs_fts (rowid, title, description) VALUES (?, ?, ?)',
+                                    (rowid, job.get('title'), description))
+        self.pending += 1
+        if self.pending >= JOB_STORE_COMMIT_EVERY:
+            self.connection.commit()
+            self.pending = 0
+    
+    def sink(self, sink):
+        """Wrap a sink so every job passing through it is stored as well"""
+        def write(job):
+            self.write(job)
+            sink(job)
+        return write
+    
+    def finish(self, complete: bool, sources: Iterable[str] = ('',)):
+        """Commit the run; after a run that saw the whole catalog, drop jobs of its sources it didn't see"""
+        if complete and self.run:
+            placeholders = ', '.join('?' for _ in sources)
+            stale = [row['id'] for row in self.connection.execute(
+                f"SELECT id FROM jobs WHERE source IN ({placeholders}) AND last_run != ?", (*sources, self.run))]
+            for start in range(0, len(stale), 500):
+                batch = stale[start:start + 500]
+                marks = ', '.join('?' for _ in batch)
+                self.connection.execute(f"DELETE FROM jobs_fts WHERE rowid IN ({marks})", batch)
+                self.connection.execute(f"DELETE FROM jobs WHERE id IN ({marks})", batch)
+            self.stats['deleted'] += len(stale)
+        self.connection.commit()
+        self.pending = 0
+    
+    def close(self, upload: bool = True):
+        if self.connection is None:
+            return
+        self.connection.commit()
+        self.connection.close()
+        self.connection = None
+        if upload and self.run and self.uri.startswith('s3://'):
+            import boto3  # Provided by the Lambda runtime
+            bucket, key = self.s3_location()
+            boto3.client('s3').upload_file(self.path, bucket, key)
+    
+    def query(self, text: Optional[str] = None, location: Optional[str] = None, clearance: Optional[str] = None,
+              min_experience: Optional[int] = None, max_experience: Optional[int] = None, job_type: Optional[str] = None,
+              posted_within_days: Optional[int] = None, source: Optional[str] = None,
+              limit: int = DEFAULT_QUERY_LIMIT) -> List[Dict[str, Any]]:
+        """Stored jobs matching every given filter, best text matches (or newest postings) first
         
-        # Add location details if available
-        job_location = job_posting_info.get('jobRequisitionLocation', {})
-        if job_location:
-            details['detailed_location'] = job_location.get('descriptor')
-            country = job_location.get('country', {})
-            if country:
-                details['country'] = country.get('descriptor')
-                details['country_code'] = country.get('alpha2Code')
-        
-        # Add hiring organization
-        hiring_org = job_data.get('hiringOrganization', {})
-        if hiring_org:
-            details['hiring_organization'] = hiring_org.get('name')
-            details['organization_url'] = hiring_org.get('url')
-        
-        # Clean up the description to extract structured information
-        description = details.get('description', '')
-        if description:
-            details.update(self.parse_job_description(description))
+        location matches a state name or code ('Virginia', 'VA') or the start of the location
+        ('McLean'); clearance matches the canonical level with or without polygraph ('TS/SCI'
+        also finds 'TS/SCI with polygraph'); the experience bounds apply to the required years.
+        """
+        clauses, params = [], []
+        if location:
+            state = US_STATE_CODES.get(location.strip().lower()) or (location.strip().upper() if len(location.strip()) == 2 else None)
+            if state:
+                clauses.append('jobs.state = ?')
+                params.append(state)
+            else:
+                clauses.append('jobs.location LIKE ?')
+                params.append(location.strip() + '%')
+        if clearance:
+            clauses.append('jobs.security_clearance LIKE ?')
+            params.append((normalize_clearance(clearance) or clearance) + '%')
+        if min_experience is not None:
+            clauses.append('jobs.experience_years >= ?')
+            params.append(int(min_experience))
+        if max_experience is not None:
+            clauses.append('jobs.experience_years <= ?')
+            params.append(int(max_experience))
+        if job_type:
+            clauses.append('jobs.job_type = ?')
+            params.append(job_type)
+        if posted_within_days is not None:
+            clauses.append('jobs.posted_on >= ?')
+            params.append((datetime.now(timezone.utc) - timedelta(days=int(posted_within_days))).date().isoformat())
+        if source:
+            clauses.append('jobs.source = ?')
+            params.append(source)
         
-        return {k: v for k, v in details.items() if v is not None and v != ''}
+        if text and text.split():
+            sql = 'SELECT jobs.job FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid WHERE jobs_fts MATCH ?'
+            params.insert(0, fts_phrase_query(text))
+            order = 'ORDER BY bm25(jobs_fts)'
+        else:
+            sql = 'SELECT jobs.job FROM jobs WHERE 1 = 1'
+            order = 'ORDER BY jobs.posted_on DESC, jobs.id'
+        sql = ' '.join([sql, *(f"AND {clause}" for clause in clauses), order, 'LIMIT ?'])
+        return [json.loads(row['job']) for row in self.connection.execute(sql, (*params, int(limit)))]
     
-    def parse_job_description(self, description: str) -> Dict[str, Any]:
-        """Parse structured information from job description HTML"""
-        # Remove HTML tags for text analysis
-        import re
-        
-        # Extract salary information
-        salary_patterns = [
-            r'\$[\d,]+(?:\.\d{2})?\s*(?:to|\-)\s*\$[\d,]+(?:\.\d{2})?',
-            r'\$[\d,]+(?:\.\d{2})?(?:\s*(?:annually|per year|\/year))?'
-        ]
-        
-        salary_info = None
-        for pattern in salary_patterns:
-            match = re.search(pattern, description, re.IGNORECASE)
-            if match:
-                salary_info = match.group(0)
-                break
-        
-        # Extract clearance requirements
-        clearance_patterns = [
-            r'TS\/SCI(?:\s+with\s+(?:poly|polygraph))?',
-            r'Top\s+Secret(?:\/SCI)?(?:\s+with\s+(?:poly|polygraph))?',
-            r'Secret(?:\s+clearance)?',
-            r'Public\s+Trust',
-        ]
-        
-        clearance_info = None
-        for pattern in clearance_patterns:
-            match = re.search(pattern, description, re.IGNORECASE)
-            if match:
-                clearance_info = match.group(0)
-                break
+    def count(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+    
+    def summary(self) -> Dict[str, Any]:
+        return {'uri': self.uri, **self.stats}
+
+
+QUERY_FILTERS = ('text', 'location', 'clearance', 'min_experience', 'max_experience', 'job_type',
+                 'posted_within_days', 'source', 'limit')
+
+
+def query_job_store(uri: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one query against a job store: the matching jobs plus how long the lookup took"""
+    unknown = sorted(set(filters) - set(QUERY_FILTERS))
+    if unknown:
+        raise ValueError(f"Unknown query filters: {', '.join(unknown)} (expected {', '.join(QUERY_FILTERS)})")
+    if not uri.startswith('s3://') and not os.path.exists(uri):
+        raise ValueError(f"No job store at {uri}")
+    with JobStore(uri) as store:
+        started = time.perf_counter()
+        jobs = store.query(**{key: value for key, value in filters.items() if value is not None})
+        query_ms = round((time.perf_counter() - started) * 1000, 2)
+        stored = store.count()
+    return {'jobs': jobs, 'query_ms': query_ms, 'stored_jobs': stored}
+
+
+def iter_clean_jobs(jobs: Iterable[Dict[str, Any]], metrics: Optional[ScrapeMetrics] = None) -> Iterator[Dict[str, Any]]:
+    """Clean and validate jobs one at a time, skipping invalid ones"""
+    for job in jobs:
+        started = time.perf_counter()
+        cleaned_job = clean_job_data(job)
+        if metrics:
+            metrics.add_phase('cleaning', time.perf_counter() - started)
+        if cleaned_job:
+            yield cleaned_job
+
+
+class TargetScheduler:
+    """Scrapes several Workday targets at once and merges their jobs into one stream
+    
+    Each target has its own scraper, so it keeps its own listing state, checkpoint and
+    metrics, while scrapers on the same host share that host's adaptive rate limiter.
+    All of them draw from one pool of request slots, which caps the requests in flight
+    across the whole invocation. Jobs are tagged with the source they came from; a
+    target that fails is reported in the summary while the others carry on.
+    """
+    
+    def __init__(self, scrapers: List[BAHJobScraper], global_concurrency: int = GLOBAL_CONCURRENCY):
+        self.scrapers = scrapers
+        self.global_concurrency = max(1, int(global_concurrency))
+        self.counts = [0] * len(scrapers)
+        self.errors = [None] * len(scrapers)
+    
+    def record_error(self, index: int, error: Exception):
+        self.errors[index] = f"{type(error).__name__}: {error}"
+        logger.error(f"Target {self.scrapers[index].jobs_api_url} failed: {error}", exc_info=True)
+    
+    def iter_jobs(self, **scrape_options) -> Iterator[Dict[str, Any]]:
+        """Run every target's iter_jobs on its own thread, yielding jobs as they arrive"""
+        slots = threading.BoundedSemaphore(self.global_concurrency)
+        jobs = queue.Queue(maxsize=TARGET_QUEUE_SIZE)
+        stopped = threading.Event()
+        done = object()
         
-        # Extract experience requirements
-        exp_pattern = r'(\d+)\+?\s*years?\s+of\s+(?:experience|exp)'
-        exp_match = re.search(exp_pattern, description, re.IGNORECASE)
-        experience_years = exp_match.group(1) if exp_match else None
+        def offer(item) -> bool:
+            while not stopped.is_set():
+                try:
+                    jobs.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
         
-        parsed_info = {}
-        if salary_info:
-            parsed_info['salary_range'] = salary_info
-        if clearance_info:
-            parsed_info['security_clearance'] = clearance_info
-        if experience_years:
-            parsed_info['experience_years'] = experience_years
+        def run(index: int, scraper: BAHJobScraper):
+            scraper.request_slots = slots
+            try:
+                for job in scraper.iter_jobs(**scrape_options):
+                    job['source'] = scraper.source
+                    self.counts[index] += 1
+                    if not offer(job):
+                        return
+            except Exception as e:
+                self.record_error(index, e)
+            finally:
+                offer(done)
         
-        return parsed_info
+        workers = [threading.Thread(target=run, args=(index, scraper), daemon=True)
+                   for index, scraper in enumerate(self.scrapers)]
+        for worker in workers:
+            worker.start()
+        try:
+            remaining = len(workers)
+            while remaining:
+                item = jobs.get()
+                if item is done:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            stopped.set()
     
-    def scrape_all_jobs(self, max_jobs: Optional[int] = None, include_details: bool = True) -> List[Dict[str, Any]]:
-        """Main method to scrape all jobs with optional detailed information"""
-        logger.info(f"Starting job scraping: max_jobs={max_jobs}, include_details={include_details}")
-        
-        # Get all job listings
-        job_listings = self.get_all_job_listings(max_jobs=max_jobs)
-        logger.info(f"Found {len(job_listings)} job listings")
+    async def aiter_jobs(self, **scrape_options) -> AsyncIterator[Dict[str, Any]]:
+        """Run every target's iter_jobs as a task on the running event loop, yielding jobs as they arrive"""
+        slots = asyncio.Semaphore(self.global_concurrency)
+        jobs = asyncio.Queue(maxsize=TARGET_QUEUE_SIZE)
+        done = object()
         
-        if not include_details:
-            # Return basic job info only
-            return [self.extract_basic_job_info(job) for job in job_listings]
+        async def run(index: int, scraper: AsyncBAHJobScraper):
+            scraper.request_slots = slots
+            try:
+                async for job in scraper.iter_jobs(**scrape_options):
+                    job['source'] = scraper.source
+                    self.counts[index] += 1
+                    await jobs.put(job)
+            except Exception as e:
+                self.record_error(index, e)
+            finally:
+                await jobs.put(done)
         
-        # Get detailed information for each job
-        complete_jobs = []
+        tasks = [asyncio.ensure_future(run(index, scraper)) for index, scraper in enumerate(self.scrapers)]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await jobs.get()
+                if item is done:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def failed(self) -> bool:
+        return any(self.errors)
+    
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-target block for the response metadata"""
+        targets = []
+        for scraper, count, error in zip(self.scrapers, self.counts, self.errors):
+            requests_summary = scraper.metrics.summary()['requests']
+            target = {
+                **scraper.source,
+                'source_url': scraper.jobs_api_url,
+                'success': error is None,
+                'jobs_count': count,
+                'listing_total': scraper.last_listing_total,
+                'requests': {key: requests_summary[key] for key in ('attempts', 'retries', 'failed')}
+            }
+            if error:
+                target['error'] = error
+            if scraper.facet_partitions is not None:
+                target['facet_partitions'] = len(scraper.facet_partitions)
+            if scraper.search_summary is not None:
+                target['search'] = scraper.search_summary
+            if scraper.checkpoint:
+                target['checkpoint'] = scraper.checkpoint.summary()
+            targets.append(target)
+        return targets
+
+
+def timed_sink(sink, metrics: ScrapeMetrics, phase: str):
+    """Wrap a sink so the time spent in it is added to a metrics phase"""
+    def write(record):
+        started = time.perf_counter()
+        sink(record)
+        metrics.add_phase(phase, time.perf_counter() - started)
+    return write
+
+
+def projected_sink(sink, fields: Optional[Iterable[str]] = None):
+    """Wrap a cleaned-job sink so it receives only the requested fields of each job"""
+    if not fields:
+        return sink
+    def write(job):
+        sink(project_job(job, fields))
+    return write
+
+
+def drain_async_jobs(jobs: AsyncIterator[Dict[str, Any]], sink, metrics: Optional[ScrapeMetrics] = None) -> int:
+    """Run an async job stream to completion, cleaning each job and passing it to sink"""
+    async def consume():
+        count = 0
+        async for job in jobs:
+            started = time.perf_counter()
+            cleaned_job = clean_job_data(job)
+            if metrics:
+                metrics.add_phase('cleaning', time.perf_counter() - started)
+            if cleaned_job:
+                sink(cleaned_job)
+                count += 1
+        return count
+    return asyncio.run(consume())
+
+
+# Chunking mirrors the JobTextSplitter n8n node so chunks can be produced next to the data
+CHUNKING_STRATEGIES = ('bySection', 'byCharacter', 'byToken', 'hybrid')
+DEFAULT_CHUNK_METADATA_FIELDS = ['job_id', 'title', 'location', 'job_type']
+# tiktoken encoding used for token counts; without tiktoken tokens are estimated at ~4 chars each
+CHUNK_TOKEN_ENCODING = os.environ.get('CHUNK_TOKEN_ENCODING', 'cl100k_base')
+# How tokens are counted: 'auto' uses tiktoken and falls back to the estimate when it is
+# unavailable, 'tiktoken' fails instead of falling back, 'estimate' never loads tiktoken
+TOKEN_COUNTERS = ('auto', 'tiktoken', 'estimate')
+CHUNK_TOKEN_COUNTER = os.environ.get('CHUNK_TOKEN_COUNTER', 'auto')
+CHARS_PER_TOKEN_ESTIMATE = 4
+CHUNK_SECTIONS = [
+    ('title', 'Job Title', 1),
+    ('description', 'Job Description', 2),
+    ('qualifications', 'Qualifications', 3),
+    ('responsibilities', 'Responsibilities', 3),
+    ('requirements', 'Requirements', 3),
+    ('benefits', 'Benefits', 4),
+    ('experience_level', 'Experience Level', 2),
+    ('department', 'Department', 4),
+]
+CHUNK_CONTENT_FIELDS = ['title', 'description', 'qualifications', 'responsibilities',
+                        'requirements', 'experience_level', 'benefits', 'department']
+CHUNK_FALLBACK_SKIP_FIELDS = ('job_id', 'url', 'posted_date', 'external_path')
+
+_token_encoders = {}
+
+
+def get_token_encoder(name: str = CHUNK_TOKEN_ENCODING):
+    """Shared tiktoken encoder, or None when tiktoken (or its encoding data) is unavailable"""
+    if name not in _token_encoders:
+        try:
+            import tiktoken
+            _token_encoders[name] = tiktoken.get_encoding(name)
+        except Exception as e:
+            logger.warning(f"tiktoken encoding {name} unavailable, estimating token counts: {e}")
+            _token_encoders[name] = None
+    return _token_encoders[name]
+
+
+class JobChunker:
+    """Splits cleaned jobs into ready-to-embed chunks
+    
+    Strategies, options and chunk layout follow the JobTextSplitter node. maxChunkSize and
+    chunkOverlap are characters for byCharacter/hybrid and tokens for byToken, which counts
+    real tokens with tiktoken unless token_counter says otherwise (see TOKEN_COUNTERS).
+    """
+    
+    def __init__(self, strategy: str = 'hybrid', max_chunk_size: int = 1000, chunk_overlap: int = 200,
+                 include_metadata: bool = True, metadata_fields: Optional[List[str]] = None,
+                 preserve_context: bool = True, add_chunk_index: bool = True,
+                 token_encoding: str = CHUNK_TOKEN_ENCODING, token_counter: str = CHUNK_TOKEN_COUNTER):
+        if strategy not in CHUNKING_STRATEGIES:
+            raise ValueError(f"Unknown splitting strategy: {strategy} (expected one of {', '.join(CHUNKING_STRATEGIES)})")
+        if max_chunk_size <= 0 or chunk_overlap < 0 or chunk_overlap >= max_chunk_size:
+            raise ValueError("chunking requires maxChunkSize > 0 and 0 <= chunkOverlap < maxChunkSize")
+        if token_counter not in TOKEN_COUNTERS:
+            raise ValueError(f"Unknown tokenCounter: {token_counter} (expected one of {', '.join(TOKEN_COUNTERS)})")
+        self.strategy = strategy
+        self.max_chunk_size = max_chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.include_metadata = include_metadata
+        self.metadata_fields = DEFAULT_CHUNK_METADATA_FIELDS if metadata_fields is None else metadata_fields
+        self.preserve_context = preserve_context
+        self.add_chunk_index = add_chunk_index
+        self.encoder = None if token_counter == 'estimate' else get_token_encoder(token_encoding)
+        if token_counter == 'tiktoken' and not self.encoder:
+            raise ValueError(f"tokenCounter 'tiktoken' needs the tiktoken package and its {token_encoding} encoding")
+        self.token_counter = f"tiktoken:{token_encoding}" if self.encoder else 'estimate'
+        self.jobs = 0
+        self.chunks = 0
+        self.tokens = 0
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'JobChunker':
+        """Build a chunker from the event's chunking block (node parameter names)"""
+        return cls(
+            strategy=config.get('strategy', 'hybrid'),
+            max_chunk_size=int(config.get('maxChunkSize', 1000)),
+            chunk_overlap=int(config.get('chunkOverlap', 200)),
+            include_metadata=config.get('includeMetadata', True),
+            metadata_fields=config.get('metadataFields'),
+            preserve_context=config.get('preserveContext', True),
+            add_chunk_index=config.get('addChunkIndex', True),
+            token_encoding=config.get('tokenEncoding', CHUNK_TOKEN_ENCODING),
+            token_counter=config.get('tokenCounter', CHUNK_TOKEN_COUNTER),
+        )
+    
+    def count_tokens(self, text: str) -> int:
+        if self.encoder:
+            return len(self.encoder.encode(text, disallowed_special=()))
+        return -(-len(text) // CHARS_PER_TOKEN_ESTIMATE)
+    
+    def chunk_job(self, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Split one cleaned job into chunk items ({content, metadata, source, original_job_id})"""
+        metadata = {}
+        if self.include_metadata:
+            metadata = {field: job[field] for field in self.metadata_fields if job.get(field) not in (None, '')}
         
-        for i, job in enumerate(job_listings):
-            try:
-                logger.info(f"Processing job {i+1}/{len(job_listings)}: {job.get('title', 'Unknown')}")
-                
-                # Start with basic info
-                basic_info = self.extract_basic_job_info(job)
-                
-                # Get detailed information
-                if job.get('externalPath'):
-                    job_details = self.get_job_details(job['externalPath'])
-                    if job_details:
-                        detailed_info = self.extract_job_details_from_api(job_details)
-                        # Merge basic and detailed info
-                        complete_job = {**basic_info, **detailed_info}
-                        complete_jobs.append(complete_job)
-                    else:
-                        logger.warning(f"No details found for job: {job.get('title')}")
-                        complete_jobs.append(basic_info)
+        if self.strategy == 'bySection':
+            chunks = self.split_by_section(job, metadata)
+        elif self.strategy == 'byCharacter':
+            chunks = self.chunk_text(self.build_full_content(job), self.max_chunk_size, self.chunk_overlap, metadata)
+        elif self.strategy == 'byToken':
+            chunks = self.split_by_token(job, metadata)
+        else:
+            chunks = []
+            for chunk in self.split_by_section(job, metadata):
+                if len(chunk['content']) <= self.max_chunk_size:
+                    chunks.append(chunk)
                 else:
-                    logger.warning(f"No external path for job: {job.get('title')}")
-                    complete_jobs.append(basic_info)
-                
-                # Add delay between requests to be respectful
-                if i < len(job_listings) - 1:  # Don't delay after the last job
-                    time.sleep(0.5)
-                    
-            except Exception as e:
-                logger.error(f"Error processing job {job.get('title', 'Unknown')}: {str(e)}")
-                # Still add the basic job info even if details fail
-                basic_info = self.extract_basic_job_info(job)
-                complete_jobs.append(basic_info)
+                    chunks.extend(self.chunk_text(chunk['content'], self.max_chunk_size, self.chunk_overlap, chunk['metadata']))
         
-        return complete_jobs
+        items = []
+        for index, chunk in enumerate(chunks):
+            chunk_metadata = chunk['metadata']
+            if 'token_count' not in chunk_metadata:
+                chunk_metadata['token_count'] = self.count_tokens(chunk['content'])
+            if self.add_chunk_index:
+                chunk_metadata['chunk_index'] = index + 1
+                chunk_metadata['total_chunks'] = len(chunks)
+            self.tokens += chunk_metadata['token_count']
+            items.append({
+                'id': f"{job_key(job)}#{index + 1}",
+                'content_hash': content_digest(chunk['content']),
+                'content': chunk['content'],
+                'metadata': chunk_metadata,
+                'source': 'job_text_splitter',
+                'original_job_id': job.get('job_id') or job.get('id'),
+            })
+        self.jobs += 1
+        self.chunks += len(items)
+        return items
     
-    def extract_basic_job_info(self, job: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract basic job information from job listing"""
+    def split_by_section(self, job: Dict[str, Any], metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+        prefix = self.build_context_prefix(job) if self.preserve_context else ''
+        chunks = []
+        for key, label, priority in CHUNK_SECTIONS:
+            content = job.get(key)
+            if isinstance(content, str) and content.strip():
+                chunks.append({
+                    'content': f"{prefix}{label}: {content.strip()}",
+                    'metadata': {**metadata, 'section': key, 'section_label': label, 'section_priority': priority},
+                })
+        if not chunks:
+            fallback = self.build_fallback_content(job)
+            if fallback:
+                chunks.append({
+                    'content': prefix + fallback,
+                    'metadata': {**metadata, 'section': 'combined', 'section_label': 'Combined Content'},
+                })
+        return chunks
+    
+    def split_by_token(self, job: Dict[str, Any], metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+        content = self.build_full_content(job)
+        if not self.encoder:
+            return self.chunk_text(content, self.max_chunk_size * CHARS_PER_TOKEN_ESTIMATE,
+                                   self.chunk_overlap * CHARS_PER_TOKEN_ESTIMATE, metadata)
+        
+        # Window over the token sequence, preferring to end a window on a sentence or
+        # paragraph boundary in its second half, the same way chunk_text does for characters
+        tokens = self.encoder.encode(content, disallowed_special=())
+        max_tokens, overlap = self.max_chunk_size, self.chunk_overlap
+        chunks = []
+        start = 0
+        while start < len(tokens):
+            end = min(start + max_tokens, len(tokens))
+            if end < len(tokens):
+                for index in range(end - 1, start + max_tokens // 2, -1):
+                    piece = self.encoder.decode_single_token_bytes(tokens[index])
+                    if piece.rstrip().endswith(b'.') or b'\n\n' in piece:
+                        end = index + 1
+                        break
+            text = self.encoder.decode(tokens[start:end]).strip()
+            if text:
+                chunks.append({'content': text, 'metadata': {
+                    **metadata, 'chunk_size': len(text), 'token_count': end - start, 'sub_chunk_index': len(chunks)}})
+            if end >= len(tokens):
+                break
+            start = max(start + 1, end - overlap)
+        return chunks
+    
+    def chunk_text(self, text: str, max_size: int, overlap: int, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Character windows that prefer to break at a sentence or paragraph boundary"""
+        if len(text) <= max_size:
+            return [{'content': text, 'metadata': dict(metadata)}]
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = start + max_size
+            if end < len(text):
+                break_point = max(text.rfind('.', 0, end + 1), text.rfind('\n\n', 0, end + 2))
+                if break_point > start + max_size / 2:
+                    end = break_point + 1
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append({'content': chunk, 'metadata': {
+                    **metadata, 'chunk_size': len(chunk), 'sub_chunk_index': len(chunks)}})
+            if end >= len(text):
+                break
+            start = max(start + 1, end - overlap)
+        return chunks
+    
+    def build_context_prefix(self, job: Dict[str, Any]) -> str:
+        title = job.get('title') or 'Job Position'
+        location = job.get('location') or ''
+        return f"Job posting for {title}{f' in {location}' if location else ''} at Booz Allen Hamilton. "
+    
+    def build_full_content(self, job: Dict[str, Any]) -> str:
+        parts = [self.build_context_prefix(job)] if self.preserve_context else []
+        for field in CHUNK_CONTENT_FIELDS:
+            content = job.get(field)
+            if isinstance(content, str) and content.strip():
+                parts.append(f"{field.replace('_', ' ', 1).upper()}: {content.strip()}")
+        if len(parts) <= (1 if self.preserve_context else 0):
+            fallback = self.build_fallback_content(job)
+            if fallback:
+                parts.append(fallback)
+        return '\n\n'.join(parts)
+    
+    def build_fallback_content(self, job: Dict[str, Any]) -> str:
+        return '\n'.join(
+            f"{key.replace('_', ' ', 1)}: {value.strip()}" for key, value in job.items()
+            if isinstance(value, str) and len(value.strip()) > 10 and key not in CHUNK_FALLBACK_SKIP_FIELDS
+        )
+    
+    def fingerprint(self) -> Dict[str, Any]:
+        """Options that determine chunk boundaries; chunks are only comparable across runs when these match"""
         return {
-            'title': job.get('title', ''),
-            'location': job.get('locationsText', ''),
-            'posted_date': job.get('postedOn', ''),
-            'job_id': job.get('bulletFields', [None])[0],
-            'external_path': job.get('externalPath', ''),
-            'url': f"https://bah.wd1.myworkdayjobs.com/en-US/BAH_Jobs{job.get('externalPath', '')}" if job.get('externalPath') else None
+            'strategy': self.strategy,
+            'max_chunk_size': self.max_chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'include_metadata': self.include_metadata,
+            'metadata_fields': list(self.metadata_fields),
+            'preserve_context': self.preserve_context,
+            'token_counter': self.token_counter
+        }
+    
+    def sink(self, sink):
+        """Wrap a cleaned-job sink so it receives each job's chunks instead"""
+        def write(job):
+            for chunk in self.chunk_job(job):
+                sink(chunk)
+        return write
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'strategy': self.strategy,
+            'max_chunk_size': self.max_chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'token_counter': self.token_counter,
+            'jobs': self.jobs,
+            'chunks': self.chunks,
+            'tokens': self.tokens
+        }
+
+
+# Compact JSON: no indentation or spaces after separators
+COMPACT_SEPARATORS = (',', ':')
+RESPONSE_ENCODINGS = ('json', 'gzip')
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Opaque, URL-safe continuation cursor"""
+    raw = json.dumps(state, separators=COMPACT_SEPARATORS).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def encode_response_body(response_body: Dict[str, Any], encoding: str = 'json'):
+    """Serialize the response body compactly, optionally gzip+base64 encoded
+    
+    The jobs (or chunks) array is serialized first so its size and serialization time can be
+    reported in metadata.response without encoding the payload twice.
+    Returns (body, is_base64_encoded).
+    """
+    # Chunked responses carry chunks in place of the jobs array
+    items_key = 'chunks' if 'chunks' in response_body else 'jobs'
+    started = time.perf_counter()
+    items_json = json.dumps(response_body.get(items_key, []), ensure_ascii=False, separators=COMPACT_SEPARATORS)
+    serialization_seconds = time.perf_counter() - started
+    
+    envelope = {k: v for k, v in response_body.items() if k != items_key}
+    envelope['metadata'] = {**envelope.get('metadata', {}), 'response': {
+        'encoding': encoding,
+        f'{items_key}_json_bytes': len(items_json.encode('utf-8')),
+        'serialization_seconds': round(serialization_seconds, 3)
+    }}
+    if 'phases' in envelope['metadata']:
+        envelope['metadata']['phases'] = {**envelope['metadata']['phases'], 'serialization': {
+            'seconds': round(serialization_seconds, 3), 'count': 1}}
+    body = f'{{"{items_key}":' + items_json + ',' + json.dumps(envelope, ensure_ascii=False, separators=COMPACT_SEPARATORS)[1:]
+    
+    if encoding == 'gzip':
+        compressed = gzip.compress(body.encode('utf-8'), compresslevel=6)
+        return base64.b64encode(compressed).decode('ascii'), True
+    return body, False
+
+
+# Content manifest: hashes of every job (and chunk) emitted, so downstream only re-embeds changes
+DEFAULT_MANIFEST_URI = os.environ.get('MANIFEST_URI', '/tmp/bah_jobs_manifest.json')
+# Fields that change without the posting changing ("Posted 3 Days Ago") are left out of the hash
+CONTENT_HASH_IGNORED_FIELDS = ('content_hash', 'posted_date')
+
+
+def content_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def job_key(job: Dict[str, Any]) -> str:
+    """Stable identity of a cleaned job: its requisition ID, falling back to its URL, qualified by its source when tagged"""
+    key = job.get('job_id') or job.get('url') or ''
+    source = job.get('source')
+    return f"{source['tenant']}/{source['site']}:{key}" if source else key
+
+
+def job_content_hash(job: Dict[str, Any]) -> str:
+    """Hash of a job's normalized content: sorted keys, whitespace collapsed, volatile fields ignored"""
+    normalized = {
+        key: ' '.join(value.split()) if isinstance(value, str) else value
+        for key, value in job.items() if key not in CONTENT_HASH_IGNORED_FIELDS
+    }
+    return content_digest(json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=COMPACT_SEPARATORS))
+
+
+class ContentManifest:
+    """Compares this run's jobs and chunks against the manifest of the previous run
+    
+    A manifest looks like {"updated_at": ..., "chunking": {...}, "jobs": {job_key: {"content_hash": ...,
+    "chunks": {chunk_id: hash}}}} and is persisted with the same stores as incremental snapshots.
+    Jobs and chunks are classified as new, changed, unchanged or deleted.
+    """
+    
+    def __init__(self, previous: Dict[str, Any], chunker: Optional['JobChunker'] = None, changed_only: bool = False):
+        self.previous = previous.get('jobs', {})
+        self.chunker = chunker
+        self.chunking = chunker.fingerprint() if chunker else None
+        # Unchanged jobs keep their previous chunks when the chunking options are the same
+        self.same_chunking = chunker is not None and previous.get('chunking') == self.chunking
+        self.changed_only = changed_only
+        self.entries = {}
+        self.jobs = {'new': [], 'changed': [], 'deleted': [], 'unchanged': 0}
+        self.chunks = {'new': [], 'changed': [], 'deleted': [], 'unchanged': 0}
+    
+    def track_job(self, job: Dict[str, Any]) -> str:
+        key = job_key(job)
+        known = self.previous.get(key)
+        if not known:
+            status = 'new'
+        elif known.get('content_hash') != job['content_hash']:
+            status = 'changed'
+        else:
+            status = 'unchanged'
+        if status == 'unchanged':
+            self.jobs['unchanged'] += 1
+        else:
+            self.jobs[status].append(key)
+        self.entries[key] = {'content_hash': job['content_hash']}
+        return status
+    
+    def track_chunks(self, job: Dict[str, Any], chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Record a job's chunks and return the ones to emit"""
+        key = job_key(job)
+        known = self.previous.get(key, {}).get('chunks', {})
+        current = {chunk['id']: chunk['content_hash'] for chunk in chunks}
+        emitted = []
+        for chunk in chunks:
+            previous_hash = known.get(chunk['id'])
+            if previous_hash is None:
+                self.chunks['new'].append(chunk['id'])
+            elif previous_hash != chunk['content_hash']:
+                self.chunks['changed'].append(chunk['id'])
+            else:
+                self.chunks['unchanged'] += 1
+                if self.changed_only:
+                    continue
+            emitted.append(chunk)
+        self.chunks['deleted'].extend(chunk_id for chunk_id in known if chunk_id not in current)
+        self.entries[key]['chunks'] = current
+        return emitted
+    
+    def sink(self, sink, fields: Optional[Iterable[str]] = None):
+        """Wrap a cleaned-job sink so it tracks every job (and its chunks) and emits only what was asked for
+        
+        Jobs are tracked whole; fields only projects what is emitted (and what is chunked).
+        """
+        def write(job):
+            status = self.track_job(job)
+            if not self.chunker:
+                if status != 'unchanged' or not self.changed_only:
+                    sink(project_job(job, fields))
+                return
+            if status == 'unchanged' and self.changed_only and self.same_chunking:
+                # Chunking an unchanged job with unchanged options can only reproduce its previous chunks
+                known = self.previous[job_key(job)].get('chunks', {})
+                self.entries[job_key(job)]['chunks'] = known
+                self.chunks['unchanged'] += len(known)
+                return
+            for chunk in self.track_chunks(job, self.chunker.chunk_job(project_job(job, fields))):
+                sink(chunk)
+        return write
+    
+    def finish(self, complete: bool) -> Dict[str, Any]:
+        """Report the changes; jobs missing from the run are only deleted when it covered the whole catalog"""
+        carried = {}
+        for key, entry in self.previous.items():
+            if key in self.entries:
+                continue
+            if complete:
+                self.jobs['deleted'].append(key)
+                self.chunks['deleted'].extend(entry.get('chunks', {}))
+            else:
+                carried[key] = entry
+        self.entries = {**carried, **self.entries}
+        return {'jobs': self.jobs, 'chunks': self.chunks} if self.chunker else {'jobs': self.jobs}
+    
+    def manifest(self) -> Dict[str, Any]:
+        return {
+            'updated_at': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+            'chunking': self.chunking,
+            'jobs': self.entries
+        }
+
+
+# Sharded runs: default number of listings each coordinator shard covers
+DEFAULT_SHARD_SIZE = int(os.environ.get('SHARD_SIZE', 250))
+
+
+def shard_range(total: int, shard_index: int, shard_count: int):
+    """Listing offsets [start, end) covered by one of shard_count equal slices of the catalog"""
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+    size = -(-total // shard_count)  # ceiling division
+    start = min(total, shard_index * size)
+    return start, min(total, start + size)
+
+
+def covered_listings(total: int, max_jobs: Optional[int] = None) -> int:
+    """Listings a sharded run covers: the whole catalog, or its first max_jobs"""
+    return min(total, int(max_jobs)) if max_jobs else total
+
+
+def plan_shards(total: int, shard_count: Optional[int] = None, shard_size: Optional[int] = None):
+    """Split [0, total) into contiguous offset ranges, by count or by size"""
+    if not shard_count:
+        shard_count = max(1, -(-total // (shard_size or DEFAULT_SHARD_SIZE)))
+    ranges = [shard_range(total, index, shard_count) for index in range(shard_count)]
+    return [(start, end) for start, end in ranges if end > start]
+
+
+def decode_response_body(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a lambda_handler response body, undoing gzip+base64 encoding if present"""
+    body = response.get('body') or '{}'
+    if response.get('isBase64Encoded'):
+        body = gzip.decompress(base64.b64decode(body)).decode('utf-8')
+    return json.loads(body)
+
+
+class ShardInvoker(ABC):
+    """Runs one shard event and returns its decoded response body"""
+    
+    @abstractmethod
+    def invoke(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the shard and return its response body"""
+
+
+class LocalShardInvoker(ShardInvoker):
+    """Runs shards in-process by calling lambda_handler directly (local runs and testing)"""
+    
+    def invoke(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        return decode_response_body(lambda_handler(event, None))
+
+
+class LambdaShardInvoker(ShardInvoker):
+    """Runs shards as synchronous invocations of a Lambda function"""
+    
+    def __init__(self, function_name: str):
+        import boto3  # Provided by the Lambda runtime
+        from botocore.config import Config
+        self.function_name = function_name
+        # Shards can run for many minutes; don't let the SDK time out or retry them
+        self.client = boto3.client('lambda', config=Config(read_timeout=900, retries={'max_attempts': 0}))
+    
+    def invoke(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.client.invoke(
+            FunctionName=self.function_name,
+            InvocationType='RequestResponse',
+            Payload=json.dumps(event).encode('utf-8')
+        )
+        response = json.loads(result['Payload'].read())
+        if result.get('FunctionError'):
+            raise RuntimeError(f"Shard invocation failed: {response.get('errorMessage', response)}")
+        return decode_response_body(response)
+
+
+def shard_invoker_from_event(event: Dict[str, Any]) -> ShardInvoker:
+    """Lambda fan-out when running inside Lambda (or when asked), in-process otherwise"""
+    function_name = event.get('shard_function') or os.environ.get('AWS_LAMBDA_FUNCTION_NAME')
+    invoker = event.get('invoker') or ('lambda' if function_name else 'local')
+    if invoker == 'lambda':
+        if not function_name:
+            raise ValueError("The lambda invoker needs 'shard_function' or AWS_LAMBDA_FUNCTION_NAME")
+        return LambdaShardInvoker(function_name)
+    if invoker == 'local':
+        return LocalShardInvoker()
+    raise ValueError(f"Unknown invoker: {invoker} (expected 'local' or 'lambda')")
+
+
+def run_coordinator(event: Dict[str, Any], total: int, invoker: ShardInvoker,
+                    partitions: Optional[List[Dict[str, Any]]] = None, detail_level: Optional[str] = None):
+    """Plan shards over the catalog, run them in parallel, and merge their jobs
+    
+    Shards are offset ranges, or one per facet partition when partitions are given.
+    Jobs are merged in shard order and deduplicated by job_id (falling back to url).
+    Shards scrape at detail_level (the run's resolved level) and return whole jobs; the
+    coordinator applies the fields projection. Returns the merged jobs and a per-shard report.
+    """
+    covered = covered_listings(total, event.get('max_jobs'))
+    ranges = plan_shards(covered, event.get('shard_count'), event.get('shard_size')) if partitions is None else []
+    logger.info(f"Coordinator: {total} jobs in catalog, running {len(partitions if partitions is not None else ranges)} shards")
+    
+    # Shards inherit the scraping options but never coordinate, page, chunk or write output themselves
+    passthrough = {k: v for k, v in event.items() if k not in (
+        'mode', 'max_jobs', 'shard_count', 'shard_size', 'shard_index', 'page_size', 'cursor', 'ndjson_output',
+        'output', 'output_format', 'invoker', 'shard_function', 'shard_concurrency', 'snapshot', 'chunking', 'manifest',
+        'changed_only', 'facet_partitions', 'applied_facets', 'fields')}
+    passthrough['job_store'] = ''  # The coordinator stores the merged jobs; shards must not also use JOB_STORE_URI
+    if detail_level:
+        passthrough['detail_level'] = detail_level
+    encoding = 'gzip' if isinstance(invoker, LambdaShardInvoker) else 'json'
+    if partitions is not None:
+        shard_events = [{**passthrough, 'mode': 'full', 'applied_facets': partition['applied_facets'], 'encoding': encoding}
+                        for partition in partitions]
+    else:
+        shard_events = [{**passthrough, 'mode': 'full', 'offset_start': start, 'offset_end': end, 'total': total, 'encoding': encoding}
+                        for start, end in ranges]
+    if event.get('run_id'):
+        # Each shard keeps its own checkpoint so that shards never append to the same file
+        for index, shard_event in enumerate(shard_events):
+            suffix = f"facet{index}" if partitions is not None else f"{shard_event['offset_start']}-{shard_event['offset_end']}"
+            shard_event['run_id'] = f"{event['run_id']}-{suffix}"
+    
+    def run_shard(shard_event):
+        try:
+            return invoker.invoke(shard_event)
+        except Exception as e:
+            logger.error(f"Shard {shard_event.get('applied_facets') or (shard_event['offset_start'], shard_event['offset_end'])} failed: {e}")
+            return {'success': False, 'error': str(e), 'jobs': []}
+    
+    workers = max(1, min(len(shard_events), int(event.get('shard_concurrency') or len(shard_events))))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run_shard, shard_events))
+    
+    jobs, reports, seen = [], [], set()
+    for index, (shard_event, result) in enumerate(zip(shard_events, results)):
+        shard_jobs = result.get('jobs', [])
+        for job in shard_jobs:
+            key = job.get('job_id') or job.get('url')
+            if key in seen:
+                continue
+            seen.add(key)
+            jobs.append(job)
+        report = {'index': index}
+        if partitions is not None:
+            report.update(facets=partitions[index]['labels'], expected_count=partitions[index]['count'])
+        else:
+            report.update(offset_start=shard_event['offset_start'], offset_end=shard_event['offset_end'])
+        reports.append({
+            **report,
+            'success': result.get('success', False),
+            'jobs_count': len(shard_jobs),
+            'execution_time_seconds': result.get('metadata', {}).get('execution_time_seconds'),
+            'next_cursor': result.get('next_cursor'),
+            'error': result.get('error')
+        })
+    return jobs, reports
+
+
+def query_response(event: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+    """Answer an operation: query event from the job store instead of scraping"""
+    store_uri = event.get('job_store') or JOB_STORE_URI
+    if not store_uri:
+        raise ValueError("Queries need a job_store (or JOB_STORE_URI) to read from")
+    filters = event.get('query') or {}
+    if not isinstance(filters, dict):
+        raise ValueError("query must be an object of filters")
+    result = query_job_store(store_uri, filters)
+    encoding = event.get('encoding', 'json')
+    if encoding not in RESPONSE_ENCODINGS:
+        raise ValueError(f"Unknown encoding: {encoding} (expected one of {', '.join(RESPONSE_ENCODINGS)})")
+    response_body = {
+        'success': True,
+        'jobs_count': len(result['jobs']),
+        'jobs': result['jobs'],
+        'metadata': {
+            'operation': 'query',
+            'query': filters,
+            'job_store': store_uri,
+            'stored_jobs': result['stored_jobs'],
+            'query_ms': result['query_ms'],
+            'execution_time_seconds': round(time.time() - start_time, 3)
+        }
+    }
+    headers = {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'}
+    body, is_base64 = encode_response_body(response_body, encoding)
+    if encoding == 'gzip':
+        headers['Content-Encoding'] = 'gzip'
+    return {'statusCode': 200, 'headers': headers, 'body': body, 'isBase64Encoded': is_base64}
+
+
+# Scrapers, and with them their HTTP sessions and warm keep-alive connections, are kept
+# at module scope and reused by later invocations in the same execution environment.
+# Only the threads engine keeps its connections: an aiohttp session is bound to the
+# event loop that asyncio.run creates per invocation, so async scrapers close it on exit
+# and reuse only their settings, limiter state and response cache
+_idle_scrapers: Dict[tuple, List[BAHJobScraper]] = {}
+_idle_scrapers_lock = threading.Lock()
+_container_stats = {'invocations': 0, 'import_seconds': None}
+
+
+def scraper_pool_key(engine: str, concurrency: Optional[int], target: Dict[str, str]) -> tuple:
+    return (engine, concurrency, target['base_url'], target['tenant'], target['site'])
+
+
+def acquire_scraper(engine: str, concurrency: Optional[int] = None, cache: Optional[ResponseCache] = None,
+                    target: Optional[Dict[str, Any]] = None):
+    """Reuse an idle scraper for this engine, concurrency and Workday target, or build one
+    
+    Returns (scraper, reused, init_seconds). Concurrent in-process invocations (local
+    shards) each get their own scraper; hand it back with release_scraper.
+    """
+    target = workday_target(target)
+    key = scraper_pool_key(engine, concurrency, target)
+    with _idle_scrapers_lock:
+        idle = _idle_scrapers.get(key)
+        scraper = idle.pop() if idle else None
+    if scraper:
+        scraper.reset_run_state(cache)
+        return scraper, True, 0.0
+    
+    started = time.perf_counter()
+    if engine == 'async':
+        scraper = AsyncBAHJobScraper(concurrency=concurrency, cache=cache, target=target)
+    elif engine == 'threads':
+        scraper = BAHJobScraper(concurrency=concurrency, cache=cache, target=target)
+    else:
+        raise ValueError(f"Unknown engine: {engine} (expected 'threads' or 'async')")
+    scraper.rate_limiter.reset_stats()
+    return scraper, False, time.perf_counter() - started
+
+
+def release_scraper(engine: str, concurrency: Optional[int], scraper: BAHJobScraper):
+    scraper.cache = None
+    if scraper.retired:
+        return  # Its stray requests keep the session busy; the next invocation builds a fresh scraper
+    with _idle_scrapers_lock:
+        _idle_scrapers.setdefault(scraper_pool_key(engine, concurrency, scraper.target), []).append(scraper)
+
+
+def parse_scrape_config(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Validated options of a scrape event
+    
+    Returns a dict of the run's settings. Later steps fill in where a sharded or
+    coordinated run starts and ends (start_offset, window, total, partitions).
+    """
+    # Extract any parameters from the event
+    max_jobs = event.get('max_jobs')  # None means get ALL jobs
+    include_details = event.get('include_details', True)
+    engine = event.get('engine', 'threads')
+    mode = event.get('mode', 'full')
+    if mode not in ('full', 'incremental', 'coordinator'):
+        raise ValueError(f"Unknown mode: {mode} (expected 'full', 'incremental' or 'coordinator')")
+    encoding = event.get('encoding', 'json')
+    if encoding not in RESPONSE_ENCODINGS:
+        raise ValueError(f"Unknown encoding: {encoding} (expected one of {', '.join(RESPONSE_ENCODINGS)})")
+    # Jobs are returned in the body, or written to the output location (ndjson_output implies ndjson)
+    output_uri = event.get('output') or event.get('ndjson_output')
+    output_format = event.get('output_format') or ('ndjson' if output_uri else 'json')
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+    if (output_format == 'json') == bool(output_uri):
+        raise ValueError("output_format json returns jobs in the body; ndjson, parquet and arrow need an output location")
+    if output_format in COLUMNAR_FORMATS and event.get('chunking') not in (None, False):
+        raise ValueError(f"output_format {output_format} writes jobs and cannot be combined with chunking")
+    
+    # The fields projection lowers the detail level to what the requested fields need, so
+    # listing-only fields skip the detail requests and section-only fields skip the parse
+    fields = event.get('fields')
+    if fields is not None and (not isinstance(fields, list) or not all(isinstance(field, str) for field in fields)):
+        raise ValueError("fields must be a list of job field names")
+    fields = frozenset(fields) if fields else None
+    detail_level, parse_descriptions = resolve_detail_level(event.get('detail_level'), fields, include_details)
+    if mode == 'incremental':
+        # The snapshot carries jobs forward to later runs, so they are enriched at the given
+        # level rather than the one the fields need; fields then only project the output
+        detail_level, parse_descriptions = resolve_detail_level(event.get('detail_level'), include_details=include_details)
+        if detail_level == 'summary':
+            raise ValueError("detail_level 'summary' is not supported in incremental mode")
+    include_details = detail_level != 'listing'
+    
+    # Result paging: each invocation returns page_size jobs and a cursor for the next page
+    page_size = event.get('page_size')
+    cursor = decode_cursor(event['cursor']) if event.get('cursor') else {}
+    start_offset = cursor.get('offset', 0)
+    window = max_jobs
+    if page_size:
+        if mode != 'full':
+            raise ValueError(f"page_size is not supported in {mode} mode")
+        window = page_size if not max_jobs else max(0, min(page_size, max_jobs - start_offset))
+    elif 'end' in cursor:
+        # Continuation of a deadline-stopped run: carry on up to where it would have ended
+        window = None if cursor['end'] is None else max(0, cursor['end'] - start_offset)
+    
+    # Sharded runs cover one slice of the catalog, given as offsets or as shard_index/shard_count
+    shard_range_given = event.get('shard_count') is not None or event.get('offset_start') is not None
+    sharded = mode != 'coordinator' and shard_range_given
+    if sharded and (page_size or mode != 'full'):
+        raise ValueError("Shard ranges can only be used in full mode without page_size")
+    
+    # Facet partitioning covers catalogs beyond the listing offset cap; applied_facets
+    # restricts a run to one facet selection (the unit coordinator partition shards run)
+    facet_partitions = bool(event.get('facet_partitions'))
+    applied_facets = event.get('applied_facets') or None
+    if facet_partitions and (page_size or cursor or applied_facets or shard_range_given):
+        raise ValueError("facet_partitions crawls the whole catalog and cannot be combined with page_size, cursor, "
+                         "applied_facets or shard ranges")
+    
+    # Targeted searches are filtered by Workday, so only the matching jobs are listed and enriched
+    search = None
+    search_terms = event.get('search_text') or []
+    search_terms = [search_terms] if isinstance(search_terms, str) else search_terms
+    search_terms = list(dict.fromkeys(str(term).strip() for term in search_terms if str(term).strip()))
+    posted_within_days = event.get('posted_within_days')
+    if search_terms or event.get('facets') or posted_within_days is not None:
+        if mode != 'full' or facet_partitions or shard_range_given:
+            raise ValueError("search_text, facets and posted_within_days only apply to full mode without facet_partitions or shard ranges")
+        if not isinstance(event.get('facets') or {}, dict):
+            raise ValueError("facets must map facet parameters to lists of value IDs or labels")
+        if (len(search_terms) > 1 or posted_within_days is not None) and (page_size or cursor):
+            raise ValueError("Several search terms or posted_within_days cannot be combined with page_size or cursor")
+        search = {'terms': search_terms, 'facets': event.get('facets') or {},
+                  'posted_within_days': None if posted_within_days is None else int(posted_within_days)}
+    
+    # Several Workday tenants/sites scraped side by side, each job tagged with its source
+    targets = event.get('targets')
+    if targets is not None:
+        if not isinstance(targets, list) or not targets:
+            raise ValueError("targets must be a non-empty list of {host, tenant, site} objects")
+        if mode != 'full' or page_size or cursor or applied_facets or shard_range_given:
+            raise ValueError("targets can only be scraped in full mode without page_size, cursor, applied_facets or shard ranges")
+        targets = [workday_target(target) for target in targets]
+    
+    return {
+        'max_jobs': max_jobs, 'include_details': include_details, 'engine': engine, 'mode': mode, 'encoding': encoding,
+        'output_uri': output_uri, 'output_format': output_format, 'fields': fields, 'detail_level': detail_level,
+        'parse_descriptions': parse_descriptions, 'page_size': page_size, 'cursor': cursor, 'start_offset': start_offset,
+        # Detail paths a deadline-stopped invocation had already taken from the listings
+        'pending_paths': cursor.get('pending') or [],
+        'window': window, 'sharded': sharded, 'total': event.get('total'), 'partitions': None,
+        'facet_partitions': facet_partitions, 'applied_facets': applied_facets, 'search': search, 'targets': targets
+    }
+
+
+def prepare_scrapers(event: Dict[str, Any], config: Dict[str, Any], scrapers: List[BAHJobScraper],
+                     checkpoints: List['ScrapeCheckpoint'], context) -> Dict[str, Any]:
+    """Acquire a scraper per target into scrapers and set them up for this run
+    
+    Checkpoints opened for the run are added to checkpoints; the caller closes them and
+    releases the scrapers. Returns the run state the response reports on.
+    """
+    cache = None
+    if event.get('cache', os.environ.get('RESPONSE_CACHE_ENABLED', '').lower() == 'true'):
+        cache = ResponseCache(ttl=int(event.get('cache_ttl', RESPONSE_CACHE_TTL)))
+    
+    state = {'cache': cache, 'init_seconds': 0.0, 'scraper_reused': True, 'checkpoint': None,
+             'changes': None, 'shard_reports': None, 'scheduler': None}
+    targets = config['targets']
+    for target in targets or [None]:
+        pooled, reused, seconds = acquire_scraper(config['engine'], event.get('concurrency'), cache, target)
+        scrapers.append(pooled)
+        state['scraper_reused'] = state['scraper_reused'] and reused
+        state['init_seconds'] += seconds
+    scraper = scrapers[0]
+    for pooled in scrapers:
+        pooled.detail_level, pooled.parse_descriptions = config['detail_level'], config['parse_descriptions']
+    
+    # Full scrapes stop starting new detail requests shortly before the invocation times out.
+    # Listing offsets only resume a run when they index one unfiltered-by-date listing
+    search = config['search']
+    resumable = not search or (len(search['terms']) <= 1 and search['posted_within_days'] is None)
+    if config['mode'] == 'full' and not config['facet_partitions'] and not targets and resumable:
+        scraper.deadline = Deadline.from_context(context, float(event.get('deadline_margin_seconds', DEADLINE_MARGIN_SECONDS)))
+    
+    # Runs with a run ID log finished pages and jobs, and a rerun with the same ID skips them;
+    # each target keeps its own log under the run ID
+    if event.get('run_id') and config['mode'] != 'coordinator':
+        checkpoint_dir = event.get('checkpoint_dir') or CHECKPOINT_DIR
+        for pooled in scrapers:
+            run_id = f"{event['run_id']}-{pooled.source['tenant']}-{pooled.source['site']}" if targets else event['run_id']
+            pooled.checkpoint = ScrapeCheckpoint.for_run(run_id, checkpoint_dir)
+            checkpoints.append(pooled.checkpoint)
+        state['checkpoint'] = None if targets else scraper.checkpoint
+    return state
+
+
+def resolve_scrape_range(event: Dict[str, Any], config: Dict[str, Any], scraper: BAHJobScraper):
+    """Look up the catalog a coordinator splits or a shard slices, and the offsets a shard covers"""
+    engine, cursor = config['engine'], config['cursor']
+    if config['mode'] == 'coordinator' and config['facet_partitions']:
+        config['partitions'] = asyncio.run(scraper.plan_facet_partitions()) if engine == 'async' else scraper.plan_facet_partitions()
+        config['total'] = scraper.last_listing_total
+    elif config['mode'] == 'coordinator' or (config['sharded'] and not config['total']):
+        config['total'] = asyncio.run(scraper.get_listing_total()) if engine == 'async' else scraper.get_listing_total()
+    if not config['sharded']:
+        return
+    
+    # max_jobs caps the sliced catalog the same way the coordinator caps it
+    total = config['total']
+    covered = covered_listings(total, config['max_jobs'])
+    if event.get('shard_count') is not None:
+        start_offset, offset_end = shard_range(covered, int(event.get('shard_index', 0)), int(event['shard_count']))
+    else:
+        start_offset = int(event['offset_start'])
+        offset_end = min(covered, int(event.get('offset_end') or covered))
+    if 'offset' in cursor:
+        # A stopped shard resumes inside its own range
+        start_offset, offset_end = cursor['offset'], min(total, cursor.get('end') or offset_end)
+    config['start_offset'] = start_offset
+    config['window'] = max(0, offset_end - start_offset)
+    config['cursor'] = {**cursor, 'total': total}
+    logger.info(f"Shard covers listing offsets {start_offset}-{offset_end} of {total}")
+
+
+def scrape_targets(event: Dict[str, Any], config: Dict[str, Any], scrapers: List[BAHJobScraper], state: Dict[str, Any]):
+    """Jobs of every target, scraped side by side under the global concurrency cap"""
+    scheduler = TargetScheduler(scrapers, int(event.get('global_concurrency') or GLOBAL_CONCURRENCY))
+    state['scheduler'] = scheduler
+    scrape_options = {'max_jobs': config['max_jobs'], 'include_details': config['include_details'],
+                      'partitioned': config['facet_partitions'], 'search': config['search']}
+    return scheduler.aiter_jobs(**scrape_options) if config['engine'] == 'async' else scheduler.iter_jobs(**scrape_options)
+
+
+def scrape_incremental_run(event: Dict[str, Any], config: Dict[str, Any], scraper: BAHJobScraper, state: Dict[str, Any]):
+    """Jobs of an incremental run, whose changes against the snapshot go into state"""
+    store = snapshot_store_from_uri(event.get('snapshot') or DEFAULT_SNAPSHOT_URI)
+    options = {'max_jobs': config['max_jobs'], 'include_details': config['include_details'],
+               'partitioned': config['facet_partitions']}
+    if config['engine'] == 'async':
+        jobs_data, state['changes'] = asyncio.run(scraper.scrape_incremental(store, **options))
+    else:
+        jobs_data, state['changes'] = scraper.scrape_incremental(store, **options)
+    return jobs_data
+
+
+def scrape_full(config: Dict[str, Any], scraper: BAHJobScraper):
+    """Jobs of a full run (or one page or shard of it), streamed job by job"""
+    if (config['sharded'] or config['page_size']) and config['window'] == 0 and not config['pending_paths']:
+        return iter([])
+    return scraper.iter_jobs(max_jobs=config['window'], include_details=config['include_details'],
+                             start_offset=config['start_offset'], total_hint=config['cursor'].get('total'),
+                             pending_paths=config['pending_paths'], applied_facets=config['applied_facets'],
+                             partitioned=config['facet_partitions'], search=config['search'])
+
+
+def start_scrape(event: Dict[str, Any], config: Dict[str, Any], scrapers: List[BAHJobScraper], state: Dict[str, Any]):
+    """Jobs of the run's mode: an iterator (async for the async engine) or a list"""
+    if config['targets']:
+        return scrape_targets(event, config, scrapers, state)
+    if config['mode'] == 'coordinator':
+        jobs_data, state['shard_reports'] = run_coordinator(event, config['total'], shard_invoker_from_event(event),
+                                                            config['partitions'], config['detail_level'])
+        return jobs_data
+    if config['mode'] == 'incremental':
+        return scrape_incremental_run(event, config, scrapers[0], state)
+    return scrape_full(config, scrapers[0])
+
+
+class JobOutput:
+    """Where the cleaned jobs of a scrape go
+    
+    Jobs are collected for the response body or written to the output location, with
+    the optional chunker, content manifest and job store wrapped around that sink.
+    """
+    
+    def __init__(self, event: Dict[str, Any], output_uri: Optional[str] = None, output_format: str = 'json'):
+        self.output_uri = output_uri
+        self.output_format = output_format
+        # With a chunking block each cleaned job is split and its chunks are emitted instead
+        chunking = event.get('chunking')
+        self.chunker = None
+        if chunking not in (None, False):
+            self.chunker = JobChunker.from_config(chunking if isinstance(chunking, dict) else {})
+        # With a manifest, every job is hashed and compared against the previous run;
+        # changed_only then drops unchanged jobs and chunks from the output
+        self.manifest = self.manifest_store = None
+        if event.get('manifest') or event.get('changed_only'):
+            self.manifest_store = snapshot_store_from_uri(event.get('manifest') or DEFAULT_MANIFEST_URI)
+            self.manifest = ContentManifest(self.manifest_store.load(), chunker=self.chunker,
+                                            changed_only=bool(event.get('changed_only')))
+        # Every cleaned job can also be upserted into the indexed SQLite job store
+        store_uri = event.get('job_store', JOB_STORE_URI)
+        self.job_store = JobStore(store_uri).open() if store_uri else None
+        self.records = []
+        self.output_summary = None
+    
+    def write(self, jobs_data, metrics: ScrapeMetrics, fields: Optional[Iterable[str]] = None) -> int:
+        """Clean and validate every job and send its requested fields to the output; returns the number of jobs"""
+        if self.output_format in COLUMNAR_FORMATS:
+            output_writer = ColumnarWriter(self.output_uri, self.output_format, fields=fields)
+        else:
+            output_writer = NDJSONWriter(self.output_uri) if self.output_uri else nullcontext()
+        with output_writer as writer:
+            # The manifest and job store see whole jobs, so content_hash covers every field
+            # scraped; the fields projection only applies to what is emitted (or chunked)
+            sink = writer.write if writer else self.records.append
+            if self.manifest:
+                sink = self.manifest.sink(sink, fields)
+            else:
+                sink = projected_sink(self.chunker.sink(sink) if self.chunker else sink, fields)
+            if self.job_store:
+                sink = self.job_store.sink(sink)
+            sink = timed_sink(sink, metrics, 'output')
+            if isinstance(writer, ColumnarWriter):
+                jobs_data = writer.tap(jobs_data)
+            if hasattr(jobs_data, '__aiter__'):
+                jobs_count = drain_async_jobs(jobs_data, sink, metrics)
+            else:
+                jobs_count = 0
+                for cleaned_job in iter_clean_jobs(jobs_data, metrics):
+                    sink(cleaned_job)
+                    jobs_count += 1
+        if writer:
+            self.output_summary = writer.summary()
+        return jobs_count
+    
+    def finish(self, complete: bool, sources: List[str], response_body: Dict[str, Any]):
+        """Commit the job store and manifest (deleting what is gone only after a complete run) and report on them"""
+        if self.job_store:
+            self.job_store.finish(complete, sources)
+            response_body['metadata']['job_store'] = self.job_store.summary()
+        
+        if self.manifest:
+            content_changes = self.manifest.finish(complete)
+            self.manifest_store.save(self.manifest.manifest())
+            response_body['content_changes'] = content_changes
+            response_body['metadata']['content_changes_count'] = {
+                kind: {status: ids if isinstance(ids, int) else len(ids) for status, ids in statuses.items()}
+                for kind, statuses in content_changes.items()
+            }
+    
+    def close(self, upload: bool = True):
+        """Close the job store; upload=False keeps a failed run's partial store from replacing the S3 copy"""
+        if self.job_store is not None:
+            self.job_store.close(upload=upload)
+
+
+def scrape_response_body(event: Dict[str, Any], config: Dict[str, Any], state: Dict[str, Any], scrapers: List[BAHJobScraper],
+                         metrics: ScrapeMetrics, output: JobOutput, jobs_count: int, context, start_time: float,
+                         cold_start: bool) -> Dict[str, Any]:
+    """Response body of a finished scrape: the jobs (or chunks) with the run's metadata, changes and cursor"""
+    scraper = scrapers[0]
+    targets, scheduler, chunker = config['targets'], state['scheduler'], output.chunker
+    max_jobs, page_size, cursor = config['max_jobs'], config['page_size'], config['cursor']
+    start_offset, window, total = config['start_offset'], config['window'], config['total']
+    partitions, shard_reports = config['partitions'], state['shard_reports']
+    execution_time = round(time.time() - start_time, 2)
+    
+    response_body = {
+        'success': True,
+        'jobs_count': jobs_count,
+        'chunks' if chunker else 'jobs': output.records,
+        'metadata': {
+            'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+            'execution_time_seconds': execution_time,
+            'source_url': [pooled.jobs_api_url for pooled in scrapers] if targets else scraper.jobs_api_url,
+            'include_details': config['include_details'],
+            'detail_level': config['detail_level'],
+            'engine': config['engine'],
+            'mode': config['mode'],
+            'concurrency': scraper.concurrency,
+            'rate_limiter': {pooled.source['host']: pooled.rate_limiter.stats() for pooled in scrapers}
+            if targets else scraper.rate_limiter.stats(),
+            'runtime': {
+                'cold_start': cold_start,
+                'import_seconds': _container_stats['import_seconds'],
+                'init_seconds': round(state['init_seconds'], 4),
+                'scraper_reused': state['scraper_reused'],
+                'container_invocations': _container_stats['invocations']
+            },
+            **metrics.summary()
         }
+    }
+    response_body['metadata']['phases']['total'] = {'seconds': execution_time, 'count': 1}
+    
+    if state['cache']:
+        response_body['metadata']['cache'] = dict(state['cache'].stats)
+    
+    if scheduler:
+        response_body['metadata']['global_concurrency'] = scheduler.global_concurrency
+        response_body['metadata']['targets'] = scheduler.summary()
+        response_body['metadata']['failed_targets'] = sum(1 for error in scheduler.errors if error)
+    
+    if not targets and (partitions is not None or scraper.facet_partitions is not None):
+        crawled = partitions if partitions is not None else scraper.facet_partitions
+        response_body['metadata']['facet_partitions'] = {
+            'count': len(crawled),
+            'truncated': sum(1 for partition in crawled if partition.get('truncated')),
+            'partitions': [{key: value for key, value in partition.items() if key != 'applied_facets'} for partition in crawled]
+        }
+    
+    if config['fields']:
+        response_body['metadata']['fields'] = sorted(config['fields'])
+    
+    if config['applied_facets']:
+        response_body['metadata']['applied_facets'] = config['applied_facets']
+    
+    if config['search'] and not targets:
+        response_body['metadata']['search'] = scraper.search_summary
+    
+    if state['checkpoint']:
+        response_body['metadata']['checkpoint'] = {'run_id': event['run_id'], **state['checkpoint'].summary()}
+    
+    if output.output_summary:
+        response_body['output'] = output.output_summary
+    
+    if chunker:
+        response_body['chunks_count'] = chunker.chunks
+        response_body['metadata']['chunking'] = chunker.summary()
+    
+    # Deletions need a run that saw the whole catalog
+    deadline_stop = scraper.deadline_stop
+    crawled = partitions or [partition for pooled in scrapers for partition in pooled.facet_partitions or []]
+    truncated = any(partition.get('truncated') for partition in crawled)
+    complete = not (max_jobs or page_size or config['sharded'] or cursor or deadline_stop or config['applied_facets']
+                    or config['search'] or truncated) and not (
+        shard_reports and any(not report['success'] or report.get('next_cursor') for report in shard_reports)) and not (
+        scheduler and scheduler.failed())
+    sources = [f"{pooled.source['tenant']}/{pooled.source['site']}" for pooled in scrapers] if targets else ['']
+    output.finish(complete, sources, response_body)
+    
+    if state['changes'] is not None:
+        response_body['changes'] = state['changes']
+        response_body['metadata']['changes_count'] = {k: len(v) for k, v in state['changes'].items()}
+    
+    if shard_reports is not None:
+        response_body['shards'] = shard_reports
+        response_body['metadata']['shards_count'] = len(shard_reports)
+        response_body['metadata']['failed_shards'] = sum(1 for report in shard_reports if not report['success'])
+    
+    if config['sharded']:
+        response_body['shard'] = {'offset_start': start_offset, 'offset_end': start_offset + window, 'total': total}
+    
+    if page_size:
+        total = scraper.last_listing_total or cursor.get('total') or 0
+        end = min(total, max_jobs) if max_jobs else total
+        next_offset = start_offset + window
+        response_body['page'] = {'offset': start_offset, 'size': page_size, 'total': total}
+        response_body['next_cursor'] = encode_cursor({'offset': next_offset, 'total': total}) if window and next_offset < end else None
+    
+    if deadline_stop:
+        # Everything returned so far is complete; the cursor picks up the rest
+        next_offset = start_offset + deadline_stop['listings_consumed']
+        end = start_offset + window if window is not None else None
+        if page_size:
+            end = min(total, max_jobs) if max_jobs else total
+        continuation = {'offset': next_offset, 'total': scraper.last_listing_total or cursor.get('total'),
+                        'end': end, 'pending': deadline_stop['pending_paths']}
+        response_body['next_cursor'] = encode_cursor(continuation)
+        response_body['metadata']['deadline'] = {
+            'stopped_early': True,
+            'remaining_ms': context.get_remaining_time_in_millis(),
+            'pending_count': len(deadline_stop['pending_paths']),
+            'next_offset': next_offset
+        }
+    return response_body
 
 
 def lambda_handler(event, context):
     """AWS Lambda handler function"""
     start_time = time.time()
+    configure_logging()
+    _container_stats['invocations'] += 1
+    cold_start = _container_stats['invocations'] == 1
+    scrapers = []
+    checkpoints = []
+    output = None
+    succeeded = False
     
     try:
-        logger.info("Starting BAH job scraping")
-        scraper = BAHJobScraper()
-        
-        # Extract any parameters from the event
-        max_jobs = event.get('max_jobs')  # None means get ALL jobs
-        include_details = event.get('include_details', True)
-        
-        logger.info(f"Configuration: max_jobs={max_jobs}, include_details={include_details}")
+        if event.get('operation', 'scrape') == 'query':
+            return query_response(event, start_time)
+        if event.get('operation', 'scrape') != 'scrape':
+            raise ValueError(f"Unknown operation: {event['operation']} (expected 'scrape' or 'query')")
         
-        # Get comprehensive job data
-        jobs_data = scraper.scrape_all_jobs(max_jobs=max_jobs, include_details=include_details)
+        logger.info("Starting BAH job scraping")
+        config = parse_scrape_config(event)
+        engine, mode = config['engine'], config['mode']
+        if context is None and event.get('local_timeout_seconds'):
+            context = LocalContext(float(event['local_timeout_seconds']))
+        state = prepare_scrapers(event, config, scrapers, checkpoints, context)
+        scraper = scrapers[0]
+        # Targets each record into their own scraper's metrics, which are summed after the run
+        metrics = ScrapeMetrics() if config['targets'] else scraper.metrics
+        logger.info(f"Configuration: max_jobs={config['max_jobs']}, detail_level={config['detail_level']}, engine={engine}, mode={mode}, concurrency={scraper.concurrency}")
         
-        # Clean and validate the data
-        cleaned_jobs = []
-        for job in jobs_data:
-            cleaned_job = clean_job_data(job)
-            if cleaned_job:
-                cleaned_jobs.append(cleaned_job)
+        resolve_scrape_range(event, config, scraper)
+        jobs_data = start_scrape(event, config, scrapers, state)
+        output = JobOutput(event, config['output_uri'], config['output_format'])
+        jobs_count = output.write(jobs_data, metrics, config['fields'])
+        jobs_data = None
+        if state['scheduler']:
+            for pooled in scrapers:
+                metrics.merge(pooled.metrics)
         
-        execution_time = round(time.time() - start_time, 2)
+        response_body = scrape_response_body(event, config, state, scrapers, metrics, output, jobs_count, context,
+                                             start_time, cold_start)
+        logger.info(f"Successfully scraped {jobs_count} jobs in {response_body['metadata']['execution_time_seconds']}s")
         
-        response_body = {
-            'success': True,
-            'jobs_count': len(cleaned_jobs),
-            'jobs': cleaned_jobs,
-            'metadata': {
-                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
-                'execution_time_seconds': execution_time,
-                'source_url': scraper.jobs_api_url,
-                'include_details': include_details
-            }
+        headers = {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',  # For web access
+            'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+            'Access-Control-Allow-Headers': 'Content-Type'
         }
+        serialization_started = time.perf_counter()
+        body, is_base64 = encode_response_body(response_body, config['encoding'])
+        if config['encoding'] == 'gzip':
+            headers['Content-Encoding'] = 'gzip'
         
-        logger.info(f"Successfully scraped {len(cleaned_jobs)} jobs in {execution_time}s")
+        if event.get('log_metrics', LOG_METRICS):
+            metrics.add_phase('serialization', time.perf_counter() - serialization_started)
+            metrics.log({'Engine': engine, 'Mode': mode},
+                        {'ExecutionSeconds': round(time.time() - start_time, 3), 'JobsScraped': jobs_count})
         
+        succeeded = True
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',  # For web access
-                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps(response_body, ensure_ascii=False, indent=2)
+            'headers': headers,
+            'body': body,
+            'isBase64Encoded': is_base64
         }
         
     except Exception as e:
@@ -385,10 +4298,17 @@ def lambda_handler(event, context):
                 'metadata': {
                     'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
                     'execution_time_seconds': execution_time,
-                    'source_url': 'https://bah.wd1.myworkdayjobs.com/wday/cxs/bah/BAH_Jobs/jobs'
+                    'source_url': f"{workday_api_base(workday_target())}/jobs"
                 }
-            }, ensure_ascii=False, indent=2)
+            }, ensure_ascii=False, separators=COMPACT_SEPARATORS)
         }
+    finally:
+        if output is not None:
+            output.close(upload=succeeded)
+        for checkpoint in checkpoints:
+            checkpoint.close()
+        for pooled in scrapers:
+            release_scraper(event.get('engine', 'threads'), event.get('concurrency'), pooled)
 
 
 def clean_job_data(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -400,7 +4320,7 @@ def clean_job_data(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     
     # Required fields
     cleaned['title'] = job.get('title', '').strip()
-    cleaned['url'] = job.get('url', '').strip()
+    cleaned['url'] = (job.get('url') or '').strip()
     
     # Optional basic fields
     if job.get('location'):
@@ -411,6 +4331,13 @@ def clean_job_data(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         cleaned['job_id'] = str(job.get('job_id')).strip()
     if job.get('job_type'):
         cleaned['job_type'] = str(job.get('job_type')).strip()
+    # Short structured fields extracted from the description
+    if job.get('security_clearance'):
+        cleaned['security_clearance'] = str(job.get('security_clearance')).strip()
+    if str(job.get('experience_years') or '').strip().isdigit():
+        cleaned['experience_years'] = int(str(job['experience_years']).strip())
+    if job.get('source'):
+        cleaned['source'] = dict(job['source'])
     
     # Detailed fields (if available)
     detail_fields = [
@@ -431,7 +4358,13 @@ def clean_job_data(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
             if len(content) > 10 and not key.startswith('_'):
                 cleaned[key] = content
     
-    return cleaned if cleaned.get('title') else None
+    if not cleaned.get('title'):
+        return None
+    cleaned['content_hash'] = job_content_hash(cleaned)
+    return cleaned
+
+
+_container_stats['import_seconds'] = round(time.perf_counter() - _import_started, 4)
 
 
 # For local testing
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Workday jobs API used by the BAH scraper
+
+Serves the listings endpoint (POST /wday/cxs/<tenant>/<site>/jobs) and the job detail
+endpoint (GET /wday/cxs/<tenant>/<site>/job/...) from the saved fixtures or from a
+synthetic catalog, with configurable latency, 429 bursts and 5xx errors. Every tenant
+and site serves the same catalog. Listings honour appliedFacets and searchText, report
+facet counts for the filtered catalog, and return no postings beyond --max-offset,
+like Workday's pagination ceiling. With --churn the catalog changes while it is being
+paged: listing requests past the first page remove a random posting and add a new one
+at a random position. Job details carry an ETag and Last-Modified and are answered with
+a 304 when a conditional request still matches; --lowercase-headers sends those (and
+Retry-After) with lowercase names, as some proxies do.
+
+    python mock_workday_server.py --jobs 5000 --latency 0.05 --error-rate 0.01
+    WORKDAY_BASE_URL=http://127.0.0.1:8765 python test_lambda.py
+
+GET /__stats returns request counts and latencies; POST /__reset clears them.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_PATH = re.compile(r'^/wday/cxs/[^/]+/[^/]+(/.*)$')
+# Last-Modified of every job detail; the catalog is generated, so any fixed date will do
+DETAIL_LAST_MODIFIED = 'Mon, 01 Sep 2025 00:00:00 GMT'
+FIXTURE_FILES = ['success_response_jobs_0.json', 'pagination_test_1.json', 'pagination_test_2.json']
+LOCATIONS = ['McLean, VA', 'Arlington, VA', 'Annapolis Junction, MD', 'San Diego, CA', 'Honolulu, HI',
+             'Colorado Springs, CO', 'Washington, DC', 'Huntsville, AL']
+TITLES = ['Software Engineer', 'Data Scientist', 'Cyber Threat Analyst', 'Systems Engineer',
+          'Cloud Architect', 'Program Manager', 'Information Systems Security Engineer']
+LEVELS = ['Junior', 'Mid', 'Senior', 'Lead']
+CLEARANCES = ['Secret', 'TS/SCI', 'TS/SCI with polygraph', 'Top Secret']
+JOB_FAMILIES = {'Software Engineer': 'Technology', 'Data Scientist': 'Technology', 'Cloud Architect': 'Technology',
+                'Cyber Threat Analyst': 'Consulting & Mission Operations', 'Program Manager': 'Business Leadership',
+                'Systems Engineer': 'Engineering & Science Professional',
+                'Information Systems Security Engineer': 'Engineering & Science Professional'}
+# (facetParameter, descriptor, group) in the order Workday lists them; grouped facets are
+# nested under the group, as locations are under locationMainGroup
+FACETS = [('jobFamilyGroup', 'Job Category', None), ('workerSubType', 'Job Type', None),
+          ('timeType', 'Time Type', None), ('locations', 'Locations', 'locationMainGroup')]
+
+
+def facet_id(parameter: str, descriptor: str) -> str:
+    return hashlib.md5(f"{parameter}:{descriptor}".encode('utf-8')).hexdigest()
+
+
+def posting_facets(posting, index: int):
+    """Facet values of a posting ({parameter: [descriptor, ...]}), derived from its title and location"""
+    title = posting.get('title', '').split(',')[0]
+    family = JOB_FAMILIES.get(title) or next((f for t, f in JOB_FAMILIES.items() if t in title), 'Technology')
+    return {
+        'jobFamilyGroup': [family],
+        'workerSubType': ['Intern - Paid' if index % 50 == 7 else 'Long Term Assignee' if index % 14 == 3 else 'Regular'],
+        'timeType': ['Part time' if index % 70 == 11 else 'Full time'],
+        'locations': [location.strip() for location in posting.get('locationsText', '').split(';') if location.strip()],
+    }
+
+
+def load_fixture_postings(directory: str):
+    """Job postings from the saved listings responses, deduplicated by externalPath"""
+    postings, seen = [], set()
+    for name in FIXTURE_FILES:
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for posting in json.load(f).get('jobPostings', []):
+                if posting.get('externalPath') not in seen:
+                    seen.add(posting.get('externalPath'))
+                    postings.append(posting)
+    return postings
+
+
+def synthetic_postings(count: int, seed: int = 0):
+    """A deterministic catalog of count listings shaped like Workday's"""
+    rng = random.Random(seed)
+    postings = []
+    for index in range(count):
+        requisition_id = f"R{index:07d}"
+        title = f"{rng.choice(TITLES)}, {rng.choice(LEVELS)}"
+        location = rng.choice(LOCATIONS)
+        slug = title.replace(',', '').replace(' ', '-')
+        postings.append({
+            'title': title,
+            'externalPath': f"/job/{location.split(',')[0].replace(' ', '-')}/{slug}_{requisition_id}",
+            'locationsText': location,
+            'postedOn': f"Posted {rng.choice(['Today', 'Yesterday', '3 Days Ago', '30+ Days Ago'])}",
+            'bulletFields': [requisition_id],
+        })
+    return postings
+
+
+def api_endpoint(path: str) -> str:
+    """Part of a request path after /wday/cxs/<tenant>/<site>, or '' for other paths"""
+    match = API_PATH.match(path)
+    return match.group(1) if match else ''
+
+
+def job_detail(posting, index: int):
+    """Detail response for a listing, with a description in Workday's HTML style"""
+    rng = random.Random(index)
+    years = rng.randint(1, 15)
+    salary_low = rng.randrange(60, 160) * 1000
+    description = (
+        "<p><b>Key Role:</b></p>"
+        f"<p>Join a team supporting mission-critical programs as a {posting['title']}. "
+        "Design, build and operate systems for our government clients.</p>"
+        "<p><b>Basic Qualifications:</b></p><ul>"
+        f"<li>{years}+ years of experience with Python, Java or C++</li>"
+        "<li>Experience with cloud platforms, including AWS or Azure</li>"
+        f"<li>{rng.choice(CLEARANCES)} clearance</li>"
+        "<li>Bachelor's degree</li></ul>"
+        "<p><b>Clearance:</b></p><p>Applicants selected will be subject to a security investigation "
+        "and may need to meet eligibility requirements for access to classified information.</p>"
+        "<p><b>Compensation</b></p><p>The projected compensation range for this position is "
+        f"${salary_low:,}.00 to ${salary_low * 2:,}.00 (annualized USD).</p>"
+    )
+    return {
+        'jobPostingInfo': {
+            'id': str(index),
+            'title': posting['title'],
+            'jobDescription': description,
+            'location': posting.get('locationsText', ''),
+            'postedOn': posting.get('postedOn', ''),
+            'timeType': 'Full time',
+            'jobReqId': (posting.get('bulletFields') or [''])[0],
+            'externalUrl': f"https://bah.wd1.myworkdayjobs.com/en-US/BAH_Jobs{posting['externalPath']}",
+        },
+        'hiringOrganization': {'name': 'Booz Allen Hamilton', 'url': ''},
+    }
+
+
+class MockWorkday:
+    """Catalog, fault injection settings and request statistics shared by all handler threads"""
+
+    def __init__(self, postings, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 burst_interval: float = 0.0, burst_duration: float = 0.0, max_limit: int = 20, max_offset: int = 2000,
+                 churn: float = 0.0, seed: int = 0, missing_details=(), lowercase_headers: bool = False):
+        self.postings = postings
+        self.by_path = {posting['externalPath']: index for index, posting in enumerate(postings)}
+        self.facet_values = [
+            {parameter: {facet_id(parameter, value): value for value in values}
+             for parameter, values in posting_facets(posting, index).items()}
+            for index, posting in enumerate(postings)
+        ]
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.burst_interval = burst_interval
+        self.burst_duration = burst_duration
+        self.max_limit = max_limit
+        self.max_offset = max_offset
+        self.churn = churn
+        # Detail paths answered with 404 although they are listed, like a posting pulled mid-run
+        self.missing_details = set(missing_details)
+        self.lowercase_headers = lowercase_headers
+        self.added = 0
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.monotonic()
+            self.statuses = {}
+            self.latencies = []
+            self.bytes_sent = 0
+
+    def in_burst(self) -> bool:
+        """429 bursts: the first burst_duration seconds of every burst_interval"""
+        if not self.burst_interval:
+            return False
+        return (time.monotonic() - self.started) % self.burst_interval < self.burst_duration
+
+    def delay(self):
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            failed = self.rng.random() < self.error_rate
+        if self.latency or jitter:
+            time.sleep(max(0.0, self.latency + jitter))
+        return failed
+
+    def churn_once(self):
+        """Remove one random posting and insert a new one at a random position"""
+        with self.lock:
+            if self.postings:
+                removed = self.rng.randrange(len(self.postings))
+                del self.postings[removed]
+                del self.facet_values[removed]
+            self.added += 1
+            posting = synthetic_postings(1, seed=len(self.postings) + self.added)[0]
+            requisition_id = f"N{self.added:07d}"
+            posting['bulletFields'] = [requisition_id]
+            posting['externalPath'] = posting['externalPath'].rsplit('_', 1)[0] + f"_{requisition_id}"
+            position = self.rng.randrange(len(self.postings) + 1)
+            self.postings.insert(position, posting)
+            self.facet_values.insert(position, {parameter: {facet_id(parameter, value): value for value in values}
+                                                for parameter, values in posting_facets(posting, position).items()})
+            self.by_path = {posting['externalPath']: index for index, posting in enumerate(self.postings)}
+
+    def filter(self, applied_facets, search_text=''):
+        """(posting, facet values) of the postings matching every applied facet (any of its values)
+        and containing every word of the search text in their title or location"""
+        words = (search_text or '').lower().split()
+        with self.lock:
+            return [(posting, values) for posting, values in zip(self.postings, self.facet_values)
+                    if all(set(ids) & values.get(parameter, {}).keys() for parameter, ids in (applied_facets or {}).items() if ids)
+                    and all(word in f"{posting.get('title', '')} {posting.get('locationsText', '')}".lower() for word in words)]
+
+    def facets(self, matching):
+        """Facet counts over the matching postings, shaped like Workday's facets array"""
+        counts = {parameter: {} for parameter, _, _ in FACETS}
+        for _, posting_values in matching:
+            for parameter, values in posting_values.items():
+                for value_id, descriptor in values.items():
+                    entry = counts[parameter].setdefault(value_id, {'descriptor': descriptor, 'id': value_id, 'count': 0})
+                    entry['count'] += 1
+        facets = []
+        for parameter, descriptor, group in FACETS:
+            facet = {'facetParameter': parameter, 'descriptor': descriptor,
+                     'values': sorted(counts[parameter].values(), key=lambda value: value['descriptor'])}
+            facets.append({'facetParameter': group, 'values': [facet]} if group else facet)
+        return facets
+
+    def record(self, kind: str, status: int, seconds: float, size: int):
+        with self.lock:
+            key = f"{kind}:{status}"
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            self.latencies.append(seconds)
+            self.bytes_sent += size
+
+    def stats(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            statuses = dict(self.statuses)
+            bytes_sent = self.bytes_sent
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            'catalog_size': len(self.postings),
+            'requests': len(latencies),
+            'statuses': statuses,
+            'bytes_sent': bytes_sent,
+            'latency_ms': {'p50': percentile(0.50), 'p90': percentile(0.90), 'p99': percentile(0.99),
+                           'max': round(latencies[-1] * 1000, 2) if latencies else None},
+        }
+
+
+class MockWorkdayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'MockWorkday/1.0'
+    # Headers and body go out in separate writes; without TCP_NODELAY delayed ACKs add ~40 ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def mock(self) -> MockWorkday:
+        return self.server.mock
+
+    def send_json(self, kind: str, status: int, payload, started: float, headers=None):
+        body = b'' if status == 304 else json.dumps(payload).encode('utf-8')
+        # Record before replying: once the client has the body, a test may read the stats
+        self.mock.record(kind, status, time.perf_counter() - started, len(body))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name.lower() if self.mock.lowercase_headers else name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_fault(self, kind: str, started: float) -> bool:
+        """Answer with a 429 during bursts or a random 5xx; returns True when a fault was sent"""
+        failed = self.mock.delay()
+        if self.mock.in_burst():
+            self.send_json(kind, 429, {'errorCode': 'TOO_MANY_REQUESTS'}, started, {'Retry-After': '1'})
+            return True
+        if failed:
+            self.send_json(kind, random.choice([500, 502, 503]), {'errorCode': 'SERVER_ERROR'}, started)
+            return True
+        return False
+
+    def do_GET(self):
+        started = time.perf_counter()
+        if self.path == '/__stats':
+            return self.send_json('admin', 200, self.mock.stats(), started)
+        endpoint = api_endpoint(self.path)
+        if not endpoint.startswith('/job/'):
+            return self.send_json('other', 404, {'errorCode': 'NOT_FOUND'}, started)
+        if self.send_fault('detail', started):
+            return
+        index = self.mock.by_path.get(endpoint)
+        if index is None or endpoint in self.mock.missing_details:
+            return self.send_json('detail', 404, {'errorCode': 'NOT_FOUND'}, started)
+        detail = job_detail(self.mock.postings[index], index)
+        validators = {'ETag': f'"{hashlib.md5(json.dumps(detail).encode("utf-8")).hexdigest()}"',
+                      'Last-Modified': DETAIL_LAST_MODIFIED}
+        if self.headers.get('If-None-Match') == validators['ETag']:
+            return self.send_json('detail', 304, None, started, validators)
+        self.send_json('detail', 200, detail, started, validators)
+
+    def do_POST(self):
+        started = time.perf_counter()
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        if self.path == '/__reset':
+            self.mock.reset()
+            return self.send_json('admin', 200, {'reset': True}, started)
+        if api_endpoint(self.path) != '/jobs':
+            return self.send_json('other', 404, {'errorCode': 'NOT_FOUND'}, started)
+        if self.send_fault('listing', started):
+            return
+        limit, offset = int(payload.get('limit', 20)), int(payload.get('offset', 0))
+        if limit > self.mock.max_limit:
+            return self.send_json('listing', 400, {'errorCode': 'INVALID_LIMIT'}, started)
+        if self.mock.churn and offset and self.mock.rng.random() < self.mock.churn:
+            self.mock.churn_once()
+        matching = self.mock.filter(payload.get('appliedFacets'), payload.get('searchText'))
+        page = matching[offset:offset + limit] if not self.mock.max_offset or offset <= self.mock.max_offset else []
+        # Like Workday, only the first page reports the catalog size and facet counts
+        self.send_json('listing', 200, {
+            'total': len(matching) if offset == 0 else 0,
+            'jobPostings': [posting for posting, _ in page],
+            'facets': self.mock.facets(matching) if offset == 0 else [],
+            'userAuthenticated': False,
+        }, started)
+
+
+def make_server(mock: MockWorkday, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), MockWorkdayHandler)
+    server.daemon_threads = True
+    server.mock = mock
+    return server
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Local mock of the Workday jobs API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--jobs', type=int, default=0, help='Synthetic catalog size (default: serve the fixtures)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- jitter on the latency, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with a 5xx')
+    parser.add_argument('--burst-interval', type=float, default=0.0, help='Seconds between 429 bursts (0 disables)')
+    parser.add_argument('--burst-duration', type=float, default=0.0, help='Length of each 429 burst in seconds')
+    parser.add_argument('--max-limit', type=int, default=20, help='Largest listings page size accepted')
+    parser.add_argument('--max-offset', type=int, default=2000, help='Largest listings offset served (0 disables the ceiling)')
+    parser.add_argument('--churn', type=float, default=0.0,
+                        help='Chance that a listing request past the first page replaces a random posting')
+    parser.add_argument('--lowercase-headers', action='store_true',
+                        help='Send ETag, Last-Modified and Retry-After with lowercase names')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser
+
+
+def mock_from_args(args) -> MockWorkday:
+    if args.jobs:
+        postings = synthetic_postings(args.jobs, args.seed)
+    else:
+        postings = load_fixture_postings(os.path.dirname(os.path.abspath(__file__)))
+    return MockWorkday(postings, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                       burst_interval=args.burst_interval, burst_duration=args.burst_duration,
+                       max_limit=args.max_limit, max_offset=args.max_offset, churn=args.churn, seed=args.seed,
+                       lowercase_headers=args.lowercase_headers)
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    server = make_server(mock_from_args(args), args.host, args.port)
+    print(f"Mock Workday serving {len(server.mock.postings)} jobs on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Query the SQLite job store written by lambda_handler (event "job_store" or JOB_STORE_URI)
+
+Filters are combined with AND; --text searches title and description with FTS5, the
+rest use the B-tree indexes. Prints the matching jobs as JSON on stdout and the lookup
+time on stderr.
+
+    python query_jobs.py --store /tmp/bah_jobs.db --clearance TS/SCI --location Virginia --min-experience 5
+    python query_jobs.py --store /tmp/bah_jobs.db --text "cloud architect" --posted-within-days 7 --limit 10
+"""
+
+import argparse
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the indexed job store')
+    parser.add_argument('--store', default=os.environ.get('JOB_STORE_URI'), help='SQLite path or s3:// URI (default: JOB_STORE_URI)')
+    parser.add_argument('--text', help='Words that must all appear in the title or description')
+    parser.add_argument('--location', help="State name or code ('Virginia', 'VA'), or the start of the location ('McLean')")
+    parser.add_argument('--clearance', help="Required clearance, e.g. 'TS/SCI' or 'Secret'")
+    parser.add_argument('--min-experience', type=int, help='Jobs requiring at least this many years')
+    parser.add_argument('--max-experience', type=int, help='Jobs requiring at most this many years')
+    parser.add_argument('--job-type', help="e.g. 'Full time'")
+    parser.add_argument('--posted-within-days', type=int)
+    parser.add_argument('--source', help="<tenant>/<site> of a multi-target run")
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--fields', help='Comma-separated fields to print instead of whole jobs')
+    args = parser.parse_args()
+    if not args.store:
+        parser.error('--store (or JOB_STORE_URI) is required')
+
+    sys.path.insert(0, HERE)
+    import lambda_function
+
+    filters = {name: getattr(args, name) for name in lambda_function.QUERY_FILTERS}
+    result = lambda_function.query_job_store(args.store, filters)
+    jobs = result['jobs']
+    if args.fields:
+        fields = [field.strip() for field in args.fields.split(',')]
+        jobs = [{field: job.get(field) for field in fields} for job in jobs]
+    print(f"{len(jobs)} of {result['stored_jobs']} stored jobs in {result['query_ms']} ms", file=sys.stderr)
+    print(json.dumps(jobs, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""Regression tests for the scraper against the in-process mock Workday server
+
+Unlike test_lambda.py and test_job_details.py these need no network access: one mock
+server is started on a free port before lambda_function is imported (the Workday base
+URL is read at import time) and each test serves its own catalog from it.
+
+    python -m pytest -q test_scraper_mock.py
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import ANY, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mock_workday_server as mock_server
+
+SERVER = mock_server.make_server(mock_server.MockWorkday([]), port=0)
+threading.Thread(target=SERVER.serve_forever, daemon=True).start()
+os.environ['WORKDAY_BASE_URL'] = f"http://127.0.0.1:{SERVER.server_port}"
+os.environ.setdefault('RATE_LIMIT_INITIAL_RPS', '300')
+os.environ.setdefault('RATE_LIMIT_MAX_RPS', '600')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('RESPONSE_CACHE_DIR', tempfile.mkdtemp(prefix='bah_response_cache_'))
+
+import lambda_function as lf
+
+
+def serve(postings, **options) -> mock_server.MockWorkday:
+    """Serve a new catalog from the shared mock server"""
+    SERVER.mock = mock_server.MockWorkday(postings, **options)
+    return SERVER.mock
+
+
+def run(event):
+    """Invoke the handler without the response cache and return the decoded body"""
+    return lf.decode_response_body(lf.lambda_handler({'cache': False, **event}, None))
+
+
+def listed_paths(body):
+    return [job['url'].split(lf.WORKDAY_SITE, 1)[1] for job in body['jobs']]
+
+
+def detail_requests(mock: mock_server.MockWorkday) -> int:
+    return sum(count for key, count in mock.stats()['statuses'].items() if key.startswith('detail:'))
+
+
+class PaginationTest(unittest.TestCase):
+
+    def test_churn_keeps_every_stable_posting(self):
+        for engine in ('threads', 'async'):
+            with self.subTest(engine=engine):
+                mock = serve(mock_server.synthetic_postings(400), churn=0.3, seed=1)
+                original = {posting['externalPath'] for posting in mock.postings}
+                body = run({'include_details': False, 'engine': engine})
+                self.assertTrue(body['success'], body.get('error'))
+                listed = listed_paths(body)
+                stable = original & {posting['externalPath'] for posting in mock.postings}
+                self.assertGreater(mock.added, 0)
+                self.assertEqual(len(listed), len(set(listed)))
+                self.assertEqual(stable - set(listed), set())
+
+    def test_adjacent_gaps_are_each_counted(self):
+        def page(*numbers):
+            return [{'bulletFields': [f"R{number:07d}"], 'externalPath': f"/job/{number}"} for number in numbers]
+
+        pages = lf.ListingPages(target=30, limit=10, overlap=2)
+        self.assertEqual(pages.offsets, [0, 8, 16, 24])
+        # 0-8 and 8-16 share no posting, 16-24 overlap as planned
+        pages.store(0, page(*range(0, 10)))
+        pages.store(8, page(*range(12, 22)))
+        pages.store(16, page(*range(24, 34)))
+        pages.store(24, page(*range(32, 38)))
+        self.assertEqual(lf.find_page_gaps(pages.pages, pages.offsets), [(0, 8), (8, 16)])
+        self.assertEqual(pages.to_requery(), [0, 8, 16])
+        self.assertEqual(pages.stats['gaps_detected'], 2)
+
+    def test_page_size_probes_are_not_failures(self):
+        mock = serve(mock_server.synthetic_postings(60))
+        scrapers = [lf.BAHJobScraper(), lf.AsyncBAHJobScraper()]
+
+        async def probe_async(scraper):
+            async with scraper:
+                return await scraper.probe_listing_limit()
+
+        for scraper in scrapers:
+            with self.subTest(engine=type(scraper).__name__), self.assertNoLogs(lf.logger, 'ERROR'):
+                mock.reset()
+                if isinstance(scraper, lf.AsyncBAHJobScraper):
+                    data, limit = asyncio.run(probe_async(scraper))
+                else:
+                    data, limit = scraper.probe_listing_limit()
+                self.assertEqual(limit, 20)
+                self.assertEqual(len(data['jobPostings']), 20)
+                self.assertEqual(mock.stats()['statuses'], {'listing:400': 2, 'listing:200': 1})
+                self.assertEqual(scraper.metrics.failed_requests, 0)
+
+    def test_max_jobs_limits_listing(self):
+        serve(mock_server.synthetic_postings(120))
+        body = run({'include_details': False, 'max_jobs': 45})
+        self.assertEqual(body['jobs_count'], 45)
+
+
+class ShardTest(unittest.TestCase):
+
+    def test_direct_shards_are_capped_by_max_jobs(self):
+        mock = serve(mock_server.synthetic_postings(120))
+        expected = [posting['externalPath'] for posting in mock.postings[:60]]
+        listed = []
+        for index in range(3):
+            body = run({'include_details': False, 'max_jobs': 60, 'shard_index': index, 'shard_count': 3})
+            self.assertEqual(body['shard'], {'offset_start': index * 20, 'offset_end': index * 20 + 20, 'total': 120})
+            listed.extend(listed_paths(body))
+        self.assertEqual(listed, expected)
+
+    def test_coordinator_matches_direct_shards(self):
+        serve(mock_server.synthetic_postings(120))
+        body = run({'mode': 'coordinator', 'include_details': False, 'max_jobs': 60, 'shard_count': 3})
+        self.assertEqual([(shard['offset_start'], shard['offset_end']) for shard in body['shards']],
+                         [(0, 20), (20, 40), (40, 60)])
+        self.assertEqual(body['jobs_count'], 60)
+
+
+class PartitionTest(unittest.TestCase):
+
+    def test_partitions_get_past_the_offset_cap(self):
+        for engine in ('threads', 'async'):
+            with self.subTest(engine=engine), self.assertNoLogs('urllib3', 'WARNING'):
+                mock = serve(mock_server.synthetic_postings(2500))
+                body = run({'engine': engine, 'facet_partitions': True, 'include_details': False})
+                self.assertTrue(body['success'], body.get('error'))
+                self.assertEqual(sorted(listed_paths(body)), sorted(posting['externalPath'] for posting in mock.postings))
+                partitions = body['metadata']['facet_partitions']
+                self.assertGreater(partitions['count'], 1)
+                self.assertEqual(partitions['truncated'], 0)
+                self.assertTrue(all(partition['listed'] == partition['count'] for partition in partitions['partitions']))
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_rate_follows_aimd(self):
+        limiter = lf.AdaptiveRateLimiter(initial_rate=10, min_rate=1, max_rate=20, jitter=0)
+        limiter.on_throttle()
+        self.assertEqual(limiter.rate, 5)
+        # Requests failing together are one congestion signal
+        limiter.on_throttle()
+        self.assertEqual(limiter.rate, 5)
+        limiter.on_success()
+        self.assertAlmostEqual(limiter.rate, 5.2)
+
+    def test_retry_after_pauses_the_host(self):
+        limiter = lf.AdaptiveRateLimiter(initial_rate=10, jitter=0)
+        limiter.on_throttle(2.0)
+        self.assertGreater(limiter.try_acquire(), 1.9)
+
+    def test_lowercase_retry_after_is_honoured(self):
+        limiter = lf.get_rate_limiter(lf.workday_target()['host'])
+        self.addCleanup(limiter.__dict__.update, dict(limiter.__dict__))
+        for engine in ('threads', 'async'):
+            with self.subTest(engine=engine):
+                # Every request of the first 0.3 s gets a 429 asking for a 1 s pause
+                serve(mock_server.synthetic_postings(5), burst_interval=1000, burst_duration=0.3, lowercase_headers=True)
+                body = run({'engine': engine, 'include_details': False})
+                self.assertTrue(body['success'], body.get('error'))
+                self.assertEqual(body['jobs_count'], 5)
+                self.assertGreaterEqual(body['metadata']['requests']['backoff_seconds'], 1.0)
+
+
+class TargetsTest(unittest.TestCase):
+
+    def test_targets_are_scraped_and_tagged_together(self):
+        for engine in ('threads', 'async'):
+            with self.subTest(engine=engine):
+                serve(mock_server.synthetic_postings(15))
+                base_url = os.environ['WORKDAY_BASE_URL']
+                body = run({'engine': engine, 'targets': [{'host': base_url, 'tenant': 'bah', 'site': 'BAH_Jobs'},
+                                                          {'host': base_url, 'tenant': 'acme', 'site': 'Careers'}]})
+                self.assertTrue(body['success'], body.get('error'))
+                by_tenant = {}
+                for job in body['jobs']:
+                    by_tenant.setdefault(job['source']['tenant'], []).append(job['job_id'])
+                self.assertEqual({tenant: len(ids) for tenant, ids in by_tenant.items()}, {'bah': 15, 'acme': 15})
+                self.assertEqual(sorted(by_tenant['bah']), sorted(by_tenant['acme']))
+                self.assertEqual([(target['tenant'], target['success'], target['jobs_count']) for target in body['metadata']['targets']],
+                                 [('bah', True, 15), ('acme', True, 15)])
+
+
+class CacheTest(unittest.TestCase):
+
+    def test_stale_details_are_revalidated(self):
+        for engine in ('threads', 'async'):
+            for lowercase in (False, True):
+                with self.subTest(engine=engine, lowercase_headers=lowercase):
+                    shutil.rmtree(os.environ['RESPONSE_CACHE_DIR'], ignore_errors=True)
+                    mock = serve(mock_server.synthetic_postings(10), lowercase_headers=lowercase)
+                    event = {'engine': engine, 'cache': True, 'cache_ttl': 0}
+                    first = run(event)
+                    self.assertEqual(first['metadata']['cache']['misses'], 10)
+                    mock.reset()
+                    second = run(event)
+                    self.assertEqual(second['metadata']['cache']['revalidated'], 10)
+                    self.assertEqual(mock.stats()['statuses'].get('detail:304'), 10)
+                    self.assertEqual(second['jobs'], first['jobs'])
+
+    def test_entry_count_ignores_leftover_temp_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ('entry.json', 'entry.json.123.tmp'):
+                open(os.path.join(directory, name), 'w').close()
+            self.assertEqual(lf.ResponseCache(directory).entry_count, 1)
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def test_rerun_skips_finished_jobs(self):
+        mock = serve(mock_server.synthetic_postings(80))
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            event = {'max_jobs': 50, 'run_id': 'rerun', 'checkpoint_dir': checkpoint_dir}
+            first = run(event)
+            self.assertEqual(detail_requests(mock), 50)
+            mock.reset()
+            second = run(event)
+            self.assertEqual(detail_requests(mock), 0)
+            self.assertEqual(second['metadata']['checkpoint']['jobs_restored'], 50)
+            self.assertEqual([job['content_hash'] for job in second['jobs']],
+                             [job['content_hash'] for job in first['jobs']])
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def test_continuation_cursor_finishes_the_catalog(self):
+        for engine in ('threads', 'async'):
+            with self.subTest(engine=engine):
+                mock = serve(mock_server.synthetic_postings(60), latency=0.1)
+                event = {'engine': engine, 'local_timeout_seconds': 0.7, 'deadline_margin_seconds': 0.2}
+                job_ids, cursor, runs = [], None, 0
+                while True:
+                    body = run({**event, **({'cursor': cursor} if cursor else {})})
+                    job_ids.extend(job['job_id'] for job in body['jobs'])
+                    runs += 1
+                    cursor = body.get('next_cursor')
+                    if not cursor:
+                        break
+                self.assertGreater(runs, 1)
+                self.assertEqual(sorted(job_ids), sorted(posting['bulletFields'][0] for posting in mock.postings))
+
+    def test_requests_outliving_the_stop_retire_the_scraper(self):
+        mock = serve(mock_server.synthetic_postings(20))
+        scraper = lf.BAHJobScraper(concurrency=4)
+        listings = scraper.get_job_listings(limit=20)['jobPostings']
+        mock.latency = 0.5
+        self.addCleanup(time.sleep, 0.5)  # Let the stray requests finish before the next test swaps catalogs
+        scraper.deadline = lf.Deadline(lf.LocalContext(0.35), margin_seconds=0.1)
+        self.assertEqual(scraper.build_complete_jobs(listings), [])
+        self.assertEqual(scraper.deadline_stop['jobs_emitted'], 0)
+        self.assertTrue(scraper.retired)
+        lf.release_scraper('threads', 4, scraper)
+        self.assertFalse(any(scraper in idle for idle in lf._idle_scrapers.values()))
+
+
+class JobStoreTest(unittest.TestCase):
+
+    def test_store_is_queried_by_event_and_cli(self):
+        serve(mock_server.synthetic_postings(30))
+        with tempfile.TemporaryDirectory() as directory:
+            store = os.path.join(directory, 'jobs.db')
+            jobs = run({'job_store': store})['jobs']
+            expected = sorted(job['job_id'] for job in jobs
+                              if job['location'].endswith(', VA') and job['security_clearance'].startswith('TS/SCI'))
+            self.assertTrue(expected)
+            body = run({'operation': 'query', 'job_store': store, 'query': {'location': 'VA', 'clearance': 'TS/SCI'}})
+            self.assertEqual(sorted(job['job_id'] for job in body['jobs']), expected)
+            self.assertEqual(body['metadata']['stored_jobs'], 30)
+            cli = subprocess.run([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_jobs.py'),
+                                  '--store', store, '--location', 'Virginia', '--clearance', 'TS/SCI', '--fields', 'job_id'],
+                                 capture_output=True, text=True, check=True)
+            self.assertEqual(sorted(job['job_id'] for job in json.loads(cli.stdout)), expected)
+            self.assertEqual(run({'job_store': store})['metadata']['job_store']['unchanged'], 30)
+
+    def test_failed_run_does_not_upload_the_store(self):
+        serve(mock_server.synthetic_postings(5))
+        with tempfile.TemporaryDirectory() as directory:
+            event = {'job_store': os.path.join(directory, 'jobs.db')}
+            with patch.object(lf.JobStore, 'close', autospec=True) as close:
+                run(event)
+                close.assert_called_once_with(ANY, upload=True)
+            with patch.object(lf.JobStore, 'close', autospec=True) as close, \
+                    patch.object(lf, 'scrape_response_body', side_effect=RuntimeError('boom')):
+                body = run(event)
+                self.assertFalse(body['success'])
+                close.assert_called_once_with(ANY, upload=False)
+
+
+class ManifestTest(unittest.TestCase):
+
+    def test_changed_only_returns_new_and_changed_jobs(self):
+        mock = serve(mock_server.synthetic_postings(10))
+        with tempfile.TemporaryDirectory() as directory:
+            event = {'manifest': os.path.join(directory, 'manifest.json'), 'changed_only': True}
+            self.assertEqual(len(run(event)['jobs']), 10)
+            unchanged = run(event)
+            self.assertEqual(unchanged['jobs'], [])
+            self.assertEqual(unchanged['metadata']['content_changes_count']['jobs']['unchanged'], 10)
+
+            mock.postings[2]['title'] += ' II'
+            changed = run(event)
+            self.assertEqual([job['job_id'] for job in changed['jobs']], ['R0000002'])
+            self.assertEqual(changed['content_changes']['jobs']['changed'], ['R0000002'])
+
+            # Later postings keep their details when the last one is dropped
+            serve(mock.postings[:-1])
+            deleted = run(event)
+            self.assertEqual(deleted['jobs'], [])
+            self.assertEqual(deleted['content_changes']['jobs']['deleted'], ['R0000009'])
+
+
+class SearchTest(unittest.TestCase):
+
+    def test_search_text_is_sent_apart_from_facets(self):
+        payload = lf.listing_payload(20, 40, {'timeType': ['full']}, 'Engineer')
+        self.assertEqual(payload, {'appliedFacets': {'timeType': ['full']}, 'limit': 20, 'offset': 40, 'searchText': 'Engineer'})
+
+    def test_posted_within_keeps_open_ended_ages_past_30_days(self):
+        listings = [{'postedOn': label} for label in
+                    ('Posted Today', 'Posted 5 Days Ago', 'Posted 30+ Days Ago', 'Posted 20 Days Ago', '')]
+        for days, expected in ((7, ['Posted Today', 'Posted 5 Days Ago', '']),
+                               (30, ['Posted Today', 'Posted 5 Days Ago', 'Posted 20 Days Ago', '']),
+                               (90, ['Posted Today', 'Posted 5 Days Ago', 'Posted 30+ Days Ago', 'Posted 20 Days Ago', ''])):
+            self.assertEqual([job['postedOn'] for job in lf.filter_posted_within(listings, days)], expected)
+        self.assertEqual(lf.filter_posted_within(listings, None), listings)
+
+    def test_terms_are_checkpointed_apart(self):
+        mock = serve(mock_server.synthetic_postings(60))
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            event = {'include_details': False, 'search_text': ['Engineer', 'Analyst'], 'run_id': 'search',
+                     'checkpoint_dir': checkpoint_dir}
+            first = run(event)
+            self.assertTrue(all(first['metadata']['search']['listed'].values()))
+            mock.reset()
+            second = run(event)
+            self.assertEqual(mock.stats()['statuses'], {})
+            self.assertEqual(second['metadata']['search']['listed'], first['metadata']['search']['listed'])
+            self.assertEqual(listed_paths(second), listed_paths(first))
+
+
+class IncrementalTest(unittest.TestCase):
+
+    def test_second_run_fetches_only_new_requisitions(self):
+        mock = serve(mock_server.synthetic_postings(60), seed=3)
+        with tempfile.TemporaryDirectory() as directory:
+            event = {'mode': 'incremental', 'snapshot': os.path.join(directory, 'snapshot.json')}
+            first = run(event)
+            self.assertEqual(first['metadata']['changes_count'], {'added': 60, 'removed': 0, 'unchanged': 0})
+
+            mock.churn_once()
+            mock.reset()
+            second = run(event)
+            self.assertEqual(second['metadata']['changes_count'], {'added': 1, 'removed': 1, 'unchanged': 59})
+            self.assertEqual(detail_requests(mock), 1)
+            self.assertEqual(second['jobs_count'], 60)
+            self.assertTrue(all(job.get('qualifications') for job in second['jobs']))
+
+    def test_failed_detail_fetch_is_retried_next_run(self):
+        for engine in ('threads', 'async'):
+            with self.subTest(engine=engine), tempfile.TemporaryDirectory() as directory:
+                mock = serve(mock_server.synthetic_postings(20))
+                failing = mock.postings[3]['externalPath']
+                mock.missing_details.add(failing)
+                event = {'mode': 'incremental', 'engine': engine, 'snapshot': os.path.join(directory, 'snapshot.json')}
+                first = run(event)
+                self.assertEqual(first['metadata']['changes_count']['added'], 20)
+
+                mock.missing_details.clear()
+                mock.reset()
+                second = run(event)
+                self.assertEqual(second['changes']['added'], [mock.postings[3]['bulletFields'][0]])
+                self.assertEqual(detail_requests(mock), 1)
+                retried = next(job for job in second['jobs'] if job['url'].endswith(failing))
+                self.assertIn('qualifications', retried)
+
+                mock.reset()
+                third = run(event)
+                self.assertEqual(third['metadata']['changes_count']['added'], 0)
+                self.assertEqual(detail_requests(mock), 0)
+
+
+class FieldsTest(unittest.TestCase):
+
+    def test_content_hash_covers_the_whole_job(self):
+        serve(mock_server.synthetic_postings(10))
+        full = {job['job_id']: job['content_hash'] for job in run({})['jobs']}
+        titles = run({'fields': ['title']})['jobs']
+        self.assertEqual(len(titles), 10)
+        self.assertTrue(all(set(job) <= {'title', 'job_id'} for job in titles))
+        hashed = run({'fields': ['title', 'content_hash']})['jobs']
+        self.assertEqual({job['job_id']: job['content_hash'] for job in hashed}, full)
+
+
+class ColumnarTest(unittest.TestCase):
+
+    def test_details_api_columns_come_from_the_scraped_job(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        for engine in ('threads', 'async'):
+            with self.subTest(engine=engine), tempfile.TemporaryDirectory() as directory:
+                serve(mock_server.synthetic_postings(10))
+                jobs = run({'engine': engine})['jobs']
+                self.assertFalse(any('id' in job for job in jobs))
+                path = os.path.join(directory, 'jobs.parquet')
+                body = run({'engine': engine, 'output': path, 'output_format': 'parquet'})
+                self.assertEqual(body['output']['records'], 10)
+                rows = pq.read_table(path).to_pylist()
+                self.assertEqual(sorted(row['id'] for row in rows), sorted(str(index) for index in range(10)))
+                self.assertEqual({row['content_hash'] for row in rows}, {job['content_hash'] for job in jobs})
+
+
+class DescriptionExtractorTest(unittest.TestCase):
+
+    def extract(self, text):
+        return lf.DESCRIPTION_EXTRACTOR.extract(text)
+
+    def test_fields(self):
+        text = ("5+ years of experience with Python. Active TS/SCI clearance required. "
+                "The range is $84,000.00 to $191,000.00 (annualized USD).")
+        self.assertEqual(self.extract(text), {'salary_range': '$84,000.00 to $191,000.00',
+                                              'security_clearance': 'TS/SCI',
+                                              'experience_years': '5'})
+
+    def test_priority_beats_position(self):
+        # Earlier patterns of a field win even when a later one matches first in the text
+        self.assertEqual(self.extract('Secret clearance, TS/SCI preferred')['security_clearance'], 'TS/SCI')
+        self.assertEqual(self.extract('$90,000 annually, $80,000 - $95,000')['salary_range'], '$80,000 - $95,000')
+
+    def test_overlapping_matches(self):
+        # TS/SCI overlaps the end of "secret"; a single left-to-right scan would only see 'secret'
+        self.assertEqual(self.extract('Top secretS/SCI clearance')['security_clearance'], 'tS/SCI')
+
+    def test_no_fields(self):
+        self.assertEqual(self.extract(''), {})
+        self.assertEqual(self.extract('Design, build and operate systems.'), {})
+
+
+class DescriptionHTMLTest(unittest.TestCase):
+
+    def test_headings_switch_sections_and_are_kept(self):
+        sections, text = lf.parse_description_html(
+            "<p>Build systems.</p><p><b>Basic Qualifications:</b></p><ul><li>5+ years of experience</li></ul>"
+            "<h3>Compensation</h3><p>$90,000 to $120,000</p>")
+        self.assertEqual(sections, {'description': 'Build systems.',
+                                    'qualifications': 'Basic Qualifications:\n- 5+ years of experience',
+                                    'benefits': 'Compensation\n$90,000 to $120,000'})
+        self.assertEqual(text.splitlines()[0], 'Build systems.')
+        self.assertEqual(len(text.splitlines()), 5)
+
+    def test_bold_paragraph_is_not_lost(self):
+        sections, text = lf.parse_description_html(
+            "<p>Build systems.</p><p><b>Active TS/SCI clearance with polygraph required</b></p>")
+        self.assertIn('Active TS/SCI clearance with polygraph required', '\n'.join(sections.values()))
+        self.assertEqual(lf.DESCRIPTION_EXTRACTOR.extract(text)['security_clearance'], 'TS/SCI')
+
+    def test_list_items_are_never_headings(self):
+        sections, _ = lf.parse_description_html(
+            "<p><b>Key Role:</b></p><ul><li>Work with:</li><li><b>Benefits</b></li></ul><p>Deploy software.</p>")
+        self.assertEqual(sections, {'responsibilities': 'Key Role:\n- Work with:\n- Benefits\nDeploy software.'})
+
+
+class ChunkerTest(unittest.TestCase):
+
+    def test_token_counter_is_explicit(self):
+        chunker = lf.JobChunker.from_config({'strategy': 'byToken', 'tokenCounter': 'estimate'})
+        self.assertEqual(chunker.token_counter, 'estimate')
+        self.assertEqual(chunker.count_tokens('x' * 10), 3)
+        with self.assertRaises(ValueError):
+            lf.JobChunker.from_config({'tokenCounter': 'words'})
+        if lf.get_token_encoder() is None:
+            with self.assertRaises(ValueError):
+                lf.JobChunker.from_config({'tokenCounter': 'tiktoken'})
+
+
+class CursorTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        state = {'offset': 40, 'total': 1234, 'end': None, 'pending': ['/job/McLean/Engineer_R0000001']}
+        cursor = lf.encode_cursor(state)
+        self.assertRegex(cursor, r'^[A-Za-z0-9_=-]+$')
+        self.assertEqual(lf.decode_cursor(cursor), state)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            lf.decode_cursor('not a cursor')
+
+    def test_pages_cover_the_catalog(self):
+        serve(mock_server.synthetic_postings(50))
+        paths, cursor = [], None
+        while True:
+            body = run({'include_details': False, 'page_size': 20, **({'cursor': cursor} if cursor else {})})
+            paths.extend(listed_paths(body))
+            cursor = body['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(len(paths), 50)
+        self.assertEqual(len(set(paths)), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()